@@ -0,0 +1,215 @@
+# api.py
+
+import os
+import json
+import asyncio
+from aiohttp import web
+from service import GenerationService, ServiceBusy, RequestCancelled, generation_request
+from templates import TemplateRegistry, TemplateError, DEFAULT_TEMPLATE
+from extract import render
+from app import PROFILES
+import opsmetrics
+
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+STREAM_CHUNK = 64 * 1024
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+SERVICE_KEY = web.AppKey("service", GenerationService)
+TEMPLATES_KEY = web.AppKey("templates", TemplateRegistry)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Request Parsing
+# ─────────────────────────────────────────────────────────────────────────────
+async def read_generate_form(request):
+    """
+    Read a POST /generate multipart body.
+
+    Parts:
+      workbook   the .xlsx/.csv file (required)
+      payload    JSON: {"template": "<name>", "profile": "<name>", "text_inputs": {...},
+                        "images": {"slide_6": "<part name>", ...}}
+      <any>      image files; a part named after a slot (e.g. "slide_6") fills
+                 that slot directly, others are referenced from payload["images"]
+    Returns (workbook_bytes, workbook_name, template_name, profile, text_inputs, images).
+    """
+    if not request.content_type.startswith("multipart/"):
+        raise web.HTTPUnsupportedMediaType(text="Send the workbook and payload as multipart/form-data.")
+    reader = await request.multipart()
+    workbook = workbook_name = None
+    payload = {}
+    files = {}
+    async for part in reader:
+        if part.name == "workbook":
+            workbook_name = part.filename or "workbook.xlsx"
+            workbook = await part.read()
+        elif part.name == "payload":
+            payload = json.loads(await part.text() or "{}")
+        elif part.name:
+            files[part.name] = await part.read()
+
+    if workbook is None:
+        raise web.HTTPBadRequest(text="Missing 'workbook' part.")
+    if not isinstance(payload, dict):
+        raise web.HTTPBadRequest(text="'payload' must be a JSON object.")
+    profile = payload.get("profile")
+    if profile is not None and profile not in PROFILES:
+        raise web.HTTPBadRequest(text=f"Unknown profile {profile!r}; expected one of {', '.join(PROFILES)}.")
+
+    # The same upload may fill several slots; it is sent (and decoded) once
+    images = {}
+    for slot, part_name in (payload.get("images") or {}).items():
+        if part_name not in files:
+            raise web.HTTPBadRequest(text=f"Image slot {slot!r} refers to missing part {part_name!r}.")
+        images[slot] = files[part_name]
+    for name, data in files.items():
+        if name.startswith("slide_") and name not in images:
+            images[name] = data
+    template_name = payload.get("template") or DEFAULT_TEMPLATE
+    return workbook, workbook_name, template_name, profile, payload.get("text_inputs") or {}, images
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Handlers
+# ─────────────────────────────────────────────────────────────────────────────
+async def handle_generate(request):
+    service = request.app[SERVICE_KEY]
+    try:
+        workbook, workbook_name, template_name, profile, text_inputs, images = await read_generate_form(request)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise web.HTTPBadRequest(text=f"Invalid request: {e}")
+    try:
+        template = request.app[TEMPLATES_KEY].get(template_name)
+    except KeyError as e:
+        raise web.HTTPBadRequest(text=str(e.args[0]))
+    except TemplateError as e:
+        raise web.HTTPInternalServerError(text=f"Template {template_name!r} is broken: {e}")
+
+    gen_request = generation_request(workbook, workbook_name, text_inputs, images, template.path, template.slide_map,
+                                     profile)
+    try:
+        future = service.submit(gen_request)
+    except ServiceBusy as e:
+        raise web.HTTPServiceUnavailable(text=str(e), headers={"Retry-After": "5"})
+
+    try:
+        result = await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Client went away; stop the worker at its next progress report
+        service.cancel(gen_request["id"])
+        raise
+    except RequestCancelled:
+        raise web.HTTPServiceUnavailable(text="Generation was cancelled.")
+    except Exception as e:
+        raise web.HTTPUnprocessableEntity(text=f"Generation failed: {e}")
+
+    pptx = memoryview(result["pptx"])
+    name = os.path.splitext(os.path.basename(workbook_name))[0] or "recap_deck"
+    response = web.StreamResponse(headers={
+        "Content-Type": PPTX_MIME,
+        "Content-Disposition": f'attachment; filename="{name}_recap.pptx"',
+    })
+    response.content_length = len(pptx)
+    await response.prepare(request)
+    for start in range(0, len(pptx), STREAM_CHUNK):
+        await response.write(pptx[start:start + STREAM_CHUNK])
+    await response.write_eof()
+    return response
+
+
+async def handle_extract(request):
+    """
+    POST /extract[?format=csv]: every file part is a workbook; responds with
+    its recap metrics as JSON (or CSV). No deck is built.
+    """
+    if not request.content_type.startswith("multipart/"):
+        raise web.HTTPUnsupportedMediaType(text="Send the workbooks as multipart/form-data.")
+    fmt = request.query.get("format", "json")
+    if fmt not in ("json", "csv"):
+        raise web.HTTPBadRequest(text="format must be 'json' or 'csv'.")
+
+    files = {}
+    reader = await request.multipart()
+    async for part in reader:
+        if part.filename:
+            files[part.filename] = bytes(await part.read())
+    if not files:
+        raise web.HTTPBadRequest(text="No workbook files in the request.")
+
+    # Parsing is CPU-bound; it runs on the generation workers, off the event loop
+    try:
+        future = request.app[SERVICE_KEY].submit_extract(files)
+    except ServiceBusy as e:
+        raise web.HTTPServiceUnavailable(text=str(e), headers={"Retry-After": "5"})
+    try:
+        result = await asyncio.wrap_future(future)
+    except Exception as e:
+        raise web.HTTPUnprocessableEntity(text=f"Extraction failed: {e}")
+    rows, errors = result["rows"], result["errors"]
+    content_type = "text/csv" if fmt == "csv" else "application/json"
+    return web.Response(text=render(rows, errors, fmt), content_type=content_type)
+
+
+async def handle_health(request):
+    return web.json_response({"status": "ok"})
+
+
+async def handle_status(request):
+    return web.json_response(request.app[SERVICE_KEY].metrics())
+
+
+async def handle_metrics(request):
+    """GET /metrics: counters, histograms and queue depth in the Prometheus text format."""
+    return web.Response(body=opsmetrics.REGISTRY.render().encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def handle_templates(request):
+    registry = request.app[TEMPLATES_KEY]
+    return web.json_response({"templates": registry.names(), "errors": registry.errors()})
+
+# ─────────────────────────────────────────────────────────────────────────────
+# App
+# ─────────────────────────────────────────────────────────────────────────────
+def create_app(service=None, registry=None):
+    app = web.Application(client_max_size=MAX_UPLOAD_BYTES)
+    app[SERVICE_KEY] = service or GenerationService()
+    app[TEMPLATES_KEY] = registry or TemplateRegistry()
+    app.router.add_post("/generate", handle_generate)
+    app.router.add_post("/extract", handle_extract)
+    app.router.add_get("/healthz", handle_health)
+    app.router.add_get("/status", handle_status)
+    app.router.add_get("/templates", handle_templates)
+    app.router.add_get("/metrics", handle_metrics)
+    opsmetrics.REGISTRY.register_collector(app[SERVICE_KEY].metric_samples)
+
+    async def start_watcher(app):
+        app[TEMPLATES_KEY].watch()
+
+    async def shutdown_service(app):
+        opsmetrics.REGISTRY.unregister_collector(app[SERVICE_KEY].metric_samples)
+        app[TEMPLATES_KEY].stop()
+        app[SERVICE_KEY].shutdown(wait=False)
+
+    app.on_startup.append(start_watcher)
+    app.on_cleanup.append(shutdown_service)
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="HTTP API for recap deck generation")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None, help="Requests allowed in flight before 503s")
+    parser.add_argument("--template", default="template.pptx", help="Default PowerPoint template file")
+    parser.add_argument("--templates-dir", default="templates", help="Directory of named brand templates")
+    parser.add_argument("--metrics-file", help="Also write /metrics to this file every 15 seconds")
+    args = parser.parse_args()
+
+    if args.metrics_file:
+        opsmetrics.start_textfile_writer(args.metrics_file)
+    service = GenerationService(workers=args.workers, max_pending=args.max_pending)
+    registry = TemplateRegistry(args.templates_dir, default_path=args.template)
+    web.run_app(create_app(service, registry), host=args.host, port=args.port)
@@ -2,13 +2,25 @@
 
 import os
 import sys
+import copy
 import json
-import pandas as pd
+import hashlib
+import itertools
+import threading
+from contextlib import nullcontext
+from collections import OrderedDict
+from typing import TYPE_CHECKING
 import io
 from io import BytesIO
-from pptx import Presentation
-from pptx.util import Inches
-from PIL import Image
+from textfill import TextEdits
+from layout import LAYOUT_CACHE
+from opsmetrics import instrumented, stage, unrecorded, DECKS_GENERATED, IMAGE_BYTES
+
+# pandas, python-pptx and Pillow are imported where they are first needed, so
+# `import app` (the CLI, worker processes, Streamlit reruns) stays cheap.
+# Run bench_imports.py after adding imports here.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -42,10 +54,30 @@ def save_batches(batches: list, path: str = BATCHES_PATH) -> None:
 # ─────────────────────────────────────────────────────────────────────────────
 # Data Loading
 # ─────────────────────────────────────────────────────────────────────────────
-def load_dataframe(src) -> pd.DataFrame:
+def upload_bytes(src):
+    """
+    The complete contents of an upload, independent of its stream position.
+    In-memory uploads (Streamlit's UploadedFile, BytesIO) hand back the bytes
+    object they already hold, with no copy; getvalue() shares the buffer,
+    whereas getbuffer() or a partial read() would copy it. Bytes-like values
+    pass through; open files are read from the start.
+    """
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return src
+    if hasattr(src, "getvalue"):
+        return src.getvalue()
+    src.seek(0)
+    return src.read()
+
+
+@instrumented("load")
+def load_dataframe(src) -> "pd.DataFrame":
     # Handles file upload object or file path
+    import pandas as pd
     if hasattr(src, "read") and hasattr(src, "name"):
-        data = src.getvalue()
+        # A fresh reader over the upload's own buffer: no copy, and the
+        # upload's position doesn't matter on reruns
+        data = upload_bytes(src)
         ext  = os.path.splitext(src.name)[1].lower()
         if ext == ".csv":
             return pd.read_csv(io.BytesIO(data), encoding="utf-8", engine="python", on_bad_lines="skip")
@@ -61,6 +93,29 @@ def load_dataframe(src) -> pd.DataFrame:
     else:
         raise ValueError(f"Unsupported file type: {ext}")
 
+
+def load_workbook_sheets(src) -> dict:
+    """
+    Parse every sheet of an Excel workbook (upload object or path) in one
+    pass. Returns {sheet name: DataFrame}; a CSV comes back as one sheet.
+    """
+    import pandas as pd
+    name = src.name if hasattr(src, "name") else src
+    if os.path.splitext(name)[1].lower() == ".csv":
+        return {os.path.splitext(os.path.basename(name))[0]: load_dataframe(src)}
+    if hasattr(src, "read"):
+        src = io.BytesIO(upload_bytes(src))
+    return pd.read_excel(src, sheet_name=None)
+
+
+# Header cells the recap layout puts in the first row of its metric blocks
+RECAP_HEADERS = ("Organic & Total", "Dates")
+
+
+def is_recap_sheet(df) -> bool:
+    """True if `df` has the column layout extract_recap_metrics() reads."""
+    return all(header in df.columns for header in RECAP_HEADERS)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Proposed Metrics Extraction
 # ─────────────────────────────────────────────────────────────────────────────
@@ -103,1043 +158,973 @@ def format_compact_number(n):
     except:
         return str(n)
 
-# PowerPoint Deck Generation
 # ─────────────────────────────────────────────────────────────────────────────
-def populate_pptx_from_excel(excel_df, pptx_template_path, output_path, images=None, text_inputs=None):
-    prs = Presentation(pptx_template_path)
-    handle_slide_6 = text_inputs.get("slide_6", "@default")
-    handle_slide_7_left = text_inputs.get("slide_7_left", "@default")
-    handle_slide_7_right = text_inputs.get("slide_7_right", "@default")
-    slide_7_likes = text_inputs.get("slide_7_like", "@default")
-    slide_7_comments = text_inputs.get("slide_7_comment", "@default")
-    slide_7_views = text_inputs.get("slide_7_view", "@default")
-    slide_7_reach =  text_inputs.get("slide_7_reaches", "@default")
-    slide_7_engagements = text_inputs.get("slide_7_eng", "@default")
-    slide_7_impressions = text_inputs.get("slide_7_impr", "@default")
-    text_slide_9 = text_inputs.get("slide_9", "@default")
-    text_slide_13 = text_inputs.get("slide_13", "@default")
-    text_slide_15 = text_inputs.get("slide_15", "@default")
-    text_slide_16 = text_inputs.get("slide_16", "@default")
-    date_slide_1 = text_inputs.get("slide_1_d", "@default")
-    hashtag_slide_1 = text_inputs.get("slide_1_htg", "@default")
-    date_slide_2 = text_inputs.get("slide_2_d", "@default")
-    hashtag_slide_2 = text_inputs.get("slide_2_htg", "@default")
-    date_slide_3 = text_inputs.get("slide_3_d", "@default")
-    hashtag_slide_3 = text_inputs.get("slide_3_htg", "@default")
-    slide_4_bullet1 = text_inputs.get("slide_4_b1", "@default")
-    slide_4_bullet2 = text_inputs.get("slide_4_b2", "@default")
-
-    # ---------- Extract Proposed Metrics Block (TextBox 2) ----------
-    try:
-        metrics = extract_proposed_metrics_anywhere(excel_df)
-    except Exception as e:
-        metrics = {"Impressions": "", "Engagements": "", "Influencers": ""}
-        print(f"Warning: Could not extract Proposed Metrics from Excel: {e}")
-
-    print("COLUMNS:", list(excel_df.columns))
-
-    if images and "slide_6" in images and images["slide_6"] is not None:
-        slide = prs.slides[5]
-        img_bytes = images["slide_6"].read()
-        temp_img_path = "temp_slide_6_img.jpg"
-        with open(temp_img_path, "wb") as f:
-            f.write(img_bytes)
-
-    # Read the image size in pixels
-        img = Image.open(temp_img_path)
-        img_width_px, img_height_px = img.size
-
-    # PowerPoint uses EMUs; there are 914400 EMUs per inch
-    # Typical image DPI is 96, so we convert pixels to inches
-        dpi = 96
-        img_width = int(img_width_px / dpi * 914400)
-        img_height = int(img_height_px / dpi * 914400)
-
-        for shape in slide.shapes:
-            if shape.name == "Picture 2":
-                left, top = shape.left, shape.top
-                box_width, box_height = shape.width, shape.height
-
-            # --- Resize if necessary ---
-                scale = min(
-                    box_width / img_width if img_width > box_width else 1.0,
-                    box_height / img_height if img_height > box_height else 1.0
-                )
-                final_width = int(img_width * scale)
-                final_height = int(img_height * scale)
-
-            # Optional: Center inside the box if smaller than box
-                final_left = left + int((box_width - final_width) / 2)
-                final_top = top + int((box_height - final_height) / 2)
-
-            # Remove the old placeholder/image
-                slide.shapes._spTree.remove(shape._element)
-
-            # Add image, resized if needed, centered in box
-                slide.shapes.add_picture(temp_img_path, final_left, final_top, width=final_width, height=final_height)
-                break
-
-
-    # Slide 7
-    slide = prs.slides[6]
-    if images and "slide_7_left" in images and images["slide_7_left"] is not None:
-        img_bytes = images["slide_7_left"].read()
-        temp_img_path = "temp_slide_7_left.jpg"
-        with open(temp_img_path, "wb") as f:
-            f.write(img_bytes)
-
-    # Get natural image size in pixels
-        img = Image.open(temp_img_path)
-        img_width_px, img_height_px = img.size
-
-    # PowerPoint units (EMU)
-        dpi = 96
-        img_width = int(img_width_px / dpi * 914400)
-        img_height = int(img_height_px / dpi * 914400)
-
-        for shape in slide.shapes:
-            if shape.name == "Picture 3":
-                box_left, box_top = shape.left, shape.top
-                box_width, box_height = shape.width, shape.height
+# Image Cache
+# ─────────────────────────────────────────────────────────────────────────────
+# PowerPoint uses EMUs; there are 914400 EMUs per inch.
+# Typical image DPI is 96, so we convert pixels to inches.
+EMU_PER_INCH = 914400
+IMAGE_DPI = 96
 
-            # Scale if needed
-                scale = min(
-                box_width / img_width if img_width > box_width else 1.0,
-                box_height / img_height if img_height > box_height else 1.0
-                )
-                final_width = int(img_width * scale)
-                final_height = int(img_height * scale)
+# Photos with a longer edge than this are downsampled once before embedding.
+# Placement still uses the original pixel size, so the layout is unchanged.
+MAX_IMAGE_EDGE_PX = 2400
 
-            # Center
-                final_left = box_left + int((box_width - final_width) / 2)
-                final_top = box_top + int((box_height - final_height) / 2)
 
-            # Remove old placeholder
-                slide.shapes._spTree.remove(shape._element)
+class CachedImage:
+    """Decoded size and embeddable bytes for one uploaded photo."""
 
-            # Add the image, centered & fitted
-                slide.shapes.add_picture(temp_img_path, final_left, final_top, width=final_width, height=final_height)
-                break
-    if images and "slide_7_right" in images and images["slide_7_right"] is not None:
-        img_bytes = images["slide_7_right"].read()
-        temp_img_path = "temp_slide_7_right.jpg"
-        with open(temp_img_path, "wb") as f:
-            f.write(img_bytes)
-
-        img = Image.open(temp_img_path)
-        img_width_px, img_height_px = img.size
-
-        dpi = 96
-        img_width = int(img_width_px / dpi * 914400)
-        img_height = int(img_height_px / dpi * 914400)
-
-        for shape in slide.shapes:
-            if shape.name == "Picture 2":
-                box_left, box_top = shape.left, shape.top
-                box_width, box_height = shape.width, shape.height
-
-                scale = min(
-                    box_width / img_width if img_width > box_width else 1.0,
-                    box_height / img_height if img_height > box_height else 1.0
-                )
-                final_width = int(img_width * scale)
-                final_height = int(img_height * scale)
-
-                final_left = box_left + int((box_width - final_width) / 2)
-                final_top = box_top + int((box_height - final_height) / 2)
-
-                slide.shapes._spTree.remove(shape._element)
-                slide.shapes.add_picture(temp_img_path, final_left, final_top, width=final_width, height=final_height)
-                break
+    def __init__(self, digest, width_px, height_px, blob):
+        self.digest = digest
+        self.width_px = width_px
+        self.height_px = height_px
+        self.blob = blob
 
-    # Slide 8 (FOUR images)
-    slide = prs.slides[7]
-    slide8_img_configs = [
-    ("slide_8_first",  "Picture 12", "temp_slide_8_first.jpg"),
-    ("slide_8_second", "Picture 13", "temp_slide_8_second.jpg"),
-    ("slide_8_third",  "Picture 16", "temp_slide_8_third.jpg"),
-    ("slide_8_fourth", "Picture 17", "temp_slide_8_fourth.jpg"),
-    ]
-
-    for img_key, shape_name, temp_path in slide8_img_configs:
-        if images and img_key in images and images[img_key] is not None:
-            img_bytes = images[img_key].read()
-            with open(temp_path, "wb") as f:
-                f.write(img_bytes)
-
-        img = Image.open(temp_path)
-        img_width_px, img_height_px = img.size
-
-        dpi = 96
-        img_width = int(img_width_px / dpi * 914400)
-        img_height = int(img_height_px / dpi * 914400)
-
-        for shape in slide.shapes:
-            if shape.name == shape_name:
-                box_left, box_top = shape.left, shape.top
-                box_width, box_height = shape.width, shape.height
-
-                scale = min(
-                    box_width / img_width if img_width > box_width else 1.0,
-                    box_height / img_height if img_height > box_height else 1.0
-                )
-                final_width = int(img_width * scale)
-                final_height = int(img_height * scale)
-
-                final_left = box_left + int((box_width - final_width) / 2)
-                final_top = box_top + int((box_height - final_height) / 2)
-
-                slide.shapes._spTree.remove(shape._element)
-                slide.shapes.add_picture(temp_path, final_left, final_top, width=final_width, height=final_height)
-                break
+    @property
+    def width_emu(self):
+        return int(self.width_px / IMAGE_DPI * EMU_PER_INCH)
 
+    @property
+    def height_emu(self):
+        return int(self.height_px / IMAGE_DPI * EMU_PER_INCH)
 
-    #slide 11 (Four images)
-    slide = prs.slides[10]
-    slide11_img_configs = [
-    ("slide_11_first", "Picture 26", "temp_slide_11_first.jpg"),
-    ("slide_11_second", "Picture 15", "temp_slide_11_second.jpg"),
-    ("slide_11_third", "Picture 27", "temp_slide_11_third.jpg"),
-    ("slide_11_fourth", "Picture 31", "temp_slide_11_fourth.jpg")
-    ]
-
-    for img_key, shape_name, temp_path in slide11_img_configs:
-        if images and img_key in images and images[img_key] is not None:
-            img_bytes = images[img_key].read()
-            with open(temp_path, "wb") as f:
-                f.write(img_bytes)
-
-        img = Image.open(temp_path)
-        img_width_px, img_height_px = img.size
-
-        dpi = 96
-        img_width = int(img_width_px / dpi * 914400)
-        img_height = int(img_height_px / dpi * 914400)
-
-        for shape in slide.shapes:
-            if shape.name == shape_name:
-                box_left, box_top = shape.left, shape.top
-                box_width, box_height = shape.width, shape.height
-
-                scale = min(
-                    box_width / img_width if img_width > box_width else 1.0,
-                    box_height / img_height if img_height > box_height else 1.0
-                )
-                final_width = int(img_width * scale)
-                final_height = int(img_height * scale)
-
-                final_left = box_left + int((box_width - final_width) / 2)
-                final_top = box_top + int((box_height - final_height) / 2)
-
-                slide.shapes._spTree.remove(shape._element)
-                slide.shapes.add_picture(temp_path, final_left, final_top, width=final_width, height=final_height)
-                break
-    # Social Posts & Stories
-    social_posts_value = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Number of Posts With Stories":
-                social_posts_value = row["Unnamed: 11"]
-                break
 
+class ImageCache:
+    """
+    LRU cache of uploaded photos keyed by the SHA-256 of their bytes.
+    The same photo uploaded to several slots, or reused across decks in one
+    run, is decoded and optimized only once.
+    """
 
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, data) -> CachedImage:
+        """`data` may be any bytes-like object; it is only copied on a miss, if it isn't bytes already."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = _decode_image(digest, bytes(data))
+        self.add(entry)
+        return entry
+
+    def lookup(self, digest):
+        """The cached entry for `digest`, or None; never decodes."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+            return entry
+
+    def add(self, entry):
+        """Cache an entry prepared elsewhere (e.g. loaded from the asset store)."""
+        with self._lock:
+            self._entries[entry.digest] = entry
+            self._entries.move_to_end(entry.digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _decode_image(digest, data):
+    from PIL import Image
+    img = Image.open(BytesIO(data))
+    width_px, height_px = img.size
+    blob = data
+    if max(width_px, height_px) > MAX_IMAGE_EDGE_PX:
+        img.thumbnail((MAX_IMAGE_EDGE_PX, MAX_IMAGE_EDGE_PX))
+        out = BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            img.save(out, format="PNG", optimize=True)
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=90, optimize=True)
+        blob = out.getvalue()
+    return CachedImage(digest, width_px, height_px, blob)
 
-    organic_views_impressions = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Organic (Views)":
-                organic_views_impressions = row["Unnamed: 11"]
-                break
 
+IMAGE_CACHE = ImageCache()
 
 
-    organic_reach_impressions = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Organic (Reach)":
-                organic_reach_impressions = row["Unnamed: 11"]
-                break
+def place_picture(slide, shape_name, img_src, image_cache=None):
+    """
+    Replace the placeholder picture `shape_name` on `slide` with the uploaded
+    image (or an already resolved CachedImage), scaled down to fit the
+    placeholder box and centered in it. Returns True if the placeholder was found.
+    """
+    if isinstance(img_src, CachedImage):
+        entry = img_src
+    else:
+        entry = (IMAGE_CACHE if image_cache is None else image_cache).get(upload_bytes(img_src))
+    img_width, img_height = entry.width_emu, entry.height_emu
 
-    impressions_paid = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Paid":
-                impressions_paid = row["Unnamed: 11"]
-                break
+    for shape in slide.shapes:
+        if shape.name == shape_name:
+            box_left, box_top = shape.left, shape.top
+            box_width, box_height = shape.width, shape.height
 
+            # Scale if needed
+            scale = min(
+                box_width / img_width if img_width > box_width else 1.0,
+                box_height / img_height if img_height > box_height else 1.0
+            )
+            final_width = int(img_width * scale)
+            final_height = int(img_height * scale)
 
+            # Center
+            final_left = box_left + int((box_width - final_width) / 2)
+            final_top = box_top + int((box_height - final_height) / 2)
 
-    # Engagements
-    engagements_value = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Engagements":
-                engagements_value = row["Unnamed: 11"]
-                break
+            # Remove old placeholder, add the image centered & fitted
+            slide.shapes._spTree.remove(shape._element)
+            slide.shapes.add_picture(BytesIO(entry.blob), final_left, final_top, width=final_width, height=final_height)
+            return True
+    return False
 
-    # Impressions
-    impressions_value = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            cell_value = str(row["Organic & Total"]).strip()
-            if cell_value in ("Total", "Total Impressions"):
-                impressions_value = row["Unnamed: 11"]
-                break
+# ─────────────────────────────────────────────────────────────────────────────
+# Recap Metrics Extraction
+# ─────────────────────────────────────────────────────────────────────────────
+def format_engagement_rate(rate):
+    """Sheet ER fraction (0.0456) → deck text ("4.56"); blank stays blank."""
+    if rate == "":
+        return ""
+    text = str(float(rate) * 100)
+    if text.startswith("0."):
+        text = text[1:]
+    dot_idx = text.find(".")
+    if dot_idx != -1:
+        text = text[:dot_idx + 3]
+    return text
+
+
+def _find_value(df, label_col, value_col, labels, last=False):
+    """
+    Return the `value_col` cell of the first row (or the last, if `last`)
+    whose `label_col` cell matches one of `labels`, or "" if none does (or
+    the columns are None: a block the sheet doesn't have).
+    """
+    if isinstance(labels, str):
+        labels = (labels,)
+    value = ""
+    if label_col in df.columns and value_col in df.columns:
+        # Plain lists rather than iterrows(), which builds a Series for every row
+        for label, row_value in zip(df[label_col].tolist(), df[value_col].tolist()):
+            if str(label).strip() in labels:
+                value = row_value
+                if not last:
+                    break
+    return value
+
+
+def _count(metrics, key):
+    """metrics[key] as an int, or a ValueError naming the metric the sheet is missing."""
+    value = metrics[key]
+    try:
+        return int(float(str(value).replace(",", "")))
+    except ValueError:
+        raise ValueError(f"{key!r} is missing or not a number in the sheet (got {value!r}).") from None
 
-    # Engagement Rate
-    engagement_rate_value = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Program ER":
-                engagement_rate_value = row["Unnamed: 11"]
-                engagement_rate_value = float(engagement_rate_value) * 100
-                engagement_rate_value = str(engagement_rate_value)
-                if engagement_rate_value.startswith("0."):
-                    engagement_rate_value = engagement_rate_value[1:]
-                dot_idx = engagement_rate_value.find(".")
-                if dot_idx != -1:
-                    engagement_rate_value = engagement_rate_value[:dot_idx + 3]
-                break
 
-    # Engagements & Impressions % INCREASE
-    engagements_increase = ""
-    impressions_increase = ""
+@instrumented("extract")
+def extract_recap_metrics(excel_df) -> dict:
+    """
+    Pull every value the recap deck needs out of the campaign sheet.
+    Returns a flat dict keyed by metric name; missing values are "".
+    """
+    import pandas as pd
+    # ---------- Extract Proposed Metrics Block (TextBox 2) ----------
     try:
-        engagement_val = excel_df.at[5, "Unnamed: 15"]
-        impression_val = excel_df.at[4, "Unnamed: 15"]
-        if pd.notna(engagement_val):
-            engagements_increase = f"{float(engagement_val) * 100:.1f}%"
-        if pd.notna(impression_val):
-            impressions_increase = f"{float(impression_val) * 100:.1f}%"
+        proposed = extract_proposed_metrics_anywhere(excel_df)
     except Exception as e:
-        print("could not find value")
+        proposed = {"Impressions": "", "Engagements": "", "Influencers": ""}
+        print(f"Warning: Could not extract Proposed Metrics from Excel: {e}", file=sys.stderr)
 
-    print("Engagements % increase:", engagements_increase)
-    print("Impressions % increase:", impressions_increase)
+    # Diagnostics go to stderr, so callers writing JSON/CSV to stdout (extract.py) stay clean
+    print("COLUMNS:", list(excel_df.columns), file=sys.stderr)
 
-    # Organic Likes
-    organic_likes = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Likes":
-                organic_likes = row["Unnamed: 11"]
-                break
+    # Label/value columns are located by their labels (cached per layout), not by pandas' "Unnamed: N" names
+    layout = LAYOUT_CACHE.get(excel_df)
+    organic = lambda label, **kw: _find_value(excel_df, *layout.columns["organic"], label, **kw)
+    paid = lambda label: _find_value(excel_df, *layout.columns["paid"], label)
+    # The cost block and influencer count are optional (None when the sheet has none): those metrics stay ""
+    cost = lambda label: _find_value(excel_df, *(layout.columns["cost"] or (None, None)), label)
 
-    # Organic Comments
-    organic_comments = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Comments":
-                organic_comments = row["Unnamed: 11"]
-                break
+    m = {"proposed_metrics": proposed}
 
-    # Organic Shares
-    organic_shares = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Shares":
-                organic_shares = row["Unnamed: 11"]
-                break
+    # Social Posts & Stories, Impressions breakdown
+    m["social_posts_value"] = organic("Total Number of Posts With Stories")
+    m["organic_views_impressions"] = organic("Organic (Views)")
+    m["organic_reach_impressions"] = organic("Organic (Reach)")
+    m["impressions_paid"] = organic("Paid")
 
-    # Organic Saves
-    organic_saves = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Saves":
-                organic_saves = row["Unnamed: 11"]
-                break
-    
-    paid_engagements = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Paid Engagements":
-                paid_engagements = row["Unnamed: 11"]
-                break
-    
-    paid_likes = ""
-    if "Unnamed: 14" in excel_df.columns and "Dates" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Reactions":
-                paid_likes = row["Dates"]
-                break
+    # Engagements & Impressions
+    m["engagements_value"] = organic("Total Engagements")
+    m["impressions_value"] = organic(("Total", "Total Impressions"))
 
-    paid_comments = ""
-    if "Unnamed: 14" in excel_df.columns and "Dates" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Comments":
-                paid_comments = row["Dates"]
-                break
-    
-    paid_shares = ""
-    if "Unnamed: 14" in excel_df.columns and "Dates" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Shares":
-                paid_shares = row["Dates"]
-                break
+    # Engagement Rate
+    m["engagement_rate_value"] = format_engagement_rate(organic("Program ER"))
+
+    # Engagements & Impressions % INCREASE
+    increases = {}
+    for name, cell in layout.increase_cells.items():
+        value = excel_df.at[cell] if cell is not None else None
+        increases[name] = f"{float(value) * 100:.1f}%" if value is not None and pd.notna(value) else ""
+    engagements_increase = increases["engagements"]
+    impressions_increase = increases["impressions"]
+
+    print("Engagements % increase:", engagements_increase, file=sys.stderr)
+    print("Impressions % increase:", impressions_increase, file=sys.stderr)
+    m["engagements_increase"] = engagements_increase
+    m["impressions_increase"] = impressions_increase
+
+    # Organic engagement
+    m["organic_likes"] = organic("Total Likes")
+    m["organic_comments"] = organic("Total Comments")
+    m["organic_shares"] = organic("Total Shares")
+    m["organic_saves"] = organic("Total Saves")
+    m["paid_engagements"] = organic("Paid Engagements")
+
+    # Paid engagement
+    m["paid_likes"] = paid("Reactions")
+    m["paid_comments"] = paid("Comments")
+    m["paid_shares"] = paid("Shares")
+    m["paid_saves"] = paid("Saves")
+    m["paid_threesec"] = paid("3 sec vid views")
+
+    m["influencer_count"] = _find_value(excel_df, *(layout.columns["influencers"] or (None, None)), "Influencers")
 
-    
-    influencer_count = ""
-    if "Dates" in excel_df.columns and "Unnamed: 14" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Dates"]).strip() == "Influencers":
-                influencer_count = row["Unnamed: 14"]
-                break
-    
     diversity_value = ""
     diversity_col = None
 
-# Normalize column names to string and strip whitespace
+    # Normalize column names to string and strip whitespace
     for col in excel_df.columns:
         if str(col).strip().lower() == "diversity":
             diversity_col = col
             break
 
     if diversity_col is not None:
-    # Try to get the first non-empty, non-nan value under the Diversity column
+        # Try to get the first non-empty, non-nan value under the Diversity column
         for val in excel_df[diversity_col]:
             if pd.notna(val) and str(val).strip() != "":
                 diversity_value = str(val).strip()
                 break
-    
-
-
-    paid_saves = ""
-    if "Unnamed: 14" in excel_df.columns and "Dates" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Saves":
-                paid_saves = row["Dates"]
-                break 
-    
-    paid_threesec = ""
-    if "Unnamed: 14" in excel_df.columns and "Dates" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "3 sec vid views":
-                paid_threesec = row["Dates"]
-                break
-    
-    total_post_engagements = (
-    int(organic_likes) + int(organic_comments) + int(organic_shares) + int(organic_saves)
-    + int(paid_likes) + int(paid_comments) + int(paid_shares) + int(paid_saves) + int(paid_threesec)
-)
-    
-    story_engagements = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Story Engagements":
-                story_engagements = row["Unnamed: 11"]
-                break
+    m["diversity_value"] = diversity_value
+
+    m["total_post_engagements"] = sum(_count(m, key) for key in (
+        "organic_likes", "organic_comments", "organic_shares", "organic_saves",
+        "paid_likes", "paid_comments", "paid_shares", "paid_saves", "paid_threesec",
+    ))
+    m["story_engagements"] = organic("Total Story Engagements")
+    m["total_engagements"] = organic("Total Engagements")
+
+    # Paid social costs & video plays
+    m["cpe"] = cost("CPE")
+    m["cpc"] = cost("CPC")
+    m["ctr"] = cost("CTR")
+    m["cpm"] = cost("CPM")
+    m["thruplays"] = cost("ThruPlays")
+    m["p25"] = cost("0.25")
+    m["p50"] = cost("0.5")
+    m["p75"] = cost("0.75")
+    m["p100"] = cost("1")
+
+    # Click2Cart
+    m["c2c_transfer"] = organic("C2C Transfers")
+    m["c2c_value"] = organic("C2C Value", last=True)
+    return m
 
-    total_engagements = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Engagements":
-                total_engagements = row["Unnamed: 11"]
-                break
+# ─────────────────────────────────────────────────────────────────────────────
+# Slide Fills
+# ─────────────────────────────────────────────────────────────────────────────
+# Each fill takes (slide, metrics, text, images): the slide to edit, the dict
+# from extract_recap_metrics(), the UI text inputs and the resolved images.
 
-    cpe = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CPE":
-                cpe = row["Unnamed: 17"]
-                break
-    
-    cpc = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CPC":
-                cpc = row["Unnamed: 17"]
-                break
+def _fill_title_slide(slide, date_box, hashtag_box, date, hashtag):
+    edits = TextEdits()
+    edits.shape(date_box).replace_paragraph("January 1, 2025 – February 1, 2025", date)
+    edits.shape(hashtag_box).replace_paragraph("#CampaignHashtag", hashtag)
+    edits.apply(slide)
 
-    ctr = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CTR":
-                ctr = row["Unnamed: 17"]
-                break
 
-    cpm = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CPM":
-                cpm = row["Unnamed: 17"]
-                break
-    
+def _fill_slide_1(slide, metrics, text, images):
+    _fill_title_slide(slide, "TextBox 5", "TextBox 6",
+                      text.get("slide_1_d", "@default"), text.get("slide_1_htg", "@default"))
 
-    thruplays = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "ThruPlays":
-                thruplays = row["Unnamed: 17"]
-                break
 
-    p25 = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "0.25":
-                p25 = row["Unnamed: 17"]
-                break
+def _fill_slide_2(slide, metrics, text, images):
+    _fill_title_slide(slide, "TextBox 7", "TextBox 8",
+                      text.get("slide_2_d", "@default"), text.get("slide_2_htg", "@default"))
+
+
+def _fill_slide_3(slide, metrics, text, images):
+    _fill_title_slide(slide, "TextBox 7", "TextBox 8",
+                      text.get("slide_3_d", "@default"), text.get("slide_3_htg", "@default"))
+
+
+def _fill_slide_4(slide, metrics, text, images):
+    proposed = metrics["proposed_metrics"]
+    edits = TextEdits()
 
-    p50 = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "0.5":
-             p50 = row["Unnamed: 17"]
-             break
-
-    p75 = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "0.75":
-             p75 = row["Unnamed: 17"]
-             break
-
-    p100 = ""
-    if "Unnamed: 18" in excel_df.columns and "Unnamed: 17" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-         if str(row["Unnamed: 18"]).strip() == "1":
-            p100 = row["Unnamed: 17"]
-            break
-    
-    c2c_transfer = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "C2C Transfers":
-                c2c_transfer = row["Unnamed: 11"]
-                break
-    
-    c2c_value = ""
-    if "Organic & Total" in excel_df.columns and "Unnamed: 11" in excel_df.columns:
-        for _, row in excel_df.iterrows():
-            if str(row["Organic & Total"]).strip() == "C2C Value": 
-                c2c_value = row["Unnamed: 11"]
-         
-    
     # Fill TextBox 2 (Proposed Metrics)
-    slide = prs.slides[3]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 2":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                if "Proposed Influencers" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(metrics.get("Influencers", "")))
-                elif "Proposed Engagements" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(metrics.get("Engagements", "")))
-                elif "Proposed Impressions" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(metrics.get("Impressions", "")))
-                
-
-            
+    proposed_box = edits.shape("TextBox 2")
+    for key in ("Influencers", "Engagements", "Impressions"):
+        proposed_box.replace("#", proposed.get(key, ""), within=f"Proposed {key}")
 
     # Fill TextBox 15 (Program Overview)
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 15":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                if "Influencers" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(influencer_count))
-                elif "Diversity Rate" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(diversity_value))
-                # Social Posts & Stories
-                elif "Social Posts & Stories" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(social_posts_value))
-                # Engagement Rate
-                elif "Engagement Rate" in text:
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(engagement_rate_value))
-                # Engagements (main)
-                elif "Engagements" in text and "#% increase" in text:
-                    main_done = False
-                    percent_done = False
-                    for run in para.runs:
-                        if "#" in run.text and not main_done and "% increase" not in run.text:
-                            run.text = run.text.replace("#", str(engagements_value), 1)
-                            main_done = True
-                        if "#% increase" in run.text and not percent_done:
-                            run.text = run.text.replace("#", str(engagements_increase), 1)
-                            percent_done = True
-                # Impressions (main)
-                elif "Impressions" in text and "#% increase" in text:
-                    main_done = False
-                    percent_done = False
-                    for run in para.runs:
-                        if "#" in run.text and not main_done and "% increase" not in run.text:
-                            run.text = run.text.replace("#", str(impressions_value), 1)
-                            main_done = True
-                        if "#% increase" in run.text and not percent_done:
-                            run.text = run.text.replace("#", str(impressions_increase), 1)
-                            percent_done = True
-
-    # Fill TextBox 19 (Slide 9 vertical fields)
-    slide = prs.slides[8]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 19":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "10" in run.text and "K" in run.text:
-                        run.text = run.text.replace("10", str(organic_likes))
-                        run.text = run.text.replace("K", "")
-                    if "20" in run.text and "K" in run.text:
-                        run.text = run.text.replace("20", str(organic_comments))
-                        run.text = run.text.replace("K", "")
-                    if "30" in run.text and "K" in run.text:
-                        run.text = run.text.replace("30", str(organic_shares))
-                        run.text = run.text.replace("K", "")
-                    if "40" in run.text and "K" in run.text:
-                        run.text = run.text.replace("40", str(organic_saves))
-                        run.text = run.text.replace("K", "")
-
-# Paid – TextBox 11
-    slide = prs.slides[8]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 11":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "10" in run.text and "K" in run.text:
-                        run.text = run.text.replace("10", str(paid_likes))
-                        run.text = run.text.replace("K", "")
-                    if "20" in run.text and "K" in run.text:
-                        run.text = run.text.replace("20", str(paid_comments))
-                        run.text = run.text.replace("K", "")
-                    if "30" in run.text and "K" in run.text:
-                        run.text = run.text.replace("30", str(paid_shares))
-                        run.text = run.text.replace("K", "")
-                    if "40" in run.text and "K" in run.text:
-                        run.text = run.text.replace("40", str(paid_saves))
-                        run.text = run.text.replace("K", "")
-                    if "##" in run.text and "K" in run.text:
-                        run.text = run.text.replace("##", str(paid_threesec))
-                        run.text = run.text.replace("K", "")
-    
-    #slide 9 last boxes
-    slide = prs.slides[8]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 34":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "100" in run.text and "K" in run.text:
-                        run.text = run.text.replace("100", str(total_post_engagements))
-                        run.text = run.text.replace("K", "")
-                    if "200" in run.text and "K" in run.text:
-                        run.text = run.text.replace("200", str(story_engagements))
-                        run.text = run.text.replace("K", "")
-        
-        elif shape.has_text_frame and shape.name == "TextBox 18":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "222" in run.text and "K" in run.text:
-                        run.text = run.text.replace("222", str(total_engagements))
-                        run.text = run.text.replace("K", "")
-
-
-    #slide 10
-    slide = prs.slides[9]
-    for shape in slide.shapes:
-            if shape.has_text_frame and shape.name == "TextBox 18":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(organic_reach_impressions))
-
-            elif shape.has_text_frame and shape.name == "TextBox 19":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(impressions_paid))
-            
-            elif shape.has_text_frame and shape.name == "TextBox 21":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(organic_views_impressions))
-           
-            elif shape.has_text_frame and shape.name == "TextBox 29":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(impressions_value))
-    
-
-    #slide 11
-    slide = prs.slides[10]
-    for shape in slide.shapes:
-            if shape.has_text_frame and shape.name == "TextBox 18":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(organic_reach_impressions))
-
-            elif shape.has_text_frame and shape.name == "TextBox 19":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(impressions_paid))
-            
-            elif shape.has_text_frame and shape.name == "TextBox 21":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(organic_views_impressions))
-           
-            elif shape.has_text_frame and shape.name == "TextBox 29":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(impressions_value))
-    
-    
-    #slide 6 text
-    slide = prs.slides[5]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 9":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "influencerhandle" in run.text:
-                        run.text = run.text.replace("influencerhandle", handle_slide_6)
-
-    #slide 7 text
-    slide = prs.slides[6]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 6":
-            if "Organic" in shape.text:
-                hashtag_values = [slide_7_likes, slide_7_comments, slide_7_views, slide_7_reach]
-                value_index = 0
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                # Replace influencer handle
-                        if "influencerhandle" in run.text:
-                            run.text = run.text.replace("influencerhandle", handle_slide_7_left)
-                # Replace hashtags one by one in order
-                        if "#" in run.text and value_index < len(hashtag_values):
-                            run.text = run.text.replace("#", str(hashtag_values[value_index]))
-                            value_index += 1
-            elif "Paid" in shape.text:
-                hashtag_values_paid = [slide_7_engagements, slide_7_impressions]
-                value_index = 0
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "influencerhandle" in run.text:
-                            run.text = run.text.replace("influencerhandle", handle_slide_7_right)
-                        if "#" in run.text and value_index < len(hashtag_values_paid):
-                            run.text = run.text.replace("#", str(hashtag_values_paid[value_index]))
-                            value_index += 1
-
-    
-    #slide 12
-
-
-    slide = prs.slides[11]
-    label_to_value = {
-    "CPE": str(cpe),
-    "CPC": str(cpc),
-    "CTR": str(ctr),
-    "CPM": str(cpm),
+    overview = edits.shape("TextBox 15")
+    overview.replace("#", metrics["influencer_count"], within="Influencers")
+    overview.replace("#", metrics["diversity_value"], within="Diversity Rate")
+    overview.replace("#", metrics["social_posts_value"], within="Social Posts & Stories")
+    overview.replace("#", metrics["engagement_rate_value"], within="Engagement Rate")
+    for kind in ("engagements", "impressions"):
+        # Main value and % increase share the paragraph
+        line = f"{kind.title()} (#% increase)"
+        overview.replace("#% increase", f"{metrics[f'{kind}_increase']}% increase", within=line)
+        overview.replace("#", metrics[f"{kind}_value"], count=1, within=line)
+
+    # Program goals
+    goals = edits.shape("TextBox 10")
+    goals.replace_paragraph("Create excitement and promote (brand) products available at (retailer).",
+                            text.get("slide_4_b1", "@default"))
+    goals.replace_paragraph("Encourage shoppers to purchase the (brand and products)…",
+                            text.get("slide_4_b2", "@default"))
+    edits.apply(slide)
+
+
+# Slide 5's influencer boxes, in reading order; a list of records fills them in turn
+SLIDE_5_BOXES = ["TextBox 62", "TextBox 13", "TextBox 9", "TextBox 15", "TextBox 11", "TextBox 17"]
+
+
+def _fill_slide_5(slide, metrics, text, images):
+    boxes = text.get("influencer_boxes", {})
+    leftover = []
+    if isinstance(boxes, list):
+        # On a short (last) page the boxes without a record are emptied, not left as placeholders
+        leftover = SLIDE_5_BOXES[len(boxes):] if boxes else []
+        boxes = dict(zip(SLIDE_5_BOXES, boxes))
+    edits = TextEdits()
+    for shape_name, replacements in boxes.items():
+        # Combine city/state if needed
+        city_state = f"{replacements.get('City','')}, {replacements.get('State','')}".strip(", ")
+        (edits.shape(shape_name)
+         .replace("influencerhandle", replacements.get("influencerhandle", ""))
+         .replace("##", replacements.get("##", ""))
+         .replace("City, State", city_state)
+         .replace("Verbatim", replacements.get("Verbatim", "")))
+    for shape_name in leftover:
+        edits.shape(shape_name).clear()
+    edits.apply(slide)
+
+
+def _fill_slide_6(slide, metrics, text, images):
+    if images.get("slide_6") is not None:
+        place_picture(slide, "Picture 2", images["slide_6"])
+
+    edits = TextEdits()
+    edits.shape("TextBox 9").replace("influencerhandle", text.get("slide_6", "@default"))
+    edits.apply(slide)
+
+
+def _fill_slide_7(slide, metrics, text, images):
+    if images.get("slide_7_left") is not None:
+        place_picture(slide, "Picture 3", images["slide_7_left"])
+    if images.get("slide_7_right") is not None:
+        place_picture(slide, "Picture 2", images["slide_7_right"])
+
+    # Two "TextBox 6" boxes, told apart by their heading; each "#" gets the next value in order
+    edits = TextEdits()
+    (edits.shape("TextBox 6", containing="Organic")
+     .replace("influencerhandle", text.get("slide_7_left", "@default"))
+     .replace_each("#", [text.get(k, "@default") for k in
+                         ("slide_7_like", "slide_7_comment", "slide_7_view", "slide_7_reaches")]))
+    (edits.shape("TextBox 6", containing="Paid")
+     .replace("influencerhandle", text.get("slide_7_right", "@default"))
+     .replace_each("#", [text.get(k, "@default") for k in ("slide_7_eng", "slide_7_impr")]))
+    edits.apply(slide)
+
+
+SLIDE_8_PICTURES = [
+    ("slide_8_first",  "Picture 12"),
+    ("slide_8_second", "Picture 13"),
+    ("slide_8_third",  "Picture 16"),
+    ("slide_8_fourth", "Picture 17"),
+]
+
+
+def _fill_slide_8(slide, metrics, text, images):
+    for img_key, shape_name in SLIDE_8_PICTURES:
+        if images.get(img_key) is not None:
+            place_picture(slide, shape_name, images[img_key])
+
+    # The n-th "TextBox 6" takes the n-th influencer: handle first, then one metric per paragraph
+    metric_keys = ["# Likes", "# Comments", "# Views", "# Social Reach"]
+    records = text.get("influencer_boxestwo", [])
+    edits = TextEdits()
+    for box_index, replacements in enumerate(records):
+        box = edits.shape("TextBox 6", nth=box_index)
+        box.replace("influencerhandle", replacements.get("influencerhandle", ""), paragraph=0)
+        for para_idx, key in enumerate(metric_keys, 1):
+            box.replace("#", replacements.get(key, ""), paragraph=para_idx)
+    # Boxes past the last record on a short page are emptied
+    for box_index in range(len(records) if records else len(SLIDE_8_PICTURES), len(SLIDE_8_PICTURES)):
+        edits.shape("TextBox 6", nth=box_index).clear()
+    edits.apply(slide)
+
+
+def _replace_thousands(box, values):
+    """Swap the template's "<n> K" sample numbers for real values, dropping the K."""
+    for sample, value in values:
+        box.replace(f"{sample} K", f"{value} ").replace(f"{sample}K", value)
+
+
+def _fill_slide_9(slide, metrics, text, images):
+    edits = TextEdits()
+    # Organic
+    _replace_thousands(edits.shape("TextBox 19"), [
+        ("10", metrics["organic_likes"]), ("20", metrics["organic_comments"]),
+        ("30", metrics["organic_shares"]), ("40", metrics["organic_saves"]),
+    ])
+    # Paid
+    _replace_thousands(edits.shape("TextBox 11"), [
+        ("10", metrics["paid_likes"]), ("20", metrics["paid_comments"]),
+        ("30", metrics["paid_shares"]), ("40", metrics["paid_saves"]),
+        ("##", metrics["paid_threesec"]),
+    ])
+    _replace_thousands(edits.shape("TextBox 34"), [
+        ("100", metrics["total_post_engagements"]), ("200", metrics["story_engagements"]),
+    ])
+    _replace_thousands(edits.shape("TextBox 18"), [("222", metrics["total_engagements"])])
+    # Replace entire line if it matches the placeholder
+    edits.shape("TextBox 2").replace_paragraph(
+        "Total engagements outperformed proposed estimated engagements (#) by #%.", text.get("slide_9", "@default"))
+    edits.apply(slide)
+
+
+def _fill_impressions_summary(slide, metrics):
+    box_values = {
+        "TextBox 18": metrics["organic_reach_impressions"],
+        "TextBox 19": metrics["impressions_paid"],
+        "TextBox 21": metrics["organic_views_impressions"],
+        "TextBox 29": metrics["impressions_value"],
     }
+    edits = TextEdits()
+    for shape_name, value in box_values.items():
+        edits.shape(shape_name).replace("#", value)
+    edits.apply(slide)
 
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 6":
-        # Find the right TextBox 6 by its content
-            if any(label in para.text for label in label_to_value.keys() for para in shape.text_frame.paragraphs):
-                for para in shape.text_frame.paragraphs:
-                    for label, value in label_to_value.items():
-                        if label in para.text:
-                        # Prepend value and a space to the first run
-                            if para.runs:
-                                para.runs[0].text = f"{value} " + para.runs[0].text
-                            break  # Only update once per paragraph
-                break
 
+def _fill_slide_10(slide, metrics, text, images):
+    _fill_impressions_summary(slide, metrics)
 
-# For ThruPlays
-    slide = prs.slides[11]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 6":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "# ThruPlays":
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(thruplays))
-# ...existing code...
 
+SLIDE_11_PICTURES = [
+    ("slide_11_first", "Picture 26"),
+    ("slide_11_second", "Picture 15"),
+    ("slide_11_third", "Picture 27"),
+    ("slide_11_fourth", "Picture 31"),
+]
 
 
-    slide = prs.slides[11]
-    for shape in slide.shapes:
-            if shape.has_text_frame and shape.name == "TextBox 13":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(p25))
-
-            elif shape.has_text_frame and shape.name == "TextBox 11":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(p50))
-            
-            elif shape.has_text_frame and shape.name == "TextBox 3":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(p75))
-           
-            elif shape.has_text_frame and shape.name == "TextBox 26":
-                for para in shape.text_frame.paragraphs:
-                    text = para.text.strip()
-                    for run in para.runs:
-                        if "#" in run.text:
-                            run.text = run.text.replace("#", str(p100))
-
-
-
-#slide 4 program goals
-    slide = prs.slides[3]  # Or whatever index slide 4 actually is (Python is 0-based)
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 10":
-            for para in shape.text_frame.paragraphs:
-            # Bullet 1
-                if para.text.strip() == "Create excitement and promote (brand) products available at (retailer).":
-                    if para.runs:
-                        para.runs[0].text = str(slide_4_bullet1)
-                        for run in para.runs[1:]:
-                            run.text = ""
-            # Bullet 2
-                if para.text.strip() == "Encourage shoppers to purchase the (brand and products)…":
-                    if para.runs:
-                        para.runs[0].text = str(slide_4_bullet2)
-                        for run in para.runs[1:]:
-                            run.text = ""
-
-
-# Slide 9 text (replace entire line if it matches the placeholder)
-    slide = prs.slides[8]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 2":
-            for para in shape.text_frame.paragraphs:
-            # Check if the entire paragraph matches the placeholder
-                if para.text.strip() == "Total engagements outperformed proposed estimated engagements (#) by #%.":
-                # Replace all runs in this paragraph with the new text, preserving formatting of the first run
-                    if para.runs:
-                        para.runs[0].text = str(text_slide_9)
-                    # Clear out any extra runs (if present)
-                        for run in para.runs[1:]:
-                            run.text = ""
-    
-    #slide 1 input
-    slide = prs.slides[0]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 5":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "January 1, 2025 – February 1, 2025":
-                    if para.runs:
-                        para.runs[0].text = str(date_slide_1)
-                        for run in para.runs[1:]:
-                            run.text = ""
-        if shape.has_text_frame and shape.name == "TextBox 6":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "#CampaignHashtag":
-                    if para.runs:
-                        para.runs[0].text = str(hashtag_slide_1)
-                        for run in para.runs[1:]:
-                            run.text = ""
-
-#slide 2 input
-    slide = prs.slides[1]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 7":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "January 1, 2025 – February 1, 2025":
-                    if para.runs:
-                        para.runs[0].text = str(date_slide_2)
-                        for run in para.runs[1:]:
-                            run.text = ""
-        if shape.has_text_frame and shape.name == "TextBox 8":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "#CampaignHashtag":
-                    if para.runs:
-                        para.runs[0].text = str(hashtag_slide_2)
-                        for run in para.runs[1:]:
-                            run.text = ""
-
-#slide 3 input
-    slide = prs.slides[2]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 7":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "January 1, 2025 – February 1, 2025":
-                    if para.runs:
-                        para.runs[0].text = str(date_slide_3)
-                        for run in para.runs[1:]:
-                            run.text = ""
-        if shape.has_text_frame and shape.name == "TextBox 8":
-            for para in shape.text_frame.paragraphs:
-                if para.text.strip() == "#CampaignHashtag":
-                    if para.runs:
-                        para.runs[0].text = str(hashtag_slide_3)
-                        for run in para.runs[1:]:
-                            run.text = ""
+def _fill_slide_11(slide, metrics, text, images):
+    for img_key, shape_name in SLIDE_11_PICTURES:
+        if images.get(img_key) is not None:
+            place_picture(slide, shape_name, images[img_key])
+    _fill_impressions_summary(slide, metrics)
 
 
+def _fill_slide_12(slide, metrics, text, images):
+    edits = TextEdits()
 
+    # Cost metrics: prepend the value to its label in the cost box
+    costs = edits.shape("TextBox 6", containing="CPE")
+    for label in ("CPE", "CPC", "CTR", "CPM"):
+        costs.prefix(metrics[label.lower()], within=label)
 
+    # For ThruPlays
+    edits.shape("TextBox 6").replace("#", metrics["thruplays"], within="# ThruPlays")
 
+    box_values = {
+        "TextBox 13": metrics["p25"],
+        "TextBox 11": metrics["p50"],
+        "TextBox 3": metrics["p75"],
+        "TextBox 26": metrics["p100"],
+    }
+    for shape_name, value in box_values.items():
+        edits.shape(shape_name).replace("#", value)
+    edits.apply(slide)
 
-    influencer_boxes = text_inputs.get("influencer_boxes", {})
-    influencer_boxestwo = text_inputs.get("influencer_boxestwo", [])
 
-#slide 5 text inputs
-    slide = prs.slides[4]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name in influencer_boxes:
-            replacements = influencer_boxes[shape.name]
-        # Combine city/state if needed
-            city_state = f"{replacements.get('City','')}, {replacements.get('State','')}".strip(", ")
-            for para in shape.text_frame.paragraphs:
-                for run in para.runs:
-                # Replace handle
-                    if "influencerhandle" in run.text:
-                        run.text = run.text.replace("influencerhandle", replacements.get("influencerhandle", ""))
-                # Replace reach
-                    if "##" in run.text:
-                        run.text = run.text.replace("##", replacements.get("##", ""))
-                # Replace city, state
-                    if "City, State" in run.text:
-                        run.text = run.text.replace("City, State", city_state)
-                # Replace verbatim (with or without quotes)
-                    if "Verbatim" in run.text:
-                        run.text = run.text.replace("Verbatim", replacements.get("Verbatim", ''))
-                    elif "Verbatim" in run.text:
-                        run.text = run.text.replace("Verbatim", replacements.get("Verbatim", ""))
-
-#slide 8 text inputs
-    slide = prs.slides[7]  # Use your slide index
-    box_index = 0
-    metric_keys = ["# Likes", "# Comments", "# Views", "# Social Reach"]
+def _fill_slide_13(slide, metrics, text, images):
+    edits = TextEdits()
+    edits.shape("TextBox 5").replace("10.6K", metrics["c2c_transfer"])
+    edits.shape("TextBox 21").replace("27K", metrics["c2c_value"])
+    edits.shape("TextBox 3").replace("00/00/00 – 00/00/00", text.get("slide_13", "@default"))
+    edits.apply(slide)
 
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 6":
-            if box_index < len(influencer_boxestwo):
-                replacements = influencer_boxestwo[box_index]
-                paras = shape.text_frame.paragraphs
-
-            # First paragraph: influencerhandle
-                if len(paras) > 0:
-                    for run in paras[0].runs:
-                        if "influencerhandle" in run.text:
-                            run.text = run.text.replace("influencerhandle", replacements.get("influencerhandle", ""))
-
-            # Next paragraphs: metrics
-                for i, key in enumerate(metric_keys):
-                    para_idx = i + 1  # starts from second paragraph
-                    if para_idx < len(paras):
-                        for run in paras[para_idx].runs:
-                            if "#" in run.text:
-                                run.text = run.text.replace("#", replacements.get(key, ""))
-
-            box_index += 1
-            
-
-#slide 13 data
-    slide = prs.slides[12]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 5":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "10.6K" in run.text:
-                        run.text = run.text.replace("10.6K", str(c2c_transfer))
-        if shape.has_text_frame and shape.name == "TextBox 21":
-            for para in shape.text_frame.paragraphs:
-                text = para.text.strip()
-                for run in para.runs:
-                    if "27K" in run.text:
-                        run.text = run.text.replace("27K", str(c2c_value))
-
-
-#slide 13 text
-    slide = prs.slides[12]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 3":
-            for para in shape.text_frame.paragraphs:
-                for run in para.runs:
-                    if "00/00/00 – 00/00/00" in run.text:
-                        run.text = run.text.replace("00/00/00 – 00/00/00", str(text_slide_13))
 
+SLIDE_15_QUESTION = (
+    "On a scale from 1 to 10, 10 being the most likely, how likely would you be able to recommend "
+    "Ticket to Ride/Ticket to Ride: San Francisco to family and friends?"
+)
 
-#slide 15 text
-    slide = prs.slides[14]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 5":
-            for para in shape.text_frame.paragraphs:
-                for run in para.runs:
-                    if "On a scale from 1 to 10, 10 being the most likely, how likely would you be able to recommend Ticket to Ride/Ticket to Ride: San Francisco to family and friends?" in run.text:
-                        run.text = run.text.replace("On a scale from 1 to 10, 10 being the most likely, how likely would you be able to recommend Ticket to Ride/Ticket to Ride: San Francisco to family and friends?", str(text_slide_15))
 
+def _fill_slide_15(slide, metrics, text, images):
+    edits = TextEdits()
+    edits.shape("TextBox 5").replace(SLIDE_15_QUESTION, text.get("slide_15", "@default"))
+    edits.apply(slide)
 
-#slide 16 text
-    slide = prs.slides[15]
-    for shape in slide.shapes:
-        if shape.has_text_frame and shape.name == "TextBox 5":
-            found = False  # Track if we've already inserted the user text
-            paras_to_remove = []
-            for i, para in enumerate(shape.text_frame.paragraphs):
-                text = para.text.strip()
-                if (
-                text == "What were your favorite parts of the game night"
-                or text == "Playing Ticket to Ride: San Francisco?"
-                ):
-                    if not found:
-                        if para.runs:
-                            para.runs[0].text = str(text_slide_16)
-                            for run in para.runs[1:]:
-                                run.text = ""
-                        found = True  # Only insert user entry once
-                    else:
-                    # Mark this extra placeholder paragraph for removal
-                        paras_to_remove.append(i)
-        # Remove the second matched paragraph (after loop, so we don't break indexing)
-        # Remove from the end so earlier indices remain correct
-            for idx in reversed(paras_to_remove):
-                shape.text_frame._element.remove(shape.text_frame.paragraphs[idx]._element)
-
-
-
-
-
-         
+
+def _fill_slide_16(slide, metrics, text, images):
+    # The question spans two placeholder paragraphs: the first takes the user text, the second goes
+    edits = TextEdits()
+    (edits.shape("TextBox 5")
+     .replace_paragraph("What were your favorite parts of the game night", text.get("slide_16", "@default"))
+     .remove_paragraph("Playing Ticket to Ride: San Francisco?"))
+    edits.apply(slide)
+
+
+class SlideFill:
+    """
+    One slide's fill step plus the inputs it reads: metric keys, text_inputs
+    keys and image slots. The inputs decide when the slide must be rebuilt.
+
+    A fill with `paginate=(text key, per page)` takes a list of records under
+    that key and spreads it over as many copies of its slide as needed (see
+    paginate_slide_fills()); page n > 1 reads image slots "<slot>_<n>".
+    """
+
+    def __init__(self, index, fill, metrics=(), text=(), images=(), key=None, paginate=None, page=0, origin=None):
+        self.index = index
+        self.fill = fill
+        self.metrics = tuple(metrics)
+        self.text = tuple(text)
+        self.images = tuple(images)
+        # Stable name for the slide ("slide_4"), whatever index a template puts it at
+        self.key = key or f"slide_{index + 1}"
+        self.paginate = paginate
+        self.page = page
+        # Index of the template slide this one is a copy of
+        self.origin = index if origin is None else origin
+
+    def at(self, index):
+        """The same fill step targeting slide `index` of another template."""
+        return SlideFill(index, self.fill, self.metrics, self.text, self.images, key=self.key,
+                         paginate=self.paginate)
+
+    def pages(self, text_inputs) -> int:
+        """How many slides this fill's records need (1 unless it paginates a list)."""
+        if self.paginate is None:
+            return 1
+        key, per_page = self.paginate
+        records = text_inputs.get(key)
+        if not isinstance(records, list) or not records:
+            return 1
+        return -(-len(records) // per_page)
+
+    def on_page(self, index, page):
+        """Page `page` (0-based) of this fill, placed at slide `index`."""
+        images = self.images if page == 0 else tuple(f"{slot}_{page + 1}" for slot in self.images)
+        return SlideFill(index, self.fill, self.metrics, self.text, images, key=self.key,
+                         paginate=self.paginate, page=page, origin=self.origin)
+
+    def _inputs(self, text_inputs, images):
+        # The records and image slots of this page, under the names the fill function reads
+        if self.paginate is not None:
+            key, per_page = self.paginate
+            records = text_inputs.get(key)
+            if isinstance(records, list):
+                text_inputs = dict(text_inputs)
+                text_inputs[key] = records[self.page * per_page:(self.page + 1) * per_page]
+        if self.page:
+            images = {slot.rsplit("_", 1)[0]: images[slot] for slot in self.images if slot in images}
+        return text_inputs, images
+
+    def fingerprint(self, metrics, text_inputs, images):
+        text_inputs, _ = self._inputs(text_inputs, {})
+        payload = {
+            "metrics": {k: metrics.get(k) for k in self.metrics},
+            "text": {k: text_inputs.get(k) for k in self.text},
+            "images": {k: images[k].digest if k in images else None for k in self.images},
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def apply(self, prs, metrics, text_inputs, images):
+        text_inputs, images = self._inputs(text_inputs, images)
+        self.fill(prs.slides[self.index], metrics, text_inputs, images)
+
+
+# Slide indices are 0-based: SLIDE_FILLS[3] fills "Slide 4" (Program Overview).
+SLIDE_FILLS = [
+    SlideFill(0, _fill_slide_1, text=("slide_1_d", "slide_1_htg")),
+    SlideFill(1, _fill_slide_2, text=("slide_2_d", "slide_2_htg")),
+    SlideFill(2, _fill_slide_3, text=("slide_3_d", "slide_3_htg")),
+    SlideFill(3, _fill_slide_4,
+              metrics=("proposed_metrics", "influencer_count", "diversity_value", "social_posts_value",
+                       "engagement_rate_value", "engagements_value", "engagements_increase",
+                       "impressions_value", "impressions_increase"),
+              text=("slide_4_b1", "slide_4_b2")),
+    SlideFill(4, _fill_slide_5, text=("influencer_boxes",), paginate=("influencer_boxes", len(SLIDE_5_BOXES))),
+    SlideFill(5, _fill_slide_6, text=("slide_6",), images=("slide_6",)),
+    SlideFill(6, _fill_slide_7,
+              text=("slide_7_left", "slide_7_right", "slide_7_like", "slide_7_comment", "slide_7_view",
+                    "slide_7_reaches", "slide_7_eng", "slide_7_impr"),
+              images=("slide_7_left", "slide_7_right")),
+    SlideFill(7, _fill_slide_8, text=("influencer_boxestwo",),
+              images=tuple(key for key, _ in SLIDE_8_PICTURES),
+              paginate=("influencer_boxestwo", len(SLIDE_8_PICTURES))),
+    SlideFill(8, _fill_slide_9,
+              metrics=("organic_likes", "organic_comments", "organic_shares", "organic_saves",
+                       "paid_likes", "paid_comments", "paid_shares", "paid_saves", "paid_threesec",
+                       "total_post_engagements", "story_engagements", "total_engagements"),
+              text=("slide_9",)),
+    SlideFill(9, _fill_slide_10,
+              metrics=("organic_reach_impressions", "impressions_paid", "organic_views_impressions",
+                       "impressions_value")),
+    SlideFill(10, _fill_slide_11,
+              metrics=("organic_reach_impressions", "impressions_paid", "organic_views_impressions",
+                       "impressions_value"),
+              images=tuple(key for key, _ in SLIDE_11_PICTURES)),
+    SlideFill(11, _fill_slide_12,
+              metrics=("cpe", "cpc", "ctr", "cpm", "thruplays", "p25", "p50", "p75", "p100")),
+    SlideFill(12, _fill_slide_13, metrics=("c2c_transfer", "c2c_value"), text=("slide_13",)),
+    SlideFill(14, _fill_slide_15, text=("slide_15",)),
+    SlideFill(15, _fill_slide_16, text=("slide_16",)),
+]
+
+
+def plan_slide_fills(slide_map=None):
+    """
+    SLIDE_FILLS re-targeted by a template's slide map ({"slide_4": 3, ...}).
+    Fills missing from the map are skipped; no map means the stock template.
+    """
+    if slide_map is None:
+        return SLIDE_FILLS
+    return [fill.at(slide_map[fill.key]) for fill in SLIDE_FILLS if fill.key in slide_map]
+
+
+# Named slide subsets, by stock slide key. None keeps the whole deck.
+PROFILES = {
+    "full": None,
+    "summary": ("slide_4", "slide_9", "slide_12"),  # Program Overview, Engagement Summary, Paid Social Overview
+}
+
+
+def profile_slides(profile, slide_map=None, slide_count=None):
+    """
+    Sorted 0-based indices of the slides `profile` keeps: a PROFILES name or a
+    list of slide keys ("slide_4"), placed by `slide_map` when it has the key
+    and by stock position otherwise. None (or "full") keeps every slide.
+    """
+    if profile is None:
+        return None
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}; expected one of {', '.join(PROFILES)}.")
+        profile = PROFILES[profile]
+        if profile is None:
+            return None
+    keep = set()
+    for key in profile:
+        if slide_map and key in slide_map:
+            keep.add(slide_map[key])
+        elif key.startswith("slide_") and key[6:].isdigit() and int(key[6:]) >= 1:
+            keep.add(int(key[6:]) - 1)
+        else:
+            raise ValueError(f"Profile slide {key!r} is not a slide key like 'slide_4'.")
+    if slide_count is not None and any(index >= slide_count for index in keep):
+        raise ValueError(f"Profile names a slide beyond the template's {slide_count} slides.")
+    return sorted(keep)
+
+
+def drop_slides(prs, keep):
+    """
+    Remove every slide of `prs` whose index isn't in `keep`. Their parts (and
+    media only they used) are no longer reachable, so they aren't saved.
+    """
+    sld_id_lst = prs.slides._sldIdLst
+    for index, sld_id in reversed(list(enumerate(sld_id_lst))):
+        if index not in keep:
+            rId = sld_id.rId
+            sld_id_lst.remove(sld_id)
+            prs.part.drop_rel(rId)
+
+
+def apply_profile(prs, profile, slide_map=None):
+    """
+    Drop the slides `profile` leaves out of `prs`, before any fill work;
+    returns the slide map that places the remaining fills (see
+    plan_slide_fills()), or `slide_map` unchanged when every slide is kept.
+    """
+    keep = profile_slides(profile, slide_map, len(prs.slides))
+    if keep is None:
+        return slide_map
+    drop_slides(prs, keep)
+    position = {index: i for i, index in enumerate(keep)}
+    return {fill.key: position[fill.index] for fill in plan_slide_fills(slide_map) if fill.index in position}
+
+
+def clone_slide(prs, index, position, partname=None):
+    """
+    Copy slide `index` to `position` in the slide order. Only the slide's XML
+    is copied; the copy relates to the same layout and media parts as the
+    original (its notes page, which belongs to one slide, is left out).
+    Pass an unused `partname` to skip searching the package for one.
+    """
+    from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM, RELATIONSHIP_TYPE as RT
+    from pptx.opc.package import _Relationship
+    from pptx.opc.packuri import PackURI
+    from pptx.parts.slide import SlidePart
+
+    source = prs.slides[index].part
+    partname = PackURI(partname) if partname else prs.part.package.next_partname("/ppt/slides/slide%d.xml")
+    part = SlidePart(partname, source.content_type, prs.part.package, copy.deepcopy(source._element))
+    # Same rIds as the original, so the copied XML's references still resolve
+    for rId, rel in source.rels.items():
+        if rel.reltype == RT.NOTES_SLIDE:
+            continue
+        target = rel.target_ref if rel.is_external else rel.target_part
+        part.rels._rels[rId] = _Relationship(part.rels._base_uri, rId, rel.reltype,
+                                             RTM.EXTERNAL if rel.is_external else RTM.INTERNAL, target)
+
+    sld_id_lst = prs.slides._sldIdLst
+    sld_id = sld_id_lst.add_sldId(prs.part.relate_to(part, RT.SLIDE))
+    sld_id_lst.remove(sld_id)
+    sld_id_lst.insert(position, sld_id)
+
+
+def paginate_slide_fills(prs, slide_fills, text_inputs):
+    """
+    Clone each paginating fill's slide once per extra page of records (right
+    after the original, before any fill runs) and return the fill plan for
+    the grown deck, later slides shifted along.
+    """
+    pages = [slide_fill.pages(text_inputs) for slide_fill in slide_fills]
+    if all(n == 1 for n in pages):
+        return slide_fills
+    # Part names are picked here once rather than by searching the package per copy
+    used = {str(slide.part.partname) for slide in prs.slides}
+    partnames = (name for name in (f"/ppt/slides/slide{i}.xml" for i in itertools.count(1)) if name not in used)
+    # Highest index first, so inserting copies doesn't move the slides still to be copied
+    for slide_fill, n in sorted(zip(slide_fills, pages), key=lambda item: -item[0].index):
+        for page in range(n - 1, 0, -1):
+            clone_slide(prs, slide_fill.index, slide_fill.index + 1, next(partnames))
+
+    def shifted(index):
+        return index + sum(n - 1 for other, n in zip(slide_fills, pages) if other.index < index)
+
+    planned = []
+    for slide_fill, n in zip(slide_fills, pages):
+        start = shifted(slide_fill.index)
+        planned.extend(slide_fill.on_page(start + page, page) for page in range(n))
+    return planned
+
+
+def _used_images(images, slide_fills):
+    # Only slots some planned fill places are decoded
+    slots = {slot for slide_fill in slide_fills for slot in slide_fill.images}
+    return {slot: src for slot, src in (images or {}).items() if slot in slots}
+
+
+def _report(progress, stage, fraction):
+    # progress(stage, fraction) is optional; stages run "images" → "text" → "save"
+    if progress is not None:
+        progress(stage, fraction)
+
+
+@instrumented("images")
+def resolve_images(images, image_cache=None, progress=None):
+    """
+    Decode each uploaded image once (through the cache); empty slots are left
+    out. Slots may also hold an already resolved CachedImage.
+    """
+    if image_cache is None:
+        image_cache = IMAGE_CACHE
+    pending = [(key, src) for key, src in (images or {}).items() if src is not None]
+    resolved = {}
+    _report(progress, "images", 0.0)
+    for i, (key, src) in enumerate(pending, 1):
+        if isinstance(src, CachedImage):
+            resolved[key] = src
+        else:
+            data = upload_bytes(src)
+            IMAGE_BYTES.inc(len(data))
+            resolved[key] = image_cache.get(data)
+        _report(progress, "images", i / len(pending))
+    return resolved
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PowerPoint Deck Generation
+# ─────────────────────────────────────────────────────────────────────────────
+@instrumented("populate")
+def populate_pptx_from_excel(excel_df, pptx_template_path, output_path, images=None, text_inputs=None, image_cache=None,
+                             progress=None, metrics=None, slide_map=None, profile=None):
+    """
+    Fill the template from the campaign sheet, uploaded images and UI text
+    inputs, and save the deck to `output_path`. `progress`, if given, is
+    called as progress(stage, fraction) for the "images", "text" and "save"
+    stages; an exception raised from it aborts generation. Pass `metrics`
+    (shaped like extract_recap_metrics()) to fill from precomputed values;
+    `excel_df` is then ignored. `slide_map` places the fills on a
+    non-stock template (see plan_slide_fills()); `profile` keeps only a
+    subset of the slides (see profile_slides()).
+    """
+    from pptx import Presentation
+    prs = Presentation(pptx_template_path)
+    text_inputs = text_inputs or {}
+    slide_fills = plan_slide_fills(apply_profile(prs, profile, slide_map))
+    slide_fills = paginate_slide_fills(prs, slide_fills, text_inputs)
+    if metrics is None:
+        metrics = extract_recap_metrics(excel_df)
+    resolved = resolve_images(_used_images(images, slide_fills), image_cache, progress)
+
+    _report(progress, "text", 0.0)
+    for i, slide_fill in enumerate(slide_fills, 1):
+        slide_fill.apply(prs, metrics, text_inputs, resolved)
+        _report(progress, "text", i / len(slide_fills))
+
+    _report(progress, "save", 0.0)
     prs.save(output_path)
-                        
-      
+    _report(progress, "save", 1.0)
+    DECKS_GENERATED.inc()
+
+
+def reset_slide(slide, template_slide):
+    """
+    Restore `slide` to the template's content, dropping relationships (e.g.
+    pictures) added by an earlier fill. Both must be the same template slide.
+    A relationship is kept only if the template has it under the same rId,
+    type and target: a clone has no notes page, so a fill may have reused
+    that rId for a picture.
+    """
+    # Swap the shape tree's children in place so python-pptx's cached
+    # proxies (slide.shapes) keep pointing at the live element.
+    sp_tree = slide.shapes._spTree
+    sp_tree[:] = list(copy.deepcopy(template_slide.shapes._spTree))
+    template_rels = {rId: (rel.reltype, rel.target_ref) for rId, rel in template_slide.part.rels.items()}
+    for rId in [rId for rId, rel in slide.part.rels.items()
+                if template_rels.get(rId) != (rel.reltype, rel.target_ref)]:
+        slide.part.drop_rel(rId)
+
+
+class IncrementalDeckBuilder:
+    """
+    Keeps the last filled deck for one editing session and, on each build,
+    only rebuilds the slides whose inputs changed since the previous build.
+    A change in the number of paginated slides starts again from the template.
+    """
+
+    def __init__(self, pptx_template_path, image_cache=None, slide_map=None, profile=None):
+        self.pptx_template_path = pptx_template_path
+        self.image_cache = image_cache
+        self.slide_map = slide_map
+        self.profile = profile
+        self.slide_fills = plan_slide_fills(slide_map)
+        self.rebuilt = []
+        self._template = None
+        self._template_mtime = None
+        self._prs = None
+        self._base_fills = None
+        self._pages = None
+        self._fingerprints = {}
+        # The live preview and a background generation job may share a builder
+        self._lock = threading.Lock()
+
+    def _load_template(self, text_inputs):
+        from pptx import Presentation
+        mtime = os.path.getmtime(self.pptx_template_path)
+        if self._template is None or mtime != self._template_mtime:
+            self._template = Presentation(self.pptx_template_path)
+            apply_profile(self._template, self.profile, self.slide_map)
+            self._template_mtime = mtime
+            self._prs = None
+        if self._prs is not None and self._pages != [f.pages(text_inputs) for f in self._base_fills]:
+            self._prs = None
+        if self._prs is None:
+            self._prs = Presentation(self.pptx_template_path)
+            self._base_fills = plan_slide_fills(apply_profile(self._prs, self.profile, self.slide_map))
+            self._pages = [f.pages(text_inputs) for f in self._base_fills]
+            self.slide_fills = paginate_slide_fills(self._prs, self._base_fills, text_inputs)
+            self._fingerprints = {}
+
+    def build(self, excel_df, output_path, images=None, text_inputs=None, progress=None, record=True):
+        """
+        Write the deck to `output_path`; returns the indices of rebuilt slides.
+        `progress` works as in populate_pptx_from_excel(). Pass record=False
+        for previews, so they don't count as generated decks or failures.
+        """
+        with self._lock, (nullcontext() if record else unrecorded()), stage("populate"):
+            rebuilt = self._build(excel_df, output_path, images, text_inputs, progress)
+            DECKS_GENERATED.inc()
+        return rebuilt
+
+    def _build(self, excel_df, output_path, images, text_inputs, progress):
+        text_inputs = text_inputs or {}
+        self._load_template(text_inputs)
+        metrics = extract_recap_metrics(excel_df)
+        resolved = resolve_images(_used_images(images, self.slide_fills), self.image_cache, progress)
+
+        rebuilt = []
+        _report(progress, "text", 0.0)
+        try:
+            for i, slide_fill in enumerate(self.slide_fills, 1):
+                fp = slide_fill.fingerprint(metrics, text_inputs, resolved)
+                previous = self._fingerprints.get(slide_fill.index)
+                if previous != fp:
+                    if previous is not None:
+                        reset_slide(self._prs.slides[slide_fill.index], self._template.slides[slide_fill.origin])
+                    self._fingerprints.pop(slide_fill.index, None)
+                    slide_fill.apply(self._prs, metrics, text_inputs, resolved)
+                    self._fingerprints[slide_fill.index] = fp
+                    rebuilt.append(slide_fill.index)
+                _report(progress, "text", i / len(self.slide_fills))
+        except BaseException:
+            # A half-filled slide can't be trusted; start from scratch next time
+            self._prs = None
+            raise
+
+        _report(progress, "save", 0.0)
+        self._prs.save(output_path)
+        _report(progress, "save", 1.0)
+        self.rebuilt = rebuilt
+        return rebuilt
+
+
+def load_inputs(path):
+    """
+    Read a CLI inputs file: {"text_inputs": {...}, "images": {"slide_6": "photo.jpg", ...}}.
+    Image paths are relative to the file. Returns (text_inputs, images).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    images = {}
+    try:
+        for slot, p in (payload.get("images") or {}).items():
+            images[slot] = open(os.path.join(base, p), "rb")
+    except OSError:
+        # e.g. a missing photo: don't leak the ones already opened
+        for f in images.values():
+            f.close()
+        raise
+    return payload.get("text_inputs") or {}, images
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CLI Entrypoint (optional, for testing)
@@ -1150,8 +1135,12 @@ if __name__ == "__main__":
     parser.add_argument("input_file", help="CSV or Excel input")
     parser.add_argument("pptx_template", help="PowerPoint template file")
     parser.add_argument("--output", default="recap_deck.pptx", help="Output PPTX file")
+    parser.add_argument("--inputs", help='JSON file: {"text_inputs": {...}, "images": {"slide_6": "photo.jpg", ...}}')
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="Only generate this profile's slides")
     args = parser.parse_args()
 
+    text_inputs, images = load_inputs(args.inputs) if args.inputs else ({}, {})
     df = load_dataframe(args.input_file)
-    populate_pptx_from_excel(df, args.pptx_template, args.output)
+    populate_pptx_from_excel(df, args.pptx_template, args.output, images=images, text_inputs=text_inputs,
+                             profile=args.profile)
     print(f"Wrote {args.output}")
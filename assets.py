@@ -0,0 +1,172 @@
+# assets.py
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+from app import CachedImage, IMAGE_CACHE, upload_bytes
+from service import NamedBytesIO
+
+
+ASSETS_DIR = "assets"
+
+
+def _write_atomic(path, data):
+    # A unique temp file per write: Streamlit sessions are threads of one process
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def draft_filename(name) -> str:
+    """File name for draft `name`. Different names can share one ("My Draft", "My_Draft"); see save_draft()."""
+    return (re.sub(r"[^\w\-]+", "_", name.strip()).strip("_") or "draft") + ".json"
+
+
+def _stored_name(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("name")
+
+
+class AssetStore:
+    """
+    Local store of uploaded files keyed by the SHA-256 of their bytes, plus
+    saved drafts. A photo is written once however often it is uploaded, and
+    its decoded size and embeddable (downsampled) bytes are kept next to it,
+    so reusing it later needs neither the upload nor PIL.
+
+        assets/blobs/<sha256>         original bytes
+        assets/blobs/<sha256>.json    {"width_px", "height_px", "blob"}: prepared image
+        assets/drafts/<name>.json     text inputs and slot → sha256 assignments
+    """
+
+    def __init__(self, root=ASSETS_DIR, image_cache=None):
+        self.root = root
+        self.image_cache = IMAGE_CACHE if image_cache is None else image_cache
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.drafts_dir = os.path.join(root, "drafts")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.drafts_dir, exist_ok=True)
+        self._drafts_lock = threading.Lock()
+
+    # ── Blobs ────────────────────────────────────────────────────────────────
+    def path(self, digest) -> str:
+        if not re.fullmatch(r"[0-9a-f]{64}", digest or ""):
+            raise ValueError(f"Not an asset digest: {digest!r}")
+        return os.path.join(self.blobs_dir, digest)
+
+    def has(self, digest) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, data) -> str:
+        """Store `data` (bytes-like) if it isn't stored yet; returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        return digest
+
+    def put_upload(self, src) -> str:
+        return self.put(upload_bytes(src))
+
+    def get(self, digest) -> bytes:
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def open(self, digest, name) -> NamedBytesIO:
+        """A stored file as an in-memory upload called `name` (e.g. for load_dataframe())."""
+        return NamedBytesIO(self.get(digest), name)
+
+    # ── Prepared images ──────────────────────────────────────────────────────
+    def image(self, digest) -> CachedImage:
+        """
+        The stored photo `digest`, ready to place: from the in-memory cache,
+        else from its prepared sidecar, else decoded once and the sidecar written.
+        """
+        entry = self.image_cache.lookup(digest)
+        if entry is not None:
+            return entry
+        meta_path = self.path(digest) + ".json"
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            entry = CachedImage(digest, meta["width_px"], meta["height_px"], self.get(meta["blob"]))
+            self.image_cache.add(entry)
+            return entry
+
+        entry = self.image_cache.get(self.get(digest))
+        # Photos that didn't need downsampling are their own prepared blob
+        meta = {"width_px": entry.width_px, "height_px": entry.height_px, "blob": self.put(entry.blob)}
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        return entry
+
+    # ── Drafts ───────────────────────────────────────────────────────────────
+    def save_draft(self, name, text_inputs, images, fields=None, workbook=None) -> str:
+        """
+        Save a draft: `images` maps slot → digest of a stored photo, `fields`
+        holds raw form values to restore, and `workbook` is an optional
+        (digest, file name) pair. Returns the draft's file path.
+        """
+        missing = [slot for slot, digest in images.items() if digest and not self.has(digest)]
+        if missing:
+            raise ValueError(f"Draft {name!r} refers to photos that aren't stored: {', '.join(missing)}")
+        draft = {
+            "name": name,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "text_inputs": text_inputs,
+            "images": {slot: digest for slot, digest in images.items() if digest},
+            "fields": fields or {},
+            "workbook": list(workbook) if workbook else None,
+        }
+        path = os.path.join(self.drafts_dir, draft_filename(name))
+        with self._drafts_lock:
+            # Saving "My Draft" must not overwrite "My_Draft", which has the same file name
+            if os.path.exists(path) and _stored_name(path) not in (None, name):
+                raise ValueError(f"Draft name {name!r} clashes with the saved draft {_stored_name(path)!r}; "
+                                 f"choose another name.")
+            _write_atomic(path, json.dumps(draft, indent=2, default=str).encode("utf-8"))
+        return path
+
+    def _draft_path(self, name):
+        # The draft's file, if it holds the draft called `name`
+        path = os.path.join(self.drafts_dir, draft_filename(name))
+        if os.path.exists(path) and _stored_name(path) in (None, name):
+            return path
+        return None
+
+    def load_draft(self, name) -> dict:
+        path = self._draft_path(name)
+        if path is None:
+            raise KeyError(f"No draft named {name!r}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def drafts(self) -> list:
+        """Saved draft names, most recently saved first."""
+        entries = []
+        for entry in os.listdir(self.drafts_dir):
+            if entry.endswith(".json"):
+                path = os.path.join(self.drafts_dir, entry)
+                with open(path, "r", encoding="utf-8") as f:
+                    name = json.load(f).get("name") or entry[:-5]
+                entries.append((os.path.getmtime(path), name))
+        return [name for _, name in sorted(entries, reverse=True)]
+
+    def delete_draft(self, name):
+        path = self._draft_path(name)
+        if path is not None:
+            os.remove(path)
+
+    def draft_images(self, draft) -> dict:
+        """The draft's photos as {slot: CachedImage}; slots whose photo has gone are left out."""
+        return {slot: self.image(digest) for slot, digest in draft.get("images", {}).items() if self.has(digest)}
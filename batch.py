@@ -0,0 +1,221 @@
+# batch.py
+
+import io
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from app import (load_workbook_sheets, is_recap_sheet, format_engagement_rate, populate_pptx_from_excel, load_inputs,
+                 upload_bytes)
+from extract import PROPOSED_KEYS, extract_many
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Rollup Rules
+# ─────────────────────────────────────────────────────────────────────────────
+# Counts that add up across campaigns
+ROLLUP_SUM = [
+    "social_posts_value", "organic_views_impressions", "organic_reach_impressions", "impressions_paid",
+    "engagements_value", "impressions_value",
+    "organic_likes", "organic_comments", "organic_shares", "organic_saves", "paid_engagements",
+    "paid_likes", "paid_comments", "paid_shares", "paid_saves", "paid_threesec",
+    "influencer_count", "total_post_engagements", "story_engagements", "total_engagements",
+    "thruplays", "p25", "p50", "p75", "p100", "c2c_transfer", "c2c_value",
+    "proposed_impressions", "proposed_engagements", "proposed_influencers",
+]
+
+# Per-unit costs and rates: averaged, weighted by the volume they are a rate of
+# (the product of these columns), so each comes out as total spend ÷ total
+# volume. The sheets have no click count, but clicks = CTR × paid impressions.
+ROLLUP_WEIGHTED = {
+    "cpe": ("paid_engagements",),
+    "cpc": ("impressions_paid", "ctr"),
+    "ctr": ("impressions_paid",),
+    "cpm": ("impressions_paid",),
+}
+
+
+def _plain_number(value):
+    # 1234.0 → 1234, 0.12345 → 0.12; keeps deck text free of float noise
+    if value != value:  # NaN
+        return ""
+    if float(value).is_integer():
+        return int(value)
+    return round(float(value), 2)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Campaign Metrics (parallel)
+# ─────────────────────────────────────────────────────────────────────────────
+def campaign_names(paths) -> dict:
+    """
+    {path: campaign name}: the file name, with as many parent folders as it
+    takes to tell same-named files apart ("q1/recap.xlsx", "q2/recap.xlsx").
+    Raises ValueError if a workbook is listed more than once.
+    """
+    seen = set()
+    for path in paths:
+        key = os.path.normcase(os.path.abspath(path))
+        if key in seen:
+            raise ValueError(f"{path} is listed more than once.")
+        seen.add(key)
+    parts = {path: os.path.abspath(path).split(os.sep) for path in paths}
+    depth = dict.fromkeys(paths, 1)
+    while True:
+        names = {path: "/".join(parts[path][-depth[path]:]) for path in paths}
+        counts = Counter(names.values())
+        clashes = [path for path in paths if counts[names[path]] > 1]
+        if not clashes:
+            return names
+        for path in clashes:
+            depth[path] += 1
+
+
+def collect_metrics(paths, workers=None):
+    """
+    Extract recap metrics from every workbook in `paths` in parallel. Returns
+    a DataFrame with one row per campaign (indexed by campaign_names());
+    workbooks that fail to parse are reported and left out.
+    """
+    import pandas as pd
+
+    names = campaign_names(paths)
+    rows, errors = extract_many(paths, workers)
+    for path, error in errors.items():
+        print(f"Warning: skipping {path}: {error}")
+    frame = pd.DataFrame.from_dict({names[p]: row for p, row in rows.items()}, orient="index")
+    return frame.sort_index()
+
+
+def rollup_metrics(frame) -> dict:
+    """
+    Aggregate a collect_metrics() frame into one metrics dict that
+    populate_pptx_from_excel() can fill a deck from.
+    """
+    import pandas as pd
+
+    numeric = frame.reindex(columns=ROLLUP_SUM + list(ROLLUP_WEIGHTED)).apply(pd.to_numeric, errors="coerce")
+    totals = numeric[ROLLUP_SUM].sum(min_count=1)
+
+    m = {column: _plain_number(value) for column, value in totals.items()}
+    for column, weight in ROLLUP_WEIGHTED.items():
+        # Only weigh campaigns that actually report this rate
+        weights = numeric[list(weight)].prod(axis=1, min_count=len(weight)).where(numeric[column].notna())
+        total_weight = weights.sum()
+        value = (numeric[column] * weights).sum() / total_weight if total_weight else float("nan")
+        m[column] = _plain_number(value)
+
+    impressions = totals["impressions_value"]
+    m["engagement_rate_value"] = (format_engagement_rate(totals["engagements_value"] / impressions)
+                                  if impressions == impressions and impressions else "")
+
+    # Period-over-period increases and diversity are per-campaign facts with no portfolio total
+    m["engagements_increase"] = ""
+    m["impressions_increase"] = ""
+    m["diversity_value"] = ""
+    m["proposed_metrics"] = {name: m.pop(column) for name, column in PROPOSED_KEYS.items()}
+    return m
+
+
+def build_rollup_deck(paths, pptx_template_path, output_path, workers=None, text_inputs=None, images=None):
+    """Fill one portfolio deck from the summed metrics of every workbook. Returns the per-campaign frame."""
+    frame = collect_metrics(paths, workers)
+    if frame.empty:
+        raise ValueError("No workbook could be read; nothing to roll up.")
+    populate_pptx_from_excel(None, pptx_template_path, output_path, images=images, text_inputs=text_inputs,
+                             metrics=rollup_metrics(frame))
+    return frame
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Per-Sheet Fan-Out
+# ─────────────────────────────────────────────────────────────────────────────
+def _sheet_deck(df, pptx_template_path, output_path, text_inputs, images):
+    # Runs in a worker process on an already parsed sheet
+    images = {slot: io.BytesIO(data) for slot, data in (images or {}).items()}
+    populate_pptx_from_excel(df, pptx_template_path, output_path, images=images, text_inputs=text_inputs)
+    return output_path
+
+
+def sheet_deck_name(workbook_path, sheet_name):
+    stem = os.path.splitext(os.path.basename(workbook_path))[0]
+    safe = re.sub(r"[^\w\-]+", "_", str(sheet_name)).strip("_") or "sheet"
+    return f"{stem}_{safe}.pptx"
+
+
+def build_sheet_decks(workbook_path, pptx_template_path, output_dir, workers=None, text_inputs=None, images=None):
+    """
+    Generate one deck per recap-layout sheet of `workbook_path`. The workbook
+    is parsed once; each sheet's frame is handed to a worker process that
+    extracts its metrics and fills its deck. `images` maps slot → bytes and
+    is shared by every deck. Returns {sheet name: output path} for the decks
+    that were written; sheets that fail are reported and left out.
+    """
+    sheets = {name: df for name, df in load_workbook_sheets(workbook_path).items() if is_recap_sheet(df)}
+    if not sheets:
+        raise ValueError(f"No sheet in {workbook_path} has the recap layout.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    written = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_sheet_deck, df, pptx_template_path,
+                            os.path.join(output_dir, sheet_deck_name(workbook_path, name)), text_inputs, images): name
+            for name, df in sheets.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                written[name] = future.result()
+            except Exception as e:
+                print(f"Warning: sheet {name!r} failed: {e}")
+    return {name: written[name] for name in sheets if name in written}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate decks from many workbooks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollup = commands.add_parser("rollup", help="One portfolio deck summing every campaign's metrics")
+    rollup.add_argument("workbooks", nargs="+", help="Campaign CSV/Excel files")
+    rollup.add_argument("--template", default="template.pptx", help="PowerPoint template file")
+    rollup.add_argument("--output", default="rollup_deck.pptx", help="Output PPTX file")
+    rollup.add_argument("--inputs", help="JSON text inputs / images, as for app.py")
+    rollup.add_argument("--table", help="Also write the per-campaign metrics to this CSV")
+    rollup.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    sheets = commands.add_parser("sheets", help="One deck per recap sheet of a multi-sheet workbook")
+    sheets.add_argument("workbook", help="Excel workbook with one sheet per retailer/flight")
+    sheets.add_argument("--template", default="template.pptx", help="PowerPoint template file")
+    sheets.add_argument("--output-dir", default="decks", help="Directory for the generated decks")
+    sheets.add_argument("--inputs", help="JSON text inputs / images, as for app.py")
+    sheets.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.command == "sheets":
+        text_inputs, photos = load_inputs(args.inputs) if args.inputs else ({}, {})
+        try:
+            images = {slot: upload_bytes(f) for slot, f in photos.items()}
+        finally:
+            for f in photos.values():
+                f.close()
+        try:
+            decks = build_sheet_decks(args.workbook, args.template, args.output_dir, args.workers, text_inputs, images)
+        except ValueError as e:
+            sys.exit(str(e))
+        for name, path in decks.items():
+            print(f"{name}: {path}")
+
+    if args.command == "rollup":
+        text_inputs, images = load_inputs(args.inputs) if args.inputs else ({}, {})
+        try:
+            frame = build_rollup_deck(args.workbooks, args.template, args.output, args.workers, text_inputs, images)
+        except ValueError as e:
+            sys.exit(str(e))
+        finally:
+            for f in images.values():
+                f.close()
+        if args.table:
+            frame.to_csv(args.table, index_label="campaign")
+        print(f"Rolled up {len(frame)} of {len(args.workbooks)} campaigns into {args.output}")
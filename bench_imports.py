@@ -0,0 +1,91 @@
+# bench_imports.py
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+
+# Modules that must not be pulled in by a plain `import <module>`
+HEAVY_MODULES = ("pandas", "numpy", "pptx", "PIL", "lxml", "openpyxl")
+
+# Entry points worth keeping fast, and which heavy modules each may load
+ENTRY_POINTS = {
+    "app": (),
+    "jobs": (),
+    "service": (),
+    "preview": (),
+    "export": (),
+}
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────────────────────
+def import_profile(module):
+    """
+    Import `module` in a fresh interpreter with -X importtime. Returns
+    (wall seconds, {top-level package: cumulative microseconds}).
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        top = name.strip().split(".")[0]
+        packages[top] = max(packages.get(top, 0), int(cumulative))
+    return wall, packages
+
+
+def bench(module, runs=5):
+    walls = []
+    packages = {}
+    for _ in range(runs):
+        wall, packages = import_profile(module)
+        walls.append(wall)
+    return statistics.median(walls), packages
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Measure cold import time of the app's entry points")
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_POINTS), help="Modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=5, help="Slowest packages to list per module")
+    args = parser.parse_args()
+
+    baseline, _ = bench("os", args.runs)
+    print(f"{'interpreter startup':<22}{baseline * 1000:8.1f} ms")
+
+    failures = []
+    for module in args.modules:
+        wall, packages = bench(module, args.runs)
+        print(f"{'import ' + module:<22}{(wall - baseline) * 1000:8.1f} ms")
+        slowest = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        for name, micros in slowest:
+            print(f"    {name:<28}{micros / 1000:8.1f} ms")
+
+        allowed = ENTRY_POINTS.get(module, ())
+        leaked = [m for m in HEAVY_MODULES if m in packages and m not in allowed]
+        if leaked:
+            failures.append(f"import {module} loads {', '.join(leaked)}")
+
+    if failures:
+        print("\nHeavy modules imported eagerly:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
@@ -0,0 +1,289 @@
+# deckdiff.py
+
+import sys
+import json
+import difflib
+import hashlib
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+
+NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+R_EMBED = f"{{{NS['r']}}}embed"
+R_ID = f"{{{NS['r']}}}id"
+
+# Shape elements of a slide's shape tree, by local name
+SHAPE_TAGS = {"sp", "pic", "graphicFrame", "grpSp", "cxnSp"}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Part Hashes
+# ─────────────────────────────────────────────────────────────────────────────
+def part_hashes(path, chunk_size=1 << 16) -> dict:
+    """
+    {part name: sha256} for every part of the package at `path` (a file name
+    or a binary file object, e.g. a BytesIO of a generated deck). Parts are
+    read in chunks straight from the zip, so memory stays flat however big
+    the deck (or its media) is.
+    """
+    hashes = {}
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            h = hashlib.sha256()
+            with zf.open(info) as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    h.update(chunk)
+            hashes[info.filename] = h.hexdigest()
+    return hashes
+
+
+def deck_digest(hashes) -> str:
+    """One hash for a whole deck's content, independent of zip order and timestamps."""
+    h = hashlib.sha256()
+    for name in sorted(hashes):
+        h.update(f"{name}\0{hashes[name]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Package Structure
+# ─────────────────────────────────────────────────────────────────────────────
+def _rels_part(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _relationships(zf, part) -> dict:
+    """{rId: target part name} for `part`'s internal relationships."""
+    try:
+        data = zf.read(_rels_part(part))
+    except KeyError:
+        return {}
+    folder = posixpath.dirname(part)
+    rels = {}
+    for rel in ET.fromstring(data).findall("rel:Relationship", NS):
+        if rel.get("TargetMode") == "External":
+            continue
+        rels[rel.get("Id")] = posixpath.normpath(posixpath.join(folder, rel.get("Target")))
+    return rels
+
+
+def slide_parts(zf) -> list:
+    """Slide part names in presentation order."""
+    rels = _relationships(zf, "ppt/presentation.xml")
+    root = ET.fromstring(zf.read("ppt/presentation.xml"))
+    return [rels[sld.get(R_ID)] for sld in root.findall("p:sldIdLst/p:sldId", NS)]
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _shape_record(el, rels, hashes):
+    nv = el[0] if len(el) else None
+    c_nv_pr = nv.find("p:cNvPr", NS) if nv is not None else None
+    record = {"kind": _local(el.tag), "name": c_nv_pr.get("name", "") if c_nv_pr is not None else ""}
+
+    for child in el:
+        xfrm = child if _local(child.tag) == "xfrm" else child.find("a:xfrm", NS)
+        if xfrm is not None and _local(child.tag) in ("spPr", "grpSpPr", "xfrm"):
+            off, ext = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+            record["geometry"] = [int(off.get("x")), int(off.get("y")), int(ext.get("cx")), int(ext.get("cy"))] \
+                if off is not None and ext is not None else None
+            break
+
+    paragraphs = el.findall("p:txBody/a:p", NS) if record["kind"] == "sp" else \
+        el.findall(".//a:tbl//a:p", NS) if record["kind"] == "graphicFrame" else []
+    if paragraphs:
+        record["runs"] = [[t.text or "" for t in p.findall("a:r/a:t", NS)] for p in paragraphs]
+
+    blip = el.find("p:blipFill/a:blip", NS)
+    if blip is not None:
+        target = rels.get(blip.get(R_EMBED))
+        record["image"] = target
+        record["image_hash"] = hashes.get(target)
+    return record
+
+
+def slide_shapes(zf, part, hashes) -> dict:
+    """{(name, nth): shape record} for every shape on the slide, groups flattened, in document order."""
+    rels = _relationships(zf, part)
+    tree = ET.fromstring(zf.read(part)).find("p:cSld/p:spTree", NS)
+    shapes = {}
+    seen = {}
+
+    def walk(parent):
+        for el in parent:
+            if _local(el.tag) not in SHAPE_TAGS:
+                continue
+            record = _shape_record(el, rels, hashes)
+            nth = seen[record["name"]] = seen.get(record["name"], -1) + 1
+            shapes[(record["name"], nth)] = record
+            if record["kind"] == "grpSp":
+                walk(el)
+
+    if tree is not None:
+        walk(tree)
+    return shapes
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Diff
+# ─────────────────────────────────────────────────────────────────────────────
+def _text_diff(before, after):
+    old = ["".join(runs) for runs in before.get("runs", [])]
+    new = ["".join(runs) for runs in after.get("runs", [])]
+    if old == new:
+        # Same text, different run boundaries (i.e. formatting split differently)
+        return ["(same text, runs split differently)"] if before.get("runs") != after.get("runs") else []
+    return [line for line in difflib.unified_diff(old, new, lineterm="", n=0) if not line.startswith(("---", "+++"))]
+
+
+def diff_shapes(before, after) -> list:
+    changes = []
+    for key in list(before) + [k for k in after if k not in before]:
+        name = f"{key[0]}" + (f" #{key[1] + 1}" if key[1] else "")
+        if key not in after:
+            changes.append({"shape": name, "change": "removed"})
+            continue
+        if key not in before:
+            changes.append({"shape": name, "change": "added"})
+            continue
+        a, b = before[key], after[key]
+        details = {}
+        if a.get("geometry") != b.get("geometry"):
+            details["geometry"] = [a.get("geometry"), b.get("geometry")]
+        if a.get("image_hash") != b.get("image_hash"):
+            details["image"] = [a.get("image"), b.get("image")]
+        text = _text_diff(a, b)
+        if text:
+            details["text"] = text
+        if a["kind"] != b["kind"]:
+            details["kind"] = [a["kind"], b["kind"]]
+        if details:
+            changes.append({"shape": name, "change": "changed", **details})
+    return changes
+
+
+def _slide_content(zf, part, hashes):
+    # The slide's XML plus what each of its relationships points at, by content:
+    # media renumbered between saves (image12 → image17) doesn't count as a change
+    rels = _relationships(zf, part)
+    return hashes.get(part), sorted((rid, hashes.get(target)) for rid, target in rels.items()), rels
+
+
+def diff_decks(path_a, path_b) -> dict:
+    """
+    Compare two decks part by part, then slide by slide (matched by position)
+    for the slides whose own parts or referenced media differ.
+    """
+    hashes_a, hashes_b = part_hashes(path_a), part_hashes(path_b)
+    report = {
+        "identical": deck_digest(hashes_a) == deck_digest(hashes_b),
+        "digests": [deck_digest(hashes_a), deck_digest(hashes_b)],
+        "parts": {
+            "added": sorted(p for p in hashes_b if p not in hashes_a),
+            "removed": sorted(p for p in hashes_a if p not in hashes_b),
+            "changed": sorted(p for p in hashes_a if p in hashes_b and hashes_a[p] != hashes_b[p]),
+        },
+        "slides": [],
+        "media": [],
+    }
+    if report["identical"]:
+        return report
+
+    with zipfile.ZipFile(path_a) as za, zipfile.ZipFile(path_b) as zb:
+        slides_a, slides_b = slide_parts(za), slide_parts(zb)
+        media_users = {}
+        for index in range(max(len(slides_a), len(slides_b))):
+            part_a = slides_a[index] if index < len(slides_a) else None
+            part_b = slides_b[index] if index < len(slides_b) else None
+            entry = {"slide": index + 1, "parts": [part_a, part_b]}
+            if part_a is None or part_b is None:
+                entry["change"] = "added" if part_a is None else "removed"
+                report["slides"].append(entry)
+                continue
+
+            *content_a, rels_a = _slide_content(za, part_a, hashes_a)
+            *content_b, rels_b = _slide_content(zb, part_b, hashes_b)
+            for media in set(rels_a.values()) | set(rels_b.values()):
+                if media.startswith("ppt/media/"):
+                    media_users.setdefault(media, set()).add(index + 1)
+            if content_a == content_b:
+                continue
+            entry["change"] = "changed"
+            entry["shapes"] = diff_shapes(slide_shapes(za, part_a, hashes_a), slide_shapes(zb, part_b, hashes_b))
+            report["slides"].append(entry)
+
+    for media in sorted(set(report["parts"]["added"] + report["parts"]["removed"] + report["parts"]["changed"])):
+        if media.startswith("ppt/media/"):
+            change = "added" if media in report["parts"]["added"] else \
+                "removed" if media in report["parts"]["removed"] else "changed"
+            report["media"].append({"part": media, "change": change, "slides": sorted(media_users.get(media, ()))})
+    return report
+
+
+def format_report(report) -> str:
+    if report["identical"]:
+        return f"Decks are identical ({report['digests'][0][:16]})."
+    lines = []
+    parts = report["parts"]
+    lines.append(f"Parts: {len(parts['changed'])} changed, {len(parts['added'])} added, {len(parts['removed'])} removed")
+    for entry in report["slides"]:
+        if entry["change"] != "changed":
+            lines.append(f"Slide {entry['slide']}: {entry['change']}")
+            continue
+        lines.append(f"Slide {entry['slide']} ({entry['parts'][0]} → {entry['parts'][1]}):")
+        if not entry["shapes"]:
+            lines.append("    (parts differ, shapes identical)")
+        for shape in entry["shapes"]:
+            lines.append(f"    {shape['shape']}: {shape['change']}")
+            if "geometry" in shape:
+                lines.append(f"        geometry {shape['geometry'][0]} → {shape['geometry'][1]}")
+            if "image" in shape:
+                lines.append(f"        image {shape['image'][0]} → {shape['image'][1]}")
+            if "kind" in shape:
+                lines.append(f"        kind {shape['kind'][0]} → {shape['kind'][1]}")
+            for line in shape.get("text", []):
+                lines.append(f"        {line}")
+    for media in report["media"]:
+        used = ", ".join(str(s) for s in media["slides"]) or "no slide"
+        lines.append(f"Media {media['part']}: {media['change']} (slide {used})")
+    slide_parts_seen = {p for e in report["slides"] for p in e["parts"] if p}
+    other = [p for p in parts["changed"] + parts["added"] + parts["removed"]
+             if not p.startswith(("ppt/media/", "ppt/slides/")) and p not in slide_parts_seen]
+    if other:
+        lines.append(f"Other parts: {', '.join(other)}")
+    return "\n".join(lines)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare two decks part by part, or list one deck's part hashes")
+    parser.add_argument("decks", nargs="+", help="One .pptx (list its part hashes) or two (diff them)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if len(args.decks) == 1:
+        hashes = part_hashes(args.decks[0])
+        if args.json:
+            print(json.dumps({"digest": deck_digest(hashes), "parts": hashes}, indent=2))
+        else:
+            for name in sorted(hashes):
+                print(f"{hashes[name]}  {name}")
+            print(f"{deck_digest(hashes)}  (deck)")
+        sys.exit(0)
+    if len(args.decks) != 2:
+        parser.error("give one deck to hash or two decks to compare")
+
+    report = diff_decks(*args.decks)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    sys.exit(0 if report["identical"] else 1)
@@ -0,0 +1,159 @@
+# export.py
+
+import os
+import shutil
+import hashlib
+import tempfile
+import zipfile
+import threading
+import subprocess
+from concurrent.futures import Future, ProcessPoolExecutor
+from preview import find_backend, RENDERERS, _soffice
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Deck Hashing
+# ─────────────────────────────────────────────────────────────────────────────
+def deck_content_hash(pptx_path) -> str:
+    """
+    Hash of every package part's name and bytes. Unlike hashing the file,
+    this ignores zip timestamps, so the same deck saved twice hashes the same.
+    """
+    h = hashlib.sha256()
+    with zipfile.ZipFile(pptx_path) as zf:
+        for name in sorted(zf.namelist()):
+            h.update(name.encode("utf-8"))
+            with zf.open(name) as member:
+                for chunk in iter(lambda: member.read(1024 * 1024), b""):
+                    h.update(chunk)
+    return h.hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Converters (run in worker processes)
+# ─────────────────────────────────────────────────────────────────────────────
+def _pdf_aspose(pptx_path, pdf_path):
+    import aspose.slides as slides
+    with slides.Presentation(pptx_path) as pres:
+        pres.save(pdf_path, slides.export.SaveFormat.PDF)
+
+
+def _pdf_libreoffice(pptx_path, pdf_path):
+    outdir = os.path.dirname(pptx_path)
+    subprocess.run(
+        [_soffice(), "--headless", "--convert-to", "pdf", "--outdir", outdir, pptx_path],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=600,
+    )
+    shutil.move(os.path.splitext(pptx_path)[0] + ".pdf", pdf_path)
+
+
+PDF_CONVERTERS = {
+    "aspose": _pdf_aspose,
+    "libreoffice": _pdf_libreoffice,
+}
+
+
+def _slide_count(pptx_path):
+    with zipfile.ZipFile(pptx_path) as zf:
+        return sum(1 for n in zf.namelist() if n.startswith("ppt/slides/slide") and n.endswith(".xml"))
+
+
+def _convert(pptx_path, out_dir, formats, backend, scale):
+    """
+    Convert one staged deck into `out_dir`: deck.pdf and/or slide_01.png,
+    slide_02.png, ... The staged .pptx is consumed.
+    """
+    with tempfile.TemporaryDirectory(prefix="export_") as tmp:
+        deck_path = os.path.join(tmp, "deck.pptx")
+        shutil.move(pptx_path, deck_path)
+        staging = os.path.join(tmp, "out")
+        os.makedirs(staging)
+
+        if "pdf" in formats:
+            PDF_CONVERTERS[backend](deck_path, os.path.join(staging, "deck.pdf"))
+        if "png" in formats:
+            count = _slide_count(deck_path)
+            out_paths = [os.path.join(staging, f"slide_{i + 1:02d}.png") for i in range(count)]
+            RENDERERS[backend](deck_path, list(range(count)), out_paths, scale)
+
+        # Publish the finished artifacts in one step so readers never see a partial export
+        os.makedirs(os.path.dirname(out_dir), exist_ok=True)
+        try:
+            os.rename(staging, out_dir)
+        except OSError:
+            if not os.path.isdir(out_dir):
+                shutil.copytree(staging, out_dir)
+    return out_dir
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Export Service
+# ─────────────────────────────────────────────────────────────────────────────
+class ExportService:
+    """
+    Converts finished decks to PDF and per-slide PNGs in a separate process
+    pool. Results are cached under `cache_dir/<deck content hash>/`, and a
+    deck already being converted shares the in-flight job.
+    """
+
+    def __init__(self, cache_dir="exports", workers=2, scale=1.0, backend=None):
+        self.cache_dir = cache_dir
+        self.scale = scale
+        self.backend = backend or find_backend()
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._inflight = {}
+        self._lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def artifacts(self, out_dir, formats=("pdf", "png")):
+        """{"pdf": path, "png": [paths]} for the formats present in `out_dir`."""
+        found = {}
+        if "pdf" in formats and os.path.exists(os.path.join(out_dir, "deck.pdf")):
+            found["pdf"] = os.path.join(out_dir, "deck.pdf")
+        if "png" in formats:
+            pngs = sorted(n for n in os.listdir(out_dir) if n.endswith(".png")) if os.path.isdir(out_dir) else []
+            if pngs:
+                found["png"] = [os.path.join(out_dir, n) for n in pngs]
+        return found
+
+    def submit(self, pptx_path, formats=("pdf", "png")):
+        """
+        Queue an export of the deck at `pptx_path`. Returns a Future whose
+        result is the artifacts dict; cached decks complete immediately.
+        """
+        formats = tuple(sorted(formats))
+        key = f"{deck_content_hash(pptx_path)}-{'-'.join(formats)}"
+        out_dir = os.path.join(self.cache_dir, key)
+
+        if os.path.isdir(out_dir):
+            done = Future()
+            done.set_result(self.artifacts(out_dir, formats))
+            return done
+        if self.backend is None:
+            failed = Future()
+            failed.set_exception(RuntimeError("No export backend available (install aspose.slides or LibreOffice + poppler)."))
+            return failed
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                # Stage a private copy now, so the caller may overwrite the deck afterwards
+                staged = os.path.join(self.cache_dir, ".incoming", f"{key}.pptx")
+                os.makedirs(os.path.dirname(staged), exist_ok=True)
+                shutil.copyfile(pptx_path, staged)
+                inner = self._executor.submit(_convert, os.path.abspath(staged), os.path.abspath(out_dir),
+                                              formats, self.backend, self.scale)
+                future = Future()
+
+                def publish(f, future=future, key=key):
+                    with self._lock:
+                        self._inflight.pop(key, None)
+                    if f.exception() is not None:
+                        future.set_exception(f.exception())
+                    else:
+                        future.set_result(self.artifacts(out_dir, formats))
+
+                self._inflight[key] = future
+                inner.add_done_callback(publish)
+        return future
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
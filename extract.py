@@ -0,0 +1,138 @@
+# extract.py
+
+import io
+import sys
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from app import load_dataframe, extract_recap_metrics
+from service import NamedBytesIO
+
+
+PROPOSED_KEYS = {"Impressions": "proposed_impressions", "Engagements": "proposed_engagements",
+                 "Influencers": "proposed_influencers"}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Metric Rows
+# ─────────────────────────────────────────────────────────────────────────────
+def _plain(value):
+    # numpy scalars → Python numbers, NaN → None, so rows serialize cleanly
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def flatten_metrics(metrics) -> dict:
+    """extract_recap_metrics() output as one flat row (proposed metrics get their own columns)."""
+    row = {k: _plain(v) for k, v in metrics.items() if k != "proposed_metrics"}
+    proposed = metrics.get("proposed_metrics") or {}
+    for name, column in PROPOSED_KEYS.items():
+        row[column] = _plain(proposed.get(name, ""))
+    return row
+
+
+def workbook_metrics(src) -> dict:
+    """
+    The flat metrics row for one workbook (path or upload). Only the sheet
+    is read: no template, no images.
+    """
+    return flatten_metrics(extract_recap_metrics(load_dataframe(src)))
+
+
+def _safe_metrics(path):
+    try:
+        return path, workbook_metrics(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def extract_many(paths, workers=None, chunksize=16):
+    """
+    Extract every workbook in `paths` on a process pool. Returns
+    (rows, errors): {path: row} in input order and {path: message}.
+    """
+    rows, errors = {}, {}
+    if len(paths) == 1:
+        # Not worth starting a pool for one file
+        results = [_safe_metrics(paths[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_safe_metrics, paths, chunksize=chunksize))
+    for path, row, error in results:
+        if error is None:
+            rows[path] = row
+        else:
+            errors[path] = error
+    return rows, errors
+
+
+def extract_uploads(files) -> tuple:
+    """
+    Like extract_many() for in-memory files ({name: bytes}), in this process.
+    The API runs it on GenerationService's workers (see submit_extract()).
+    """
+    rows, errors = {}, {}
+    for name, data in files.items():
+        try:
+            rows[name] = workbook_metrics(NamedBytesIO(data, name))
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return rows, errors
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Output
+# ─────────────────────────────────────────────────────────────────────────────
+def metric_columns(rows) -> list:
+    columns = []
+    for row in rows.values():
+        columns.extend(k for k in row if k not in columns)
+    return columns
+
+
+def write_json(rows, errors, out):
+    json.dump({"workbooks": rows, "errors": errors}, out, indent=2, default=str)
+    out.write("\n")
+
+
+def write_csv(rows, out):
+    writer = csv.writer(out)
+    columns = metric_columns(rows)
+    writer.writerow(["workbook"] + columns)
+    for name, row in rows.items():
+        writer.writerow([name] + ["" if row.get(c) is None else row.get(c) for c in columns])
+
+
+def render(rows, errors, fmt="json") -> str:
+    out = io.StringIO()
+    if fmt == "csv":
+        write_csv(rows, out)
+    else:
+        write_json(rows, errors, out)
+    return out.getvalue()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Extract recap metrics from workbooks without building decks")
+    parser.add_argument("workbooks", nargs="+", help="Campaign CSV/Excel files")
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="Output format")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    rows, errors = extract_many(args.workbooks, args.workers)
+    text = render(rows, errors, args.format)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    for name, error in errors.items():
+        print(f"Warning: skipped {name}: {error}", file=sys.stderr)
+    if not rows:
+        sys.exit(1)
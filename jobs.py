@@ -0,0 +1,156 @@
+# jobs.py
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Job State
+# ─────────────────────────────────────────────────────────────────────────────
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Share of the overall progress bar given to each generator stage
+STAGE_WEIGHTS = {"images": 0.4, "text": 0.5, "save": 0.1}
+STAGE_ORDER = ["images", "text", "save"]
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's progress callback once the job has been cancelled."""
+
+    counts_as_failure = False  # see opsmetrics.stage()
+
+
+class QueueFull(Exception):
+    """Raised by JobRunner.submit() when too many jobs are already waiting."""
+
+
+class Job:
+    """
+    One background generation run. The runner passes `job.report` to the
+    generator as its `progress` callback; cancel() takes effect at the next
+    progress report.
+    """
+
+    def __init__(self, label=""):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.status = QUEUED
+        self.stage = None
+        self.stage_fraction = 0.0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def progress(self):
+        """Overall completion in [0, 1] across all stages."""
+        if self.status == DONE:
+            return 1.0
+        if self.stage not in STAGE_WEIGHTS:
+            return 0.0
+        done = sum(STAGE_WEIGHTS[s] for s in STAGE_ORDER[:STAGE_ORDER.index(self.stage)])
+        return min(done + STAGE_WEIGHTS[self.stage] * self.stage_fraction, 1.0)
+
+    def report(self, stage, fraction):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+        self.stage = stage
+        self.stage_fraction = fraction
+
+    def cancel(self):
+        """Request cancellation; a queued job never starts, a running one stops at its next report."""
+        self._cancel.set()
+        if self.status == QUEUED:
+            self.status = CANCELLED
+            self.finished_at = time.time()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Job Runner
+# ─────────────────────────────────────────────────────────────────────────────
+class JobRunner:
+    """
+    Runs generation jobs on a fixed pool of worker threads with a bounded
+    queue: submit() refuses new work once `max_queue` jobs are waiting, so a
+    busy server sheds load instead of piling it up.
+    """
+
+    def __init__(self, max_workers=2, max_queue=8, keep_finished=200):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generate")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label="", **kwargs):
+        """
+        Queue fn(*args, progress=job.report, **kwargs) and return its Job.
+        Raises QueueFull when the queue is at capacity.
+        """
+        with self._lock:
+            if self.queued() >= self.max_queue:
+                raise QueueFull(f"{self.max_queue} jobs already waiting; try again shortly.")
+            job = Job(label)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def poll(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def queued(self):
+        return sum(1 for job in self._jobs.values() if job.status == QUEUED)
+
+    def running(self):
+        return sum(1 for job in self._jobs.values() if job.status == RUNNING)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.status == CANCELLED:
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, progress=job.report, **kwargs)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job.id]
+
+    def metric_samples(self) -> list:
+        """Job gauges for opsmetrics.Registry.register_collector()."""
+        return [
+            ("recap_jobs", "Background generation jobs.", self.queued(), {"state": "queued"}),
+            ("recap_jobs", "Background generation jobs.", self.running(), {"state": "running"}),
+        ]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,243 @@
+# layout.py
+
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Label Blocks
+# ─────────────────────────────────────────────────────────────────────────────
+# The recap sheet is a set of label/value column pairs. Each block is found
+# by the column holding most of its labels; its values are in the nearest
+# column with numbers on those label rows, looked for on the `side` the
+# stock sheet has them first (+1 right, -1 left).
+ORGANIC_LABELS = (
+    "Total Number of Posts With Stories", "Organic (Views)", "Organic (Reach)", "Paid", "Total Engagements",
+    "Total", "Total Impressions", "Program ER", "Total Likes", "Total Comments", "Total Shares", "Total Saves",
+    "Paid Engagements", "Total Story Engagements", "C2C Transfers", "C2C Value",
+)
+PAID_LABELS = ("Reactions", "Comments", "Shares", "Saves", "3 sec vid views")
+COST_LABELS = ("CPE", "CPC", "CTR", "CPM", "ThruPlays")
+
+BLOCKS = {
+    "organic": (ORGANIC_LABELS, +1),
+    "paid": (PAID_LABELS, -1),
+    "cost": (COST_LABELS, -1),
+}
+# Without these there is no deck; a sheet missing any other block gets blank metrics, with a warning
+REQUIRED_BLOCKS = ("organic", "paid")
+
+# The influencer count is labelled in the paid values column, with its value to the right
+INFLUENCER_LABEL = "Influencers"
+
+# The period-over-period % increases sit to the right of the paid labels: impressions on the
+# "3 sec vid views" row, engagements on the row below it
+INCREASE_ANCHORS = {"impressions": ("3 sec vid views", 0), "engagements": ("3 sec vid views", 1)}
+
+
+class LayoutError(ValueError):
+    """Raised when a block of the recap sheet can't be located."""
+
+
+class Layout:
+    """
+    Resolved column names for one workbook layout: `columns[block]` is a
+    (label column, value column) pair and `increase_cells[name]` a (row,
+    column) cell, either None when the sheet has no such block or value.
+    Plain values, so layouts are cheap to cache and share.
+    """
+
+    def __init__(self, fingerprint, columns, increase_cells):
+        self.fingerprint = fingerprint
+        self.columns = columns
+        self.increase_cells = increase_cells
+
+    def __repr__(self):
+        return f"Layout({self.fingerprint[:12]}, {self.columns}, {self.increase_cells})"
+
+    def matches(self, df) -> bool:
+        """
+        Cheap check that each block still has a label in its label column and
+        a number beside it, and each % increase is a number on its anchor row.
+        """
+        for block, (block_labels, _) in BLOCKS.items():
+            if self.columns[block] is None:
+                return False  # resolved again, in case this sheet has it
+            label_col, value_col = self.columns[block]
+            if label_col not in df.columns or value_col not in df.columns:
+                return False
+            wanted = set(block_labels)
+            if not any(_is_label(label) and label.strip() in wanted and _is_number(value)
+                       for label, value in zip(df[label_col].tolist(), df[value_col].tolist())):
+                return False
+        if self.columns["influencers"] is None:
+            return False
+        paid_label_col = self.columns["paid"][0]
+        for name, cell in self.increase_cells.items():
+            if cell is None:
+                return False  # resolved again, in case this sheet has it
+            row, col = cell
+            anchor, row_offset = INCREASE_ANCHORS[name]
+            if col not in df.columns or row not in df.index or row - row_offset not in df.index:
+                return False
+            if str(df.at[row - row_offset, paid_label_col]).strip() != anchor or not _is_number(df.at[row, col]):
+                return False
+        return True
+
+
+def _is_label(value):
+    return isinstance(value, str) and any(c.isalpha() for c in value)
+
+
+def _is_number(value):
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return value == value  # not NaN
+    if isinstance(value, str):
+        try:
+            float(value.replace(",", "").rstrip("%"))
+            return True
+        except ValueError:
+            return False
+    return hasattr(value, "item") and _is_number(value.item())
+
+
+def _column_labels(df):
+    """{column position: {stripped label, ...}} for every column with text cells that look like labels."""
+    labels = {}
+    for pos, column in enumerate(df.columns):
+        cells = {value.strip() for value in df[column].tolist() if _is_label(value)}
+        if cells:
+            labels[pos] = cells
+    return labels
+
+
+def layout_fingerprint(df) -> str:
+    """
+    Hash of the sheet's header row. pandas names blank headers by position
+    ("Unnamed: 11"), so an inserted or removed column changes it, while every
+    campaign in a client's recurring format shares one fingerprint.
+    """
+    return hashlib.sha1("\x1f".join(str(c) for c in df.columns).encode("utf-8")).hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Resolution
+# ─────────────────────────────────────────────────────────────────────────────
+def _label_rows(df, pos, labels):
+    wanted = set(labels)
+    return [row for row, value in enumerate(df.iloc[:, pos].tolist()) if _is_label(value) and value.strip() in wanted]
+
+
+def _nearest_value_column(df, pos, rows, side, exclude=(), one_side=False):
+    """
+    Position of the column nearest `pos` with numbers on at least half of
+    `rows` (at every distance, `side` is tried first), or None.
+    """
+    needed = max(1, (len(rows) + 1) // 2)
+    for distance in range(1, len(df.columns)):
+        for candidate in (pos + side * distance,) if one_side else (pos + side * distance, pos - side * distance):
+            if not 0 <= candidate < len(df.columns) or candidate in exclude:
+                continue
+            cells = df.iloc[:, candidate].tolist()
+            if sum(1 for row in rows if _is_number(cells[row])) >= needed:
+                return candidate
+    return None
+
+
+def resolve_layout(df) -> Layout:
+    """Find every block's label/value columns in `df` by scanning all its cells (no caching)."""
+    texts = _column_labels(df)
+    names = list(df.columns)
+
+    columns = {}
+    positions = {}
+    for block, (block_labels, side) in BLOCKS.items():
+        wanted = set(block_labels)
+        best = max(texts, key=lambda pos: (len(texts[pos] & wanted), -pos), default=None)
+        if best is None or not texts[best] & wanted:
+            problem = f"Could not find the {block} block: no column has any of {', '.join(block_labels)}."
+        else:
+            value_pos = _nearest_value_column(df, best, _label_rows(df, best, block_labels), side)
+            problem = None if value_pos is not None else \
+                f"Could not find the {block} values: no column beside {names[best]!r} has numbers."
+        if problem is not None:
+            if block in REQUIRED_BLOCKS:
+                raise LayoutError(problem)
+            print(f"Warning: {problem} Leaving its metrics blank.", file=sys.stderr)
+            columns[block] = None
+            continue
+        positions[block] = (best, value_pos)
+        columns[block] = (names[best], names[value_pos])
+
+    paid_label_pos, paid_value_pos = positions["paid"]
+    influencer_rows = _label_rows(df, paid_value_pos, (INFLUENCER_LABEL,))
+    influencer_pos = _nearest_value_column(df, paid_value_pos, influencer_rows[:1], +1) if influencer_rows else None
+    if influencer_pos is None:
+        print(f"Warning: no {INFLUENCER_LABEL!r} label with a number beside it in {names[paid_value_pos]!r}; "
+              f"leaving the influencer count blank.", file=sys.stderr)
+        columns["influencers"] = None
+    else:
+        columns["influencers"] = (names[paid_value_pos], names[influencer_pos])
+
+    # The increases are optional: a sheet without them gets blanks, with a warning
+    increase_cells = {}
+    anchor_rows = {anchor: _label_rows(df, paid_label_pos, (anchor,)) for anchor, _ in INCREASE_ANCHORS.values()}
+    for name, (anchor, row_offset) in INCREASE_ANCHORS.items():
+        rows = [r + row_offset for r in anchor_rows[anchor][:1] if r + row_offset < len(df)]
+        pos = _nearest_value_column(df, paid_label_pos, rows, +1, exclude=(paid_value_pos,), one_side=True) \
+            if rows else None
+        if pos is None:
+            print(f"Warning: no {name} % increase to the right of the {anchor!r} row; leaving it blank.",
+                  file=sys.stderr)
+            increase_cells[name] = None
+        else:
+            increase_cells[name] = (df.index[rows[0]], names[pos])
+    return Layout(layout_fingerprint(df), columns, increase_cells)
+
+
+class LayoutCache:
+    """
+    LRU cache of resolved layouts keyed by layout_fingerprint(). A workbook
+    in a format seen before only has its cached anchor columns checked
+    instead of every cell searched; a shifted format (or a block moved under
+    the same headers) is resolved once and cached in turn.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, df) -> Layout:
+        fingerprint = layout_fingerprint(df)
+        with self._lock:
+            layout = self._entries.get(fingerprint)
+            if layout is not None:
+                self._entries.move_to_end(fingerprint)
+        if layout is not None and layout.matches(df):
+            self.hits += 1
+            return layout
+        self.misses += 1
+
+        layout = resolve_layout(df)
+        with self._lock:
+            self._entries[fingerprint] = layout
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return layout
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+LAYOUT_CACHE = LayoutCache()
@@ -0,0 +1,367 @@
+# loadtest.py
+
+import io
+import os
+import sys
+import json
+import math
+import contextlib
+import time
+import random
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from app import IncrementalDeckBuilder, load_dataframe
+from jobs import JobRunner, QueueFull, DONE
+from service import GenerationService, ServiceBusy, NamedBytesIO, generation_request
+
+
+IMAGE_SLOTS = [
+    "slide_6", "slide_7_left", "slide_7_right",
+    "slide_8_first", "slide_8_second", "slide_8_third", "slide_8_fourth",
+    "slide_11_first", "slide_11_second", "slide_11_third", "slide_11_fourth",
+]
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Synthetic Inputs
+# ─────────────────────────────────────────────────────────────────────────────
+def synthetic_workbook(seed=0) -> bytes:
+    """An .xlsx in the stock recap layout with made-up (but valid) numbers."""
+    from openpyxl import Workbook
+
+    rnd = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Recap"
+
+    def put(row, col, value):  # 0-based data row / column, below the header row
+        ws.cell(row=row + 2, column=col + 1, value=value)
+
+    ws.cell(row=1, column=1, value="Diversity")
+    ws.cell(row=1, column=11, value="Organic & Total")
+    ws.cell(row=1, column=14, value="Dates")
+    put(0, 0, f"{rnd.randint(20, 60)}%")
+    put(0, 2, "Proposed Metrics")
+    for i, name in enumerate(("Impressions", "Engagements", "Influencers")):
+        put(1 + i, 2, name)
+        put(1 + i, 3, rnd.randint(10, 100000))
+
+    organic = ["Total Number of Posts With Stories", "Organic (Views)", "Organic (Reach)", "Paid",
+               "Total Engagements", "Total", "Program ER", "Total Likes", "Total Comments", "Total Shares",
+               "Total Saves", "Paid Engagements", "Total Story Engagements", "C2C Transfers", "C2C Value"]
+    for i, label in enumerate(organic):
+        put(i, 10, label)
+        put(i, 11, round(rnd.uniform(0.01, 0.09), 4) if label == "Program ER" else rnd.randint(10, 500000))
+    for i, label in enumerate(("Reactions", "Comments", "Shares", "Saves", "3 sec vid views")):
+        put(i, 14, label)
+        put(i, 13, rnd.randint(10, 5000))
+    put(6, 13, "Influencers")
+    put(6, 14, rnd.randint(5, 60))
+    put(4, 15, round(rnd.uniform(0, 1), 3))
+    put(5, 15, round(rnd.uniform(0, 1), 3))
+    for i, label in enumerate(("CPE", "CPC", "CTR", "CPM", "ThruPlays", 0.25, 0.5, 0.75, 1)):
+        put(i, 18, label)
+        put(i, 17, round(rnd.uniform(0.05, 5), 2) if i < 4 else rnd.randint(100, 9000))
+
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def synthetic_photo(seed, size) -> bytes:
+    """A noisy JPEG of `size` pixels, so it compresses (and decodes) like a real photo."""
+    from PIL import Image
+
+    rnd = random.Random(seed)
+    noise = Image.effect_noise(size, 60)
+    tint = Image.new("RGB", size, tuple(rnd.randint(0, 255) for _ in range(3)))
+    img = Image.blend(tint, Image.merge("RGB", (noise, noise, noise)), 0.5)
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+
+def synthetic_photos(seed, size) -> dict:
+    return {slot: synthetic_photo(seed * 100 + i, size) for i, slot in enumerate(IMAGE_SLOTS)}
+
+
+def session_marker(session, round_):
+    return f"#loadtest-s{session}-r{round_}"
+
+
+def synthetic_text_inputs(session, round_) -> dict:
+    # Each round edits a little text, like a user tweaking the form between generations;
+    # the slide 1 hashtag identifies the deck so mixed-up outputs can be detected
+    return {
+        "slide_1_d": "January 1, 2025", "slide_1_htg": session_marker(session, round_),
+        "slide_2_d": "January 1, 2025", "slide_2_htg": "#CampaignHashtag",
+        "slide_3_d": "January 1, 2025", "slide_3_htg": "#CampaignHashtag",
+        "slide_4_b1": f"Goal one, take {round_}", "slide_4_b2": "Goal two",
+        "slide_6": f"@session{session}", "slide_9": f"Round {round_} summary",
+    }
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────────────────────
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def rss_bytes():
+    """Current resident set size of this process (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemorySampler:
+    """Samples this process's RSS on a background thread while a load level runs."""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+
+    def _loop(self):
+        while True:
+            self.samples.append(rss_bytes())
+            if self._stop.wait(self.interval):
+                break
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append(rss_bytes())
+
+
+class LoadStats:
+    """Thread-safe tally of one load level's generations."""
+
+    def __init__(self):
+        self.latencies = []
+        self.queue_waits = []
+        self.rejected = 0
+        self.failures = []
+        self.collisions = []
+        self._claimed = {}
+        self._lock = threading.Lock()
+
+    def claim(self, path, owner):
+        """Record that `owner` (session, round) is about to write `path`; a second writer is a collision."""
+        with self._lock:
+            previous = self._claimed.get(path)
+            self._claimed[path] = owner
+        if previous is not None:
+            self.collision(f"{os.path.basename(path)} written by session {previous[0]} round {previous[1]} "
+                           f"and session {owner[0]} round {owner[1]}")
+
+    def collision(self, message):
+        with self._lock:
+            self.collisions.append(message)
+
+    def finished(self, latency, queue_wait):
+        with self._lock:
+            self.latencies.append(latency)
+            self.queue_waits.append(queue_wait)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def fail(self, message):
+        with self._lock:
+            self.failures.append(message)
+
+
+def deck_title_text(path):
+    from pptx import Presentation
+    slide = Presentation(path).slides[0]
+    return " ".join(shape.text_frame.text for shape in slide.shapes if shape.has_text_frame)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sessions
+# ─────────────────────────────────────────────────────────────────────────────
+def _generate_with_service(service, request, output_path, progress=None):
+    # As streamlitads.generate_with_service()
+    with open(output_path, "wb") as f:
+        f.write(service.generate(request, progress=progress))
+
+
+def run_session(session, config, runner, service, stats, inputs):
+    """
+    One simulated Streamlit session: its own scratch directory and deck
+    builder, `rounds` generations through the shared runner with think time
+    in between, each output checked for the session's own marker.
+    """
+    workbook, photos = inputs
+    workbook_name = f"campaign_{session}.xlsx"
+    scratch_dir = tempfile.mkdtemp(prefix="recap_session_")
+    builder = IncrementalDeckBuilder(config["template"])
+    rnd = random.Random(session)
+    try:
+        for round_ in range(config["rounds"]):
+            text_inputs = synthetic_text_inputs(session, round_)
+            df = load_dataframe(NamedBytesIO(workbook, workbook_name))
+            # Same output naming as the app's Generate button
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = os.path.join(scratch_dir, f"recap_deck_output_{timestamp}.pptx")
+            stats.claim(output_path, (session, round_))
+
+            clicked_at = time.time()
+            while True:
+                try:
+                    if service is not None:
+                        request = generation_request(workbook, workbook_name, text_inputs, photos, config["template"])
+                        job = runner.submit(_generate_with_service, service, request, output_path, label=timestamp)
+                    else:
+                        job = runner.submit(builder.build, df, output_path, images=photos,
+                                            text_inputs=text_inputs, label=timestamp)
+                    break
+                except (QueueFull, ServiceBusy):
+                    # The app shows "server busy"; a user tries again a moment later
+                    stats.reject()
+                    time.sleep(config["retry_after"])
+            while not job.finished:
+                time.sleep(config["poll"])
+
+            if job.status != DONE:
+                stats.fail(f"session {session} round {round_}: {job.status} {job.error or ''}".strip())
+            else:
+                stats.finished(job.finished_at - clicked_at, job.started_at - job.submitted_at)
+                marker = session_marker(session, round_)
+                if marker not in deck_title_text(output_path):
+                    stats.collision(f"session {session} round {round_}: {os.path.basename(output_path)} "
+                                    f"doesn't hold this session's deck")
+            time.sleep(config["think"] * rnd.uniform(0.5, 1.5))
+    finally:
+        if not config["keep"]:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def run_level(sessions, config, inputs):
+    """Run `sessions` concurrent sessions against a fresh runner (and service); returns a report dict."""
+    server_workers = config["workers"]
+    # Sized like streamlitads.get_job_runner() / get_generation_service()
+    threads = max(server_workers, 2)
+    runner = JobRunner(max_workers=threads, max_queue=threads * 4)
+    service = GenerationService(workers=server_workers) if server_workers > 0 else None
+    stats = LoadStats()
+
+    sampler = MemorySampler().start()
+    started = time.perf_counter()
+    workers = []
+    for session in range(sessions):
+        t = threading.Thread(target=run_session, name=f"session-{session}",
+                             args=(session, config, runner, service, stats, inputs[session % len(inputs)]))
+        t.start()
+        workers.append(t)
+        if config["ramp"] and sessions > 1:
+            time.sleep(config["ramp"] / (sessions - 1))
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+
+    runner.shutdown()
+    if service is not None:
+        service.shutdown()
+
+    completed = len(stats.latencies)
+    report = {
+        "sessions": sessions,
+        "decks": completed,
+        "elapsed_s": elapsed,
+        "throughput_per_min": completed / elapsed * 60 if elapsed else 0.0,
+        "latency_s": {f"p{q}": percentile(stats.latencies, q) for q in PERCENTILES},
+        "queue_wait_s": {f"p{q}": percentile(stats.queue_waits, q) for q in PERCENTILES},
+        "rejected": stats.rejected,
+        "failed": stats.failures,
+        "collisions": stats.collisions,
+        "rss_start_mb": sampler.samples[0] / 2**20,
+        "rss_peak_mb": max(sampler.samples) / 2**20,
+        "rss_end_mb": sampler.samples[-1] / 2**20,
+    }
+    report["latency_s"]["max"] = max(stats.latencies, default=0.0)
+    return report
+
+
+def print_report(report):
+    lat = report["latency_s"]
+    wait = report["queue_wait_s"]
+    print(f"{report['sessions']:>4} sessions  {report['decks']:>4} decks  "
+          f"{report['throughput_per_min']:6.1f}/min  "
+          f"latency p50 {lat['p50']:6.2f}s p90 {lat['p90']:6.2f}s p99 {lat['p99']:6.2f}s max {lat['max']:6.2f}s  "
+          f"queue p90 {wait['p90']:5.2f}s  "
+          f"rss {report['rss_start_mb']:.0f}→{report['rss_peak_mb']:.0f}→{report['rss_end_mb']:.0f} MB  "
+          f"rejected {report['rejected']}  failed {len(report['failed'])}  collisions {len(report['collisions'])}")
+    for message in report["failed"][:5]:
+        print(f"    failed: {message}")
+    for message in report["collisions"][:5]:
+        print(f"    collision: {message}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulate concurrent app sessions generating decks")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrent sessions per load level (default: 1 2 4 8)")
+    parser.add_argument("--rounds", type=int, default=3, help="Generations per session")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean seconds a user waits between generations")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which sessions start")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("RECAP_WORKERS", "0") or 0),
+                        help="Generation worker processes, as RECAP_WORKERS (default: 0, in-process)")
+    parser.add_argument("--photo-size", default="1600x1200", help="Synthetic photo size, WxH pixels")
+    parser.add_argument("--distinct-inputs", type=int, default=4,
+                        help="Distinct workbook/photo sets shared round-robin by the sessions")
+    parser.add_argument("--template", default="template.pptx", help="PowerPoint template file")
+    parser.add_argument("--json", help="Also write the reports to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="Keep the sessions' scratch directories")
+    parser.add_argument("--verbose", action="store_true", help="Show the generator's own output")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.photo_size.lower().split("x"))
+    config = {
+        "template": os.path.abspath(args.template), "rounds": args.rounds, "think": args.think,
+        "ramp": args.ramp, "workers": args.workers, "keep": args.keep, "poll": 0.05, "retry_after": 0.5,
+    }
+
+    print(f"Preparing {args.distinct_inputs} synthetic workbook/photo sets ({args.photo_size})…")
+    inputs = [(synthetic_workbook(seed), synthetic_photos(seed, (width, height)))
+              for seed in range(max(args.distinct_inputs, 1))]
+
+    reports = []
+    for sessions in args.sessions:
+        # Per-deck diagnostics (stderr) and warnings (stdout) would drown the report; drop them unless asked
+        with contextlib.ExitStack() as quiet:
+            if not args.verbose:
+                quiet.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                quiet.enter_context(contextlib.redirect_stderr(io.StringIO()))
+            report = run_level(sessions, config, inputs)
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    if any(r["failed"] or r["collisions"] for r in reports):
+        sys.exit(1)
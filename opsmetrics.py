@@ -0,0 +1,321 @@
+# opsmetrics.py
+
+import os
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+
+
+# Seconds; deck generation runs from well under a second to a minute
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Set per thread by unrecorded()
+_local = threading.local()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Metrics
+# ─────────────────────────────────────────────────────────────────────────────
+class _Metric:
+    def __init__(self, registry, name, kind, help_text, labels=(), buckets=None):
+        self.registry = registry
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) if buckets else None
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+
+class Counter(_Metric):
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        if getattr(_local, "unrecorded", 0):
+            return
+        with self.registry._lock:
+            values = self.registry._values[self.name]
+            values[key] = values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        if getattr(_local, "unrecorded", 0):
+            return
+        with self.registry._lock:
+            values = self.registry._values[self.name]
+            state = values.get(key)
+            if state is None:
+                state = values[key] = [[0] * len(self.buckets), 0.0, 0]
+            # Per-bucket counts; render() accumulates them into Prometheus' cumulative "le" buckets
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """
+    Counters and histograms for one process, rendered in the Prometheus text
+    format. Gauges (queue depth and the like) come from collectors: callables
+    run at render time that return [(name, help, value, {label: value}), ...].
+
+    Worker processes hand their samples to the parent: drain() returns and
+    clears everything recorded so far, merge() adds such a batch here.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._values = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            self._values[metric.name] = {}
+            return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._add(Counter(self, name, "counter", help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, "histogram", help_text, labels, buckets))
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def reset(self):
+        with self._lock:
+            for values in self._values.values():
+                values.clear()
+
+    def drain(self) -> dict:
+        """{metric name: {label values: value}} recorded since the last drain; picklable."""
+        with self._lock:
+            batch = {}
+            for name, values in self._values.items():
+                if values:
+                    batch[name] = values.copy()
+                    values.clear()
+            return batch
+
+    def merge(self, batch):
+        with self._lock:
+            for name, samples in (batch or {}).items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                values = self._values[name]
+                for key, value in samples.items():
+                    if metric.kind == "counter":
+                        values[key] = values.get(key, 0) + value
+                        continue
+                    state = values.get(key)
+                    if state is None:
+                        state = values[key] = [[0] * len(metric.buckets), 0.0, 0]
+                    state[0] = [a + b for a, b in zip(state[0], value[0])]
+                    state[1] += value[1]
+                    state[2] += value[2]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            values = {name: {k: (v if not isinstance(v, list) else [list(v[0]), v[1], v[2]])
+                             for k, v in samples.items()} for name, samples in self._values.items()}
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in sorted(values[metric.name].items()):
+                if metric.kind == "counter":
+                    lines.append(f"{metric.name}{_label_text(metric.labels, key)} {_number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, n in zip(metric.buckets, counts):
+                    cumulative += n
+                    le = _label_text(metric.labels, key, [("le", _number(float(bound)))])
+                    lines.append(f"{metric.name}_bucket{le} {cumulative}")
+                lines.append(f"{metric.name}_bucket{_label_text(metric.labels, key, [('le', '+Inf')])} {count}")
+                lines.append(f"{metric.name}_sum{_label_text(metric.labels, key)} {_number(total)}")
+                lines.append(f"{metric.name}_count{_label_text(metric.labels, key)} {count}")
+
+        gauges = {}
+        for collector in collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print(f"Warning: metrics collector failed: {e}")
+                continue
+            for name, help_text, value, labels in samples:
+                gauges.setdefault(name, (help_text, []))[1].append((labels, value))
+        for name, (help_text, samples) in gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_label_text(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+DECKS_GENERATED = REGISTRY.counter("recap_decks_generated_total", "Decks written.")
+FAILURES = REGISTRY.counter("recap_failures_total", "Generation failures, by the stage that raised.", ("stage",))
+STAGE_SECONDS = REGISTRY.histogram("recap_stage_duration_seconds",
+                                   "Time spent per stage: load, extract, images, populate.", ("stage",))
+REQUEST_SECONDS = REGISTRY.histogram("recap_request_duration_seconds",
+                                     "Generation service requests, submit to finish (queue wait included).")
+IMAGE_BYTES = REGISTRY.counter("recap_image_bytes_total", "Bytes of uploaded images processed.")
+TEMPLATE_LOOKUPS = REGISTRY.counter("recap_template_cache_total", "Template registry lookups, by hit or miss.",
+                                    ("result",))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Instrumentation
+# ─────────────────────────────────────────────────────────────────────────────
+@contextmanager
+def stage(name):
+    """
+    Time a stage into recap_stage_duration_seconds. An exception is counted
+    once, against the innermost stage it escaped from; exceptions whose class
+    sets `counts_as_failure = False` (cancellations) aren't counted.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        if getattr(e, "counts_as_failure", True) and not getattr(e, "failed_stage", None):
+            try:
+                e.failed_stage = name
+            except AttributeError:
+                pass
+            FAILURES.inc(stage=name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+@contextmanager
+def unrecorded():
+    """
+    Drop every sample this thread records inside the block, e.g. the live
+    preview's rebuilds, which aren't decks anyone asked for.
+    """
+    _local.unrecorded = getattr(_local, "unrecorded", 0) + 1
+    try:
+        yield
+    finally:
+        _local.unrecorded -= 1
+
+
+def instrumented(name):
+    """Decorator form of stage()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Export
+# ─────────────────────────────────────────────────────────────────────────────
+def write_textfile(path, registry=REGISTRY):
+    """Write the current metrics to `path` (atomically, e.g. for node_exporter's textfile collector)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_textfile_writer(path, interval=15.0, registry=REGISTRY):
+    """Rewrite `path` every `interval` seconds from a daemon thread."""
+    def loop():
+        while True:
+            try:
+                write_textfile(path, registry)
+            except OSError as e:
+                print(f"Warning: could not write metrics to {path}: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="metrics-textfile", daemon=True)
+    thread.start()
+    return thread
+
+
+def serve(port, host="127.0.0.1", registry=REGISTRY):
+    """Serve GET /metrics on host:port from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_from_env(registry=REGISTRY):
+    """Start the exports RECAP_METRICS_PORT and RECAP_METRICS_FILE ask for, if any."""
+    port = int(os.environ.get("RECAP_METRICS_PORT", "0") or 0)
+    path = os.environ.get("RECAP_METRICS_FILE")
+    if port:
+        serve(port, registry=registry)
+    if path:
+        start_textfile_writer(path, registry=registry)
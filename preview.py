@@ -0,0 +1,143 @@
+# preview.py
+
+import os
+import io
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Slide Hashing
+# ─────────────────────────────────────────────────────────────────────────────
+def slide_hashes(prs) -> list:
+    """
+    One content hash per slide: the slide XML plus the identity of every part
+    it links to (images by their SHA-1, layouts by part name). Two slides with
+    the same hash render identically.
+    """
+    hashes = []
+    for slide in prs.slides:
+        h = hashlib.sha256(slide.part.blob)
+        for rId, rel in sorted(slide.part.rels.items()):
+            h.update(rId.encode("utf-8"))
+            if rel.is_external:
+                h.update(rel.target_ref.encode("utf-8"))
+                continue
+            target = rel.target_part
+            h.update(str(target.partname).encode("utf-8"))
+            sha1 = getattr(target, "sha1", None)
+            if sha1:
+                h.update(sha1.encode("utf-8"))
+        hashes.append(h.hexdigest())
+    return hashes
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Renderers
+# ─────────────────────────────────────────────────────────────────────────────
+def find_backend():
+    """Return the first available headless renderer: "aspose", "libreoffice" or None."""
+    try:
+        import aspose.slides  # noqa: F401
+        return "aspose"
+    except ImportError:
+        pass
+    if _soffice() and shutil.which("pdftoppm"):
+        return "libreoffice"
+    return None
+
+
+def _soffice():
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+def _render_aspose(pptx_path, indices, out_paths, scale):
+    import aspose.slides as slides
+    with slides.Presentation(pptx_path) as pres:
+        for idx, out_path in zip(indices, out_paths):
+            img = pres.slides[idx].get_image(scale, scale)
+            img.save(out_path, slides.ImageFormat.PNG)
+
+
+def _render_libreoffice(pptx_path, indices, out_paths, scale):
+    # LibreOffice can only convert the whole deck; rasterize just the pages we need
+    workdir = os.path.dirname(pptx_path)
+    subprocess.run(
+        [_soffice(), "--headless", "--convert-to", "pdf", "--outdir", workdir, pptx_path],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=300,
+    )
+    pdf_path = os.path.splitext(pptx_path)[0] + ".pdf"
+    dpi = str(max(int(72 * scale * 2), 24))
+    for idx, out_path in zip(indices, out_paths):
+        page = str(idx + 1)
+        prefix = os.path.splitext(out_path)[0]
+        subprocess.run(
+            ["pdftoppm", "-png", "-r", dpi, "-f", page, "-l", page, "-singlefile", pdf_path, prefix],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120,
+        )
+
+
+RENDERERS = {
+    "aspose": _render_aspose,
+    "libreoffice": _render_libreoffice,
+}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Thumbnail Renderer
+# ─────────────────────────────────────────────────────────────────────────────
+class ThumbnailRenderer:
+    """
+    Renders PNG thumbnails of a filled deck on a background thread. Thumbnails
+    are cached on disk by slide content hash, so only slides whose content
+    changed since any earlier render are rasterized again.
+    """
+
+    def __init__(self, cache_dir="thumbnails", scale=0.25, max_workers=1, backend=None):
+        self.cache_dir = cache_dir
+        self.scale = scale
+        self.backend = backend or find_backend()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnails")
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def cached_path(self, slide_hash):
+        return os.path.join(self.cache_dir, f"{slide_hash}.png")
+
+    def submit(self, pptx_path):
+        """
+        Queue a render of the deck at `pptx_path` and return a Future whose
+        result is a list with one PNG path per slide. The file is read now,
+        so the caller may overwrite it while the render is pending.
+        """
+        with open(pptx_path, "rb") as f:
+            data = f.read()
+        return self._executor.submit(self._render, data)
+
+    def _render(self, data):
+        from pptx import Presentation
+        if self.backend is None:
+            raise RuntimeError("No slide renderer available (install aspose.slides or LibreOffice + poppler).")
+
+        hashes = slide_hashes(Presentation(io.BytesIO(data)))
+        paths = [self.cached_path(h) for h in hashes]
+        with self._lock:
+            missing = [i for i, path in enumerate(paths) if not os.path.exists(path)]
+        if not missing:
+            return paths
+
+        with tempfile.TemporaryDirectory(prefix="thumbs_") as tmp:
+            deck_path = os.path.join(tmp, "deck.pptx")
+            with open(deck_path, "wb") as f:
+                f.write(data)
+            tmp_paths = [os.path.join(tmp, f"slide_{i}.png") for i in missing]
+            RENDERERS[self.backend](deck_path, missing, tmp_paths, self.scale)
+            with self._lock:
+                for i, tmp_path in zip(missing, tmp_paths):
+                    shutil.move(tmp_path, paths[i])
+        return paths
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
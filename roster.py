@@ -0,0 +1,192 @@
+# roster.py
+
+import io
+import os
+import re
+import sys
+import json
+from app import upload_bytes, format_compact_number
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Roster Columns
+# ─────────────────────────────────────────────────────────────────────────────
+# One row per influencer (or post). Headers are matched case- and
+# punctuation-insensitively against these aliases; unknown columns are ignored.
+COLUMN_ALIASES = {
+    "section": ("section", "slide", "grid"),
+    "handle": ("handle", "influencer", "influencer handle", "instagram handle", "username", "creator"),
+    "reach": ("reach", "social reach", "followers", "audience"),
+    "city": ("city",),
+    "state": ("state", "st", "region"),
+    "verbatim": ("verbatim", "quote", "feedback", "comment text"),
+    "likes": ("likes", "like", "likes count"),
+    "comments": ("comments", "comment", "comments count"),
+    "views": ("views", "video views", "plays"),
+    "engagements": ("engagements", "engagement", "total engagements"),
+    "impressions": ("impressions", "impression", "total impressions"),
+}
+
+NUMBER_COLUMNS = ("reach", "likes", "comments", "views", "engagements", "impressions")
+
+# Which grid a row fills. Without a section column every row is influencer feedback.
+SECTION_ALIASES = {
+    "feedback": ("feedback", "influencer feedback", "slide 5", "5", ""),
+    "posts": ("posts", "top posts", "high performing posts", "high performing", "slide 8", "8"),
+    "organic": ("organic", "slide 7 organic", "7 organic"),
+    "paid": ("paid", "slide 7 paid", "7 paid"),
+}
+
+_SUFFIXES = {"K": 1_000, "M": 1_000_000, "MM": 1_000_000, "B": 1_000_000_000}
+
+
+def _key(text):
+    return re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+
+
+_COLUMN_LOOKUP = {_key(alias): column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+_SECTION_LOOKUP = {_key(alias): section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Loading & Normalizing
+# ─────────────────────────────────────────────────────────────────────────────
+def read_roster(src) -> "pd.DataFrame":
+    """Read a roster (upload object or path, .csv/.xlsx) with every cell as text."""
+    import pandas as pd
+    name = src.name if hasattr(src, "name") else src
+    ext = os.path.splitext(name)[1].lower()
+    data = io.BytesIO(upload_bytes(src)) if hasattr(src, "read") else src
+    if ext == ".csv":
+        return pd.read_csv(data, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    if ext in (".xls", ".xlsx"):
+        return pd.read_excel(data, dtype=str, keep_default_na=False)
+    raise ValueError(f"Unsupported file type: {ext}")
+
+
+def _parse_numbers(text):
+    """'1,234' / '12.5K' / '1.2M' → float; anything else NaN. Works on a whole column at once."""
+    import pandas as pd
+    parts = text.str.upper().str.replace(",", "", regex=False).str.extract(r"^\s*([0-9]*\.?[0-9]+)\s*(K|MM|M|B)?\s*$")
+    scale = parts[1].map(_SUFFIXES).fillna(1)
+    return pd.to_numeric(parts[0], errors="coerce") * scale
+
+
+def normalize_roster(df):
+    """
+    Rename recognised columns, clean every column in one pass each, and
+    check each row. Returns (roster, problems): a DataFrame with every
+    COLUMN_ALIASES column (text, "" when missing) and a list of messages
+    naming the spreadsheet rows that were dropped or had unreadable numbers.
+    """
+    import pandas as pd
+
+    renamed = {}
+    for column in df.columns:
+        target = _COLUMN_LOOKUP.get(_key(column))
+        if target is not None and target not in renamed.values():
+            renamed[column] = target
+    roster = df[list(renamed)].rename(columns=renamed)
+    for column in COLUMN_ALIASES:
+        if column not in roster.columns:
+            roster[column] = ""
+    roster = roster[list(COLUMN_ALIASES)].fillna("").astype(str).apply(lambda col: col.str.strip())
+    # Spreadsheet row numbers: header is row 1
+    roster.index = pd.RangeIndex(2, len(roster) + 2)
+    problems = []
+
+    roster = roster[(roster != "").any(axis=1)]
+    roster["handle"] = roster["handle"].str.lstrip("@").str.strip()
+    roster["city"] = roster["city"].str.title()
+    # Two-letter codes upper-cased ("tx" → "TX"), full names title-cased like cities ("new york" → "New York")
+    roster["state"] = roster["state"].str.upper().where(roster["state"].str.len() <= 2, roster["state"].str.title())
+    roster["verbatim"] = roster["verbatim"].str.strip("\"“” ")
+
+    sections = roster["section"].map(lambda s: _SECTION_LOOKUP.get(_key(s)))
+    for row in roster.index[sections.isna()]:
+        problems.append(f"Row {row}: unknown section {roster.at[row, 'section']!r}; skipped.")
+    roster["section"] = sections
+
+    for column in NUMBER_COLUMNS:
+        values = _parse_numbers(roster[column])
+        bad = (roster[column] != "") & values.isna()
+        for row in roster.index[bad]:
+            problems.append(f"Row {row}: {column} {roster.at[row, column]!r} is not a number; left as typed.")
+        # Reach reads "12.5K Social Reach" on the slide; counts are written out in full
+        formatted = values.map(format_compact_number) if column == "reach" else \
+            values.map(lambda v: f"{v:,.0f}" if v == v else "")
+        roster[column] = formatted.where(values.notna(), roster[column])
+
+    missing = roster["handle"] == ""
+    for row in roster.index[missing & sections.notna()]:
+        problems.append(f"Row {row}: no handle; skipped.")
+    return roster[~missing & sections.notna()], problems
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Slide Inputs
+# ─────────────────────────────────────────────────────────────────────────────
+def roster_text_inputs(roster) -> dict:
+    """
+    The text_inputs entries the roster fills: influencer_boxes (slide 5),
+    influencer_boxestwo (slide 8) and the slide 7 organic/paid posts. Lists
+    longer than a slide's boxes are paginated by the deck generator.
+    """
+    text_inputs = {}
+    feedback = roster[roster["section"] == "feedback"]
+    if len(feedback):
+        text_inputs["influencer_boxes"] = [
+            {"influencerhandle": r.handle, "##": r.reach, "City": r.city, "State": r.state, "Verbatim": r.verbatim}
+            for r in feedback.itertuples()
+        ]
+    posts = roster[roster["section"] == "posts"]
+    if len(posts):
+        text_inputs["influencer_boxestwo"] = [
+            {"influencerhandle": r.handle, "# Likes": r.likes, "# Comments": r.comments, "# Views": r.views,
+             "# Social Reach": r.reach}
+            for r in posts.itertuples()
+        ]
+    # Slide 7 has one organic and one paid post; the first row of each wins
+    organic = roster[roster["section"] == "organic"]
+    if len(organic):
+        r = organic.iloc[0]
+        text_inputs.update(slide_7_left=r["handle"], slide_7_like=r["likes"], slide_7_comment=r["comments"],
+                           slide_7_view=r["views"], slide_7_reaches=r["reach"])
+    paid = roster[roster["section"] == "paid"]
+    if len(paid):
+        r = paid.iloc[0]
+        text_inputs.update(slide_7_right=r["handle"], slide_7_eng=r["engagements"], slide_7_impr=r["impressions"])
+    return text_inputs
+
+
+def load_roster(src):
+    """Read and normalize a roster file. Returns (text_inputs entries, roster, problems)."""
+    roster, problems = normalize_roster(read_roster(src))
+    for section, label in (("organic", "organic"), ("paid", "paid")):
+        extra = (roster["section"] == section).sum() - 1
+        if extra > 0:
+            problems.append(f"Slide 7 takes one {label} post; {extra} more {label} row(s) ignored.")
+    return roster_text_inputs(roster), roster, problems
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Turn an influencer roster into deck text inputs")
+    parser.add_argument("roster", help="CSV or Excel roster, one row per influencer or post")
+    parser.add_argument("--inputs", help="Merge into this --inputs JSON file for app.py (written back in place)")
+    args = parser.parse_args()
+
+    entries, roster, problems = load_roster(args.roster)
+    for problem in problems:
+        print(f"Warning: {problem}", file=sys.stderr)
+    if args.inputs:
+        payload = {}
+        if os.path.exists(args.inputs):
+            with open(args.inputs, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        payload.setdefault("text_inputs", {}).update(entries)
+        with open(args.inputs, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Wrote {len(roster)} roster rows into {args.inputs}")
+    else:
+        print(json.dumps(entries, indent=2))
@@ -0,0 +1,241 @@
+# search.py
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import zipfile
+import xml.etree.ElementTree as ET
+from deckdiff import NS, slide_parts
+
+
+INDEX_PATH = "recaps.db"
+SCHEMA_VERSION = 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Deck Text
+# ─────────────────────────────────────────────────────────────────────────────
+def find_decks(folder, recursive=True) -> list:
+    """Every .pptx under `folder` (Office lock files and half-written temporaries skipped), sorted."""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".")) if recursive else []
+        for name in files:
+            if name.lower().endswith(".pptx") and not name.startswith("~$"):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def deck_text(path) -> list:
+    """
+    The text of each slide of the deck at `path`, in presentation order: one
+    line per paragraph, from every text box and table cell (handles,
+    verbatims, hashtags and the filled-in metrics alike).
+    """
+    slides = []
+    with zipfile.ZipFile(path) as zf:
+        for part in slide_parts(zf):
+            root = ET.fromstring(zf.read(part))
+            lines = []
+            for paragraph in root.iter(f"{{{NS['a']}}}p"):
+                line = "".join(t.text or "" for t in paragraph.iter(f"{{{NS['a']}}}t")).strip()
+                if line:
+                    lines.append(line)
+            slides.append("\n".join(lines))
+    return slides
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Index
+# ─────────────────────────────────────────────────────────────────────────────
+# decks holds one row per indexed file with the size and mtime it was indexed
+# at; slide_text is an FTS5 table with one row per slide. unicode61 splits on
+# "#" and "@", so "#CampaignHashtag" and "@handle" match with or without them.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    slides INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS slide_text USING fts5(
+    text, deck_id UNINDEXED, slide UNINDEXED, tokenize = "unicode61 remove_diacritics 2"
+);
+"""
+
+
+def fts_query(text) -> str:
+    """
+    Plain search words → an FTS5 query: every word must appear (as a prefix
+    when it ends in "*"); "#" and "@" are dropped, and quoted phrases are
+    kept as phrases.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        term = (phrase or word).strip()
+        prefix = term.endswith("*")
+        term = term.rstrip("*").lstrip("#@").replace('"', '""').strip()
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " AND ".join(terms)
+
+
+class DeckIndex:
+    """
+    Full-text index of generated recap decks in one SQLite file. update()
+    re-reads only decks whose size or modification time changed and drops
+    decks that were deleted; search() answers from the index alone.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _deck_id(self, path):
+        row = self._db.execute("SELECT id FROM decks WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, path) -> int:
+        """(Re)index one deck; returns its slide count."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        slides = deck_text(path)
+        with self._db:
+            deck_id = self._deck_id(path)
+            if deck_id is not None:
+                self._db.execute("DELETE FROM slide_text WHERE deck_id = ?", (deck_id,))
+            self._db.execute(
+                "INSERT INTO decks (path, size, mtime_ns, slides, indexed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "slides = excluded.slides, indexed_at = excluded.indexed_at",
+                (path, st.st_size, st.st_mtime_ns, len(slides), time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            deck_id = self._deck_id(path)
+            self._db.executemany("INSERT INTO slide_text (text, deck_id, slide) VALUES (?, ?, ?)",
+                                 [(text, deck_id, number) for number, text in enumerate(slides, 1)])
+        return len(slides)
+
+    def remove(self, path):
+        path = os.path.abspath(path)
+        with self._db:
+            deck_id = self._deck_id(path)
+            if deck_id is not None:
+                self._db.execute("DELETE FROM slide_text WHERE deck_id = ?", (deck_id,))
+                self._db.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+
+    def update(self, folder, recursive=True) -> dict:
+        """
+        Bring the index in line with the decks under `folder`. Returns
+        {"indexed": [...], "removed": [...], "unchanged": n, "errors": {path: message}}.
+        """
+        folder = os.path.abspath(folder)
+        known = {path: (size, mtime_ns) for path, size, mtime_ns in
+                 self._db.execute("SELECT path, size, mtime_ns FROM decks")}
+        result = {"indexed": [], "removed": [], "unchanged": 0, "errors": {}}
+        present = set()
+        for path in find_decks(folder, recursive):
+            path = os.path.abspath(path)
+            present.add(path)
+            try:
+                st = os.stat(path)
+                if known.get(path) == (st.st_size, st.st_mtime_ns):
+                    result["unchanged"] += 1
+                    continue
+                self.add(path)
+                result["indexed"].append(path)
+            except (OSError, zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+                result["errors"][path] = f"{type(e).__name__}: {e}"
+        for path in known:
+            if path.startswith(folder + os.sep) and path not in present:
+                self.remove(path)
+                result["removed"].append(path)
+        return result
+
+    def search(self, query, limit=20, raw=False) -> list:
+        """
+        Best-matching slides first: [{"path", "slide", "snippet", "score"}, ...].
+        `query` is plain words (see fts_query()), or FTS5 syntax with raw=True.
+        """
+        match = query if raw else fts_query(query)
+        if not match:
+            return []
+        rows = self._db.execute(
+            "SELECT decks.path, slide_text.slide, snippet(slide_text, 0, '[', ']', '…', 12), bm25(slide_text) "
+            "FROM slide_text JOIN decks ON decks.id = slide_text.deck_id "
+            "WHERE slide_text MATCH ? ORDER BY bm25(slide_text) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        return [{"path": path, "slide": slide, "snippet": snippet.replace("\n", " / "), "score": -score}
+                for path, slide, snippet, score in rows]
+
+    def stats(self) -> dict:
+        decks, slides = self._db.execute("SELECT COUNT(*), COALESCE(SUM(slides), 0) FROM decks").fetchone()
+        return {"decks": decks, "slides": slides}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Full-text search over generated recap decks")
+    parser.add_argument("--db", default=INDEX_PATH, help="SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_cmd = commands.add_parser("index", help="Index every new or changed deck under a folder")
+    index_cmd.add_argument("folder", help="Directory of generated decks")
+    index_cmd.add_argument("--no-recursive", action="store_true", help="Only look at the folder itself")
+    index_cmd.add_argument("--watch", action="store_true", help="Keep re-indexing as decks appear")
+    index_cmd.add_argument("--interval", type=float, default=5.0, help="Seconds between scans with --watch")
+    query_cmd = commands.add_parser("query", help="Find the slides that mention every word of a query")
+    query_cmd.add_argument("query", help='Words, "quoted phrases", prefix* terms; #hashtags and @handles work')
+    query_cmd.add_argument("--limit", type=int, default=20, help="Most slides to list")
+    query_cmd.add_argument("--raw", action="store_true", help="Pass the query to FTS5 unchanged")
+    query_cmd.add_argument("--json", action="store_true", help="Print the matches as JSON")
+    args = parser.parse_args()
+
+    with DeckIndex(args.db) as index:
+        if args.command == "index":
+            if not os.path.isdir(args.folder):
+                sys.exit(f"Not a directory: {args.folder}")
+            try:
+                while True:
+                    result = index.update(args.folder, recursive=not args.no_recursive)
+                    for path, error in result["errors"].items():
+                        print(f"Warning: skipping {path}: {error}")
+                    if result["indexed"] or result["removed"] or not args.watch:
+                        print(f"Indexed {len(result['indexed'])}, removed {len(result['removed'])}, "
+                              f"unchanged {result['unchanged']} ({index.stats()['decks']} decks in {args.db})")
+                    if not args.watch:
+                        break
+                    time.sleep(args.interval)
+            except KeyboardInterrupt:
+                pass
+
+        if args.command == "query":
+            try:
+                start = time.perf_counter()
+                matches = index.search(args.query, args.limit, raw=args.raw)
+                elapsed = time.perf_counter() - start
+            except sqlite3.OperationalError as e:
+                sys.exit(f"Bad query: {e}")
+            if args.json:
+                print(json.dumps(matches, indent=2))
+            else:
+                for match in matches:
+                    print(f"{match['path']}  slide {match['slide']}: {match['snippet']}")
+                print(f"{len(matches)} slide(s) in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,250 @@
+# service.py
+
+import io
+import os
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from opsmetrics import REGISTRY, REQUEST_SECONDS
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Requests
+# ─────────────────────────────────────────────────────────────────────────────
+class ServiceBusy(Exception):
+    """Raised by GenerationService.submit() when admission control rejects a request."""
+
+
+class RequestCancelled(Exception):
+    """Raised inside a worker once its request has been cancelled."""
+
+    counts_as_failure = False  # see opsmetrics.stage()
+
+
+class NamedBytesIO(io.BytesIO):
+    """In-memory upload with a file name, as load_dataframe() expects from Streamlit."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def generation_request(workbook, workbook_name, text_inputs=None, images=None, pptx_template_path="template.pptx",
+                       slide_map=None, profile=None):
+    """
+    Build a picklable generation request. `workbook` and every value in
+    `images` (slot → bytes) are raw file contents; empty slots may be None.
+    `slide_map` comes from a compiled template (see templates.py); `profile`
+    names the slides to keep (see app.PROFILES).
+    """
+    return {
+        "id": uuid.uuid4().hex,
+        "workbook": workbook,
+        "workbook_name": workbook_name,
+        "text_inputs": text_inputs or {},
+        "images": {slot: data for slot, data in (images or {}).items() if data},
+        "template": os.path.abspath(pptx_template_path),
+        "slide_map": slide_map,
+        "profile": profile,
+    }
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Worker Process
+# ─────────────────────────────────────────────────────────────────────────────
+def _init_worker():
+    # app.py imports its heavy dependencies lazily; pay for them once per
+    # worker at startup rather than inside the first request it serves
+    import app  # noqa: F401
+    import pandas  # noqa: F401
+    import pptx  # noqa: F401
+    import PIL.Image  # noqa: F401
+    # A forked worker starts with a copy of the parent's metrics; only its own are sent back
+    REGISTRY.reset()
+
+
+def _run_request(request, scratch_root, progress_state, cancelled):
+    from app import load_dataframe, populate_pptx_from_excel
+
+    rid = request["id"]
+    started_at = time.time()
+    progress_state[rid] = ("start", 0.0)
+
+    def progress(stage, fraction):
+        if rid in cancelled:
+            raise RequestCancelled(rid)
+        progress_state[rid] = (stage, fraction)
+
+    # Each request gets its own scratch directory, so concurrent requests never share files
+    scratch = tempfile.mkdtemp(prefix=f"req_{rid[:8]}_", dir=scratch_root)
+    try:
+        df = load_dataframe(NamedBytesIO(request["workbook"], request["workbook_name"]))
+        images = {slot: NamedBytesIO(data, slot) for slot, data in request["images"].items()}
+        output_path = os.path.join(scratch, "recap_deck.pptx")
+        populate_pptx_from_excel(df, request["template"], output_path, images=images,
+                                 text_inputs=request["text_inputs"], progress=progress,
+                                 slide_map=request.get("slide_map"), profile=request.get("profile"))
+        with open(output_path, "rb") as f:
+            pptx = f.read()
+    except BaseException as e:
+        # The parent merges the worker's metrics from the result, or from the error
+        e.metrics = REGISTRY.drain()
+        raise
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {"pptx": pptx, "started_at": started_at, "finished_at": time.time(), "metrics": REGISTRY.drain()}
+
+
+def _run_extract(rid, files, progress_state):
+    from extract import extract_uploads
+
+    progress_state[rid] = ("extract", 0.0)
+    rows, errors = extract_uploads(files)
+    return {"rows": rows, "errors": errors, "metrics": REGISTRY.drain()}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Generation Service
+# ─────────────────────────────────────────────────────────────────────────────
+class GenerationService:
+    """
+    Runs deck generation on a fixed-size pool of worker processes, off the web
+    process. At most `max_pending` requests may be queued or running; beyond
+    that submit() raises ServiceBusy. metrics() reports queue depth, counts
+    and latencies.
+    """
+
+    def __init__(self, workers=None, max_pending=None, scratch_root=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending if max_pending is not None else self.workers * 4
+        self.scratch_root = scratch_root or os.path.join(tempfile.gettempdir(), "recap_scratch")
+        os.makedirs(self.scratch_root, exist_ok=True)
+
+        self._manager = multiprocessing.Manager()
+        self._progress = self._manager.dict()
+        self._cancelled = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._counts = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        self._latency_total = 0.0
+        self._queue_wait_total = 0.0
+
+    def _admit(self, rid):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._counts["rejected"] += 1
+                raise ServiceBusy(f"{len(self._pending)} requests in flight (limit {self.max_pending}).")
+            self._pending[rid] = time.time()
+
+    def submit(self, request):
+        """Queue `request` (see generation_request()); returns a Future of the worker's result dict."""
+        rid = request["id"]
+        self._admit(rid)
+        with self._lock:
+            self._counts["submitted"] += 1
+        future = self._executor.submit(_run_request, request, self.scratch_root, self._progress, self._cancelled)
+        future.add_done_callback(lambda f: self._finish(rid, f))
+        return future
+
+    def submit_extract(self, files):
+        """
+        Queue metric extraction for in-memory workbooks ({name: bytes}) on the
+        same workers and admission limit as decks; returns a Future of
+        {"rows": {...}, "errors": {...}} as extract.extract_uploads() gives.
+        """
+        rid = uuid.uuid4().hex
+        self._admit(rid)
+        future = self._executor.submit(_run_extract, rid, files, self._progress)
+        future.add_done_callback(lambda f: self._finish_extract(rid, f))
+        return future
+
+    def generate(self, request, progress=None, poll_interval=0.2):
+        """
+        Submit `request`, wait for it and return the .pptx bytes. Worker
+        progress is relayed to `progress(stage, fraction)`; if the callback
+        raises, the request is cancelled and the exception propagates.
+        """
+        future = self.submit(request)
+        rid = request["id"]
+        try:
+            while True:
+                try:
+                    return future.result(timeout=poll_interval)["pptx"]
+                except FutureTimeout:
+                    pass
+                state = self._progress.get(rid)
+                if progress is not None and state is not None and state[0] != "start":
+                    progress(*state)
+        except BaseException:
+            self.cancel(rid)
+            raise
+
+    def progress(self, request_id):
+        """(stage, fraction) last reported by the worker, or None if it hasn't started."""
+        return self._progress.get(request_id)
+
+    def cancel(self, request_id):
+        self._cancelled[request_id] = True
+
+    def _finish(self, rid, future):
+        with self._lock:
+            submitted_at = self._pending.pop(rid, None)
+            if future.cancelled():
+                self._counts["cancelled"] += 1
+            elif future.exception() is not None:
+                key = "cancelled" if isinstance(future.exception(), RequestCancelled) else "failed"
+                self._counts[key] += 1
+                REGISTRY.merge(getattr(future.exception(), "metrics", None))
+            else:
+                result = future.result()
+                self._counts["completed"] += 1
+                REGISTRY.merge(result.get("metrics"))
+                if submitted_at is not None:
+                    self._latency_total += result["finished_at"] - submitted_at
+                    self._queue_wait_total += max(result["started_at"] - submitted_at, 0.0)
+                    REQUEST_SECONDS.observe(result["finished_at"] - submitted_at)
+        self._progress.pop(rid, None)
+        self._cancelled.pop(rid, None)
+
+    def _finish_extract(self, rid, future):
+        with self._lock:
+            self._pending.pop(rid, None)
+            if not future.cancelled() and future.exception() is None:
+                REGISTRY.merge(future.result().get("metrics"))
+        self._progress.pop(rid, None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pending = list(self._pending)
+            counts = dict(self._counts)
+            latency_total = self._latency_total
+            queue_wait_total = self._queue_wait_total
+        running = sum(1 for rid in pending if rid in self._progress)
+        completed = counts["completed"]
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": len(pending),
+            "running": running,
+            "queued": len(pending) - running,
+            **counts,
+            "avg_latency_s": latency_total / completed if completed else 0.0,
+            "avg_queue_wait_s": queue_wait_total / completed if completed else 0.0,
+        }
+
+    def metric_samples(self) -> list:
+        """Queue gauges for opsmetrics.Registry.register_collector()."""
+        m = self.metrics()
+        return [
+            ("recap_queue_depth", "Generation requests waiting or running.", m["queued"], {"state": "queued"}),
+            ("recap_queue_depth", "Generation requests waiting or running.", m["running"], {"state": "running"}),
+            ("recap_workers", "Generation worker processes.", m["workers"], {}),
+        ]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._manager.shutdown()
@@ -1,8 +1,19 @@
 import os
+import json
+import time
+import hashlib
+import tempfile
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from app import load_dataframe, populate_pptx_from_excel, extract_proposed_metrics_anywhere
+from app import load_dataframe, extract_recap_metrics, IncrementalDeckBuilder, upload_bytes, PROFILES
+from preview import ThumbnailRenderer
+from jobs import JobRunner, QueueFull, QUEUED, DONE, FAILED, CANCELLED
+from service import GenerationService, ServiceBusy, generation_request
+from export import ExportService
+from templates import TemplateRegistry, DEFAULT_TEMPLATE
+from assets import AssetStore
+from roster import load_roster
+import opsmetrics
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Page Setup
@@ -13,288 +24,104 @@ if os.path.exists("logo.png"):
 
 st.title("Recap Deck Editor")
 st.markdown("Upload your Excel, see a live preview of your slide, and download your PowerPoint recap deck.")
-st.markdown("Note: Upload all picture to the fields (even if u dont use all of them or the app crashes)")
+st.markdown("Note: Photo slots can be left empty. Photos are kept after upload, so a saved draft "
+            "(see the sidebar) brings back its workbook, text and photos without uploading them again.")
+
+
+@st.cache_resource
+def get_asset_store():
+    # Uploaded photos/workbooks and saved drafts, shared by every session on this server
+    return AssetStore()
+
+
+asset_store = get_asset_store()
+
+# Loading a draft sets the form's widget state, so it has to happen before the widgets are drawn
+with st.sidebar:
+    st.header("Drafts")
+    draft_names = asset_store.drafts()
+    if draft_names:
+        draft_choice = st.selectbox("Saved drafts", draft_names, key="draft_choice")
+        if st.button("Load draft", key="load_draft"):
+            draft = asset_store.load_draft(draft_choice)
+            for key, value in draft["fields"].items():
+                st.session_state[key] = value
+            st.session_state["slot_assets"] = dict(draft["images"])
+            st.session_state["upload_slots"] = set()
+            st.session_state["roster_from_upload"] = False
+            st.session_state["draft_workbook"] = draft.get("workbook")
+            st.rerun()
+    else:
+        st.caption("No saved drafts yet.")
 
 st.header("Step 1: Upload Data File")
 uploaded = st.file_uploader("Upload Excel or CSV", type=["xlsx", "csv"])
+draft_workbook = st.session_state.get("draft_workbook")
+if not uploaded and draft_workbook and asset_store.has(draft_workbook[0]):
+    uploaded = asset_store.open(*draft_workbook)
+    st.caption(f"Using {uploaded.name} from the loaded draft.")
 if not uploaded:
     st.info("Please upload your Excel/CSV to generate your recap deck.")
     st.stop()
 
-df = load_dataframe(uploaded)
+# Reruns (every keystroke) aren't generations; keep them out of the load/extract metrics
+with opsmetrics.unrecorded():
+    df = load_dataframe(uploaded)
 st.subheader("Preview: First 50 Rows of Data")
 st.dataframe(df.head(50), height=250)
 
 st.markdown("---")
 st.header("Slides: Data Preview")
 
+# Same extraction (and layout resolution) as the deck itself, so the preview always matches it
 try:
-    metrics = extract_proposed_metrics_anywhere(df)
-except Exception:
-    metrics = {"Impressions": "", "Engagements": "", "Influencers": ""}
-    st.warning("Could not extract 'Proposed Metrics' from Excel. Please check formatting.")
-
-# Social Posts & Stories
-social_posts_value = ""
-for _, row in df.iterrows():
-    if str(row["Organic & Total"]).strip() == "Total Number of Posts With Stories":
-        social_posts_value = row["Unnamed: 11"]
-        break
-
-engagements_value = ""
-for _, row in df.iterrows():
-    if str(row["Organic & Total"]).strip() == "Total Engagements":
-        engagements_value = row["Unnamed: 11"]
-        break
-
-diversity_value = ""
-diversity_col = None
-
-# Normalize column names to string and strip whitespace
-for col in df.columns:
-    if str(col).strip().lower() == "diversity":
-        diversity_col = col
-        break
-
-if diversity_col is not None:
-    # Try to get the first non-empty, non-nan value under the Diversity column
-    for val in df[diversity_col]:
-        if pd.notna(val) and str(val).strip() != "":
-            diversity_value = str(val).strip()
-            break
-
-
-engagement_rate_value = ""
-for _, row in df.iterrows():
-    if str(row["Organic & Total"]).strip() == "Program ER":
-        engagement_rate_value = float(row["Unnamed: 11"]) * 100
-        # Round to two decimal places, then remove leading zero
-        engagement_rate_value = f"{engagement_rate_value:.2f}"
-        if engagement_rate_value.startswith("0"):
-            engagement_rate_value = engagement_rate_value[1:]
-        break
-
-
-impressions_value = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            cell_value = str(row["Organic & Total"]).strip()
-            if cell_value in ("Total", "Total Impressions"):
-                impressions_value = row["Unnamed: 11"]
-                break
-
-paid_likes = ""
-if "Dates" in df.columns and "Unnamed: 14" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Reactions":
-                paid_likes = row["Dates"]
-                break
-
-paid_comments = ""
-if "Unnamed: 14" in df.columns and "Dates" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Comments":
-                paid_comments = row["Dates"]
-                break
-    
-paid_shares = ""
-if "Unnamed: 14" in df.columns and "Dates" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Shares":
-                paid_shares = row["Dates"]
-                break
-
-paid_saves = ""
-if "Unnamed: 14" in df.columns and "Dates" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "Saves":
-                paid_saves = row["Dates"]
-                break 
-    
-paid_threesec = ""
-if "Unnamed: 14" in df.columns and "Dates" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 14"]).strip() == "3 sec vid views":
-                paid_threesec = row["Dates"]
-                break
-
-
-# Percent Increases
-engagements_increase = ""
-impressions_increase = ""
-
-try:
-    engagement_val = df.at[5, "Unnamed: 15"]
-    impression_val = df.at[4, "Unnamed: 15"]
-
-    if pd.notna(engagement_val):
-        engagements_increase = f"{float(engagement_val) * 100:.1f}%"
-    if pd.notna(impression_val):
-        impressions_increase = f"{float(impression_val) * 100:.1f}%"
+    with opsmetrics.unrecorded():
+        recap = extract_recap_metrics(df)
 except Exception as e:
-    st.warning("⚠️ Could not extract fixed-position % increases.")
-
-            
-organic_likes = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Likes":
-                organic_likes = row["Unnamed: 11"]
-                break
-
-
-organic_comments = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Comments":
-                organic_comments = row["Unnamed: 11"]
-                break
-
-organic_shares = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Shares":
-                organic_shares = row["Unnamed: 11"]
-                break
-
-organic_saves = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Saves":
-                organic_saves = row["Unnamed: 11"]
-                break
-
-
-influencer_count = ""
-if "Dates" in df.columns and "Unnamed: 14" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Dates"]).strip() == "Influencers":
-                influencer_count = row["Unnamed: 14"]
-                break
-
-
-organic_views_impressions = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Organic (Views)":
-                organic_views_impressions = row["Unnamed: 11"]
-                break
-
-
-
-organic_reach_impressions = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-    for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Organic (Reach)":
-                organic_reach_impressions = row["Unnamed: 11"]
-                break
-
-                    
-impressions_paid = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-    for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Paid":
-                impressions_paid = row["Unnamed: 11"]
-                break
-
-total_post_engagements = (
-    int(organic_likes) + int(organic_comments) + int(organic_shares) + int(organic_saves)
-   + int(paid_likes) + int(paid_comments) + int(paid_shares) + int(paid_saves) + int(paid_threesec)
-)
-
-story_engagements = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-    for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Story Engagements":
-                story_engagements = row["Unnamed: 11"]
-                break
-
-paid_engagements = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-    for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Paid Engagements":
-                paid_engagements = row["Unnamed: 11"]
-                break
-
-total_engagements = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "Total Engagements":
-                total_engagements = row["Unnamed: 11"]
-
-cpe = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CPE":
-                cpe = row["Unnamed: 17"]
-                break
-    
-cpc = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CPC":
-                cpc = row["Unnamed: 17"]
-                break
-
-ctr = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CTR":
-                ctr = row["Unnamed: 17"]
-                break
-
-cpm = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "CPM":
-                cpm = row["Unnamed: 17"]
-
-thruplays = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "ThruPlays":
-                thruplays = row["Unnamed: 17"]
-                break
-
-p25 = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "0.25":
-                p25 = row["Unnamed: 17"]
-                break
-
-p50 = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "0.5":
-             p50 = row["Unnamed: 17"]
-             break
-
-p75 = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Unnamed: 18"]).strip() == "0.75":
-             p75 = row["Unnamed: 17"]
-             break
-
-p100 = ""
-if "Unnamed: 18" in df.columns and "Unnamed: 17" in df.columns:
-        for _, row in df.iterrows():
-         if str(row["Unnamed: 18"]).strip() == "1":
-            p100 = row["Unnamed: 17"]
-
-c2c_transfer = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "C2C Transfers":
-                c2c_transfer = row["Unnamed: 11"]
-                break
-    
-c2c_value = ""
-if "Organic & Total" in df.columns and "Unnamed: 11" in df.columns:
-        for _, row in df.iterrows():
-            if str(row["Organic & Total"]).strip() == "C2C Value": 
-                c2c_value = row["Unnamed: 11"]
+    st.error(f"Could not read the recap metrics from this sheet: {e}")
+    st.stop()
+
+metrics = recap["proposed_metrics"]
+if not any(str(v).strip() for v in metrics.values()):
+    st.warning("Could not extract 'Proposed Metrics' from Excel. Please check formatting.")
+if not recap["engagements_increase"] and not recap["impressions_increase"]:
+    st.warning("⚠️ Could not extract the % increases.")
+
+social_posts_value = recap["social_posts_value"]
+engagements_value = recap["engagements_value"]
+diversity_value = recap["diversity_value"]
+engagement_rate_value = recap["engagement_rate_value"]
+impressions_value = recap["impressions_value"]
+engagements_increase = recap["engagements_increase"]
+impressions_increase = recap["impressions_increase"]
+organic_likes = recap["organic_likes"]
+organic_comments = recap["organic_comments"]
+organic_shares = recap["organic_shares"]
+organic_saves = recap["organic_saves"]
+paid_likes = recap["paid_likes"]
+paid_comments = recap["paid_comments"]
+paid_shares = recap["paid_shares"]
+paid_saves = recap["paid_saves"]
+paid_threesec = recap["paid_threesec"]
+influencer_count = recap["influencer_count"]
+organic_views_impressions = recap["organic_views_impressions"]
+organic_reach_impressions = recap["organic_reach_impressions"]
+impressions_paid = recap["impressions_paid"]
+total_post_engagements = recap["total_post_engagements"]
+story_engagements = recap["story_engagements"]
+paid_engagements = recap["paid_engagements"]
+total_engagements = recap["total_engagements"]
+cpe = recap["cpe"]
+cpc = recap["cpc"]
+ctr = recap["ctr"]
+cpm = recap["cpm"]
+thruplays = recap["thruplays"]
+p25 = recap["p25"]
+p50 = recap["p50"]
+p75 = recap["p75"]
+p100 = recap["p100"]
+c2c_transfer = recap["c2c_transfer"]
+c2c_value = recap["c2c_value"]
 
 
 col1, col2, col3, col4, col5, col6 = st.columns(6)
@@ -411,13 +238,13 @@ with cols[2]:
     slide_3_hashtag = st.text_input("Hashtag", value="#CampaignHashtag", key="slide3hashtag")
 
 
-slide_4_firstbullet = st.text_input("Enter the first bullet for the program goals", value="placeholder bullet")
-slide_4_secondbullet = st.text_input("Enter the first bullet for the program goals", value="placeholder again")
-influencer_slide_6 = st.text_input("Enter the Influencer Handle for Program Assets", value="@influencerhandle")
-slide_9_text = st.text_input("Enter the Line for the Top Text of Engagements Summary", value="hey this is a placeholder")
-slide_13_text = st.text_input("Enter the date for Click2Cart Recap ", value="12/1/26")
-slide_15_text = st.text_input("Enter the question for Key Insights (1)", value="On a scale of 1 to 10...")
-slide_16_text = st.text_input("Enter the question for Key Insights (2)", value="What were your favorite parts...")
+slide_4_firstbullet = st.text_input("Enter the first bullet for the program goals", value="placeholder bullet", key="slide4b1")
+slide_4_secondbullet = st.text_input("Enter the first bullet for the program goals", value="placeholder again", key="slide4b2")
+influencer_slide_6 = st.text_input("Enter the Influencer Handle for Program Assets", value="@influencerhandle", key="slide6handle")
+slide_9_text = st.text_input("Enter the Line for the Top Text of Engagements Summary", value="hey this is a placeholder", key="slide9text")
+slide_13_text = st.text_input("Enter the date for Click2Cart Recap ", value="12/1/26", key="slide13text")
+slide_15_text = st.text_input("Enter the question for Key Insights (1)", value="On a scale of 1 to 10...", key="slide15text")
+slide_16_text = st.text_input("Enter the question for Key Insights (2)", value="What were your favorite parts...", key="slide16text")
 
 
 
@@ -475,31 +302,76 @@ influencer_boxestwo = [
 
 ]
 
+@st.cache_data(max_entries=32)
+def parse_roster(digest, name):
+    # Keyed by content hash: a rerun with the same roster doesn't parse it again
+    return load_roster(asset_store.open(digest, name))
+
+
+st.markdown("### Influencer Roster")
+st.caption("Upload a table with one row per influencer (Handle, Reach, City, State, Verbatim, and for posts "
+           "Likes, Comments, Views, Engagements, Impressions) instead of typing the grids below. A Section "
+           "column (feedback, posts, organic, paid) says which slide a row goes to; without it every row is "
+           "feedback. More influencers than a slide holds continue on extra slides.")
+roster_upload = st.file_uploader("Upload roster (CSV or Excel)", type=["csv", "xlsx"], key="roster_upload")
+if roster_upload is not None:
+    st.session_state["roster_asset"] = (asset_store.put_upload(roster_upload), roster_upload.name)
+    st.session_state["roster_from_upload"] = True
+elif st.session_state.get("roster_from_upload"):
+    # The user removed the upload; a roster from a draft stays
+    st.session_state.pop("roster_asset", None)
+    st.session_state["roster_from_upload"] = False
+
+roster_entries = {}
+roster_asset = st.session_state.get("roster_asset")
+if roster_asset and asset_store.has(roster_asset[0]):
+    try:
+        roster_entries, roster_table, roster_problems = parse_roster(*roster_asset)
+    except Exception as e:
+        st.error(f"Could not read the roster: {e}")
+    else:
+        st.caption(f"{len(roster_table)} roster rows from {roster_asset[1]}.")
+        for problem in roster_problems:
+            st.warning(problem)
+        # The slide 7 posts prefill their (still editable) fields, once per roster
+        if st.session_state.get("roster_applied") != roster_asset[0]:
+            for field, key in (("slide_7_left", "slide_7_left_handle"), ("slide_7_like", "slide_7_likes"),
+                               ("slide_7_comment", "slide_7_comments"), ("slide_7_view", "slide_7_views"),
+                               ("slide_7_reaches", "slide_7_reach"), ("slide_7_right", "slide_7_right_handle"),
+                               ("slide_7_eng", "slide_7_engage"), ("slide_7_impr", "slide_7_impress")):
+                if field in roster_entries:
+                    st.session_state[key] = roster_entries[field]
+            st.session_state["roster_applied"] = roster_asset[0]
+
 st.markdown("### Enter Influencer Feedback")
 
-# Show headers
-headers = ["Influencer", "Handle", "Reach", "City", "State", "Verbatim"]
-header_cols = st.columns(len(headers))
-for i, header in enumerate(headers):
-    header_cols[i].markdown(f"**{header}**")
-
-influencer_inputs = {}
-
-for box in influencer_boxes:
-    cols = st.columns(len(headers))
-    cols[0].markdown(box['label'])
-    handle = cols[1].text_input("", key=f"{box['key']}_handle")
-    reach = cols[2].text_input("", key=f"{box['key']}_reach")
-    city = cols[3].text_input("", key=f"{box['key']}_city")
-    state = cols[4].text_input("", key=f"{box['key']}_state")
-    verbatim = cols[5].text_input("", key=f"{box['key']}_verbatim")
-    influencer_inputs[box["textbox"]] = {
-        "influencerhandle": handle,
-        "##": reach,
-        "City": city,
-        "State": state,
-        "Verbatim": verbatim,
-    }
+if "influencer_boxes" in roster_entries:
+    influencer_inputs = roster_entries["influencer_boxes"]
+    st.caption(f"{len(influencer_inputs)} influencers from the roster.")
+else:
+    # Show headers
+    headers = ["Influencer", "Handle", "Reach", "City", "State", "Verbatim"]
+    header_cols = st.columns(len(headers))
+    for i, header in enumerate(headers):
+        header_cols[i].markdown(f"**{header}**")
+
+    influencer_inputs = {}
+
+    for box in influencer_boxes:
+        cols = st.columns(len(headers))
+        cols[0].markdown(box['label'])
+        handle = cols[1].text_input("", key=f"{box['key']}_handle")
+        reach = cols[2].text_input("", key=f"{box['key']}_reach")
+        city = cols[3].text_input("", key=f"{box['key']}_city")
+        state = cols[4].text_input("", key=f"{box['key']}_state")
+        verbatim = cols[5].text_input("", key=f"{box['key']}_verbatim")
+        influencer_inputs[box["textbox"]] = {
+            "influencerhandle": handle,
+            "##": reach,
+            "City": city,
+            "State": state,
+            "Verbatim": verbatim,
+        }
 
 
 st.markdown("### Enter Influencer Data for High Performing Posts (2)")
@@ -544,35 +416,39 @@ slide_7_impress = row2[7].text_input("", key="slide_7_impress", value="6")
 
 st.markdown("### Enter Influencer Data for High Performing Posts (4)")
 
-headers8 = ["Influencer", "Handle", "# Likes", "# Comments", "# Views", "# Social Reach"]
-header_cols8 = st.columns(len(headers8))
-for i, header in enumerate(headers8):
-    header_cols8[i].markdown(f"**{header}**")
-
-influencer_boxestwo_inputs = []
-
-for box in influencer_boxestwo:
-    cols = st.columns(len(headers8))
-    cols[0].markdown(box['label'])
-    handle = cols[1].text_input("", key=f"{box['key']}_handle")
-    likes = cols[2].text_input("", key=f"{box['key']}_likes")
-    comments = cols[3].text_input("", key=f"{box['key']}_comments")
-    views = cols[4].text_input("", key=f"{box['key']}_views")
-    reach = cols[5].text_input("", key=f"{box['key']}_reach")
-    influencer_boxestwo_inputs.append({
-        "influencerhandle": handle,
-        "# Likes": likes,
-        "# Comments": comments,
-        "# Views": views,
-        "# Social Reach": reach,
-    })
+if "influencer_boxestwo" in roster_entries:
+    influencer_boxestwo_inputs = roster_entries["influencer_boxestwo"]
+    st.caption(f"{len(influencer_boxestwo_inputs)} posts from the roster.")
+else:
+    headers8 = ["Influencer", "Handle", "# Likes", "# Comments", "# Views", "# Social Reach"]
+    header_cols8 = st.columns(len(headers8))
+    for i, header in enumerate(headers8):
+        header_cols8[i].markdown(f"**{header}**")
+
+    influencer_boxestwo_inputs = []
+
+    for box in influencer_boxestwo:
+        cols = st.columns(len(headers8))
+        cols[0].markdown(box['label'])
+        handle = cols[1].text_input("", key=f"{box['key']}_handle")
+        likes = cols[2].text_input("", key=f"{box['key']}_likes")
+        comments = cols[3].text_input("", key=f"{box['key']}_comments")
+        views = cols[4].text_input("", key=f"{box['key']}_views")
+        reach = cols[5].text_input("", key=f"{box['key']}_reach")
+        influencer_boxestwo_inputs.append({
+            "influencerhandle": handle,
+            "# Likes": likes,
+            "# Comments": comments,
+            "# Views": views,
+            "# Social Reach": reach,
+        })
 
 # Save in text_inputs for backend use
 
 
 
 
-images = {
+image_uploads = {
     "slide_6": slide_6_img,
     "slide_7_left": slide_7_left_img,
     "slide_7_right": slide_7_right_img,
@@ -584,11 +460,26 @@ images = {
     "slide_11_second": slide_11_second_img,
     "slide_11_third": slide_11_third_img,
     "slide_11_fourth": slide_11_fourth_img,
-    
-
-
 }
 
+# Every photo goes into the asset store once; slots then refer to it by hash,
+# so a draft's photos need no new upload and are decoded at most once
+slot_assets = st.session_state.setdefault("slot_assets", {})
+upload_slots = st.session_state.setdefault("upload_slots", set())
+for slot, upload in image_uploads.items():
+    if upload is not None:
+        slot_assets[slot] = asset_store.put_upload(upload)
+        upload_slots.add(slot)
+    elif slot in upload_slots:
+        # The user removed this upload; a slot filled from a draft stays filled
+        slot_assets.pop(slot, None)
+        upload_slots.discard(slot)
+
+images = {slot: asset_store.image(digest) for slot, digest in slot_assets.items() if asset_store.has(digest)}
+from_draft = [slot for slot in images if image_uploads.get(slot) is None]
+if from_draft:
+    st.caption(f"Using saved photos for: {', '.join(from_draft)}")
+
 text_inputs = {
          
     "slide_6": influencer_slide_6,
@@ -621,28 +512,201 @@ text_inputs = {
 
 
 
+# Raw widget values a draft restores (the text inputs are rebuilt from them)
+DRAFT_FIELDS = [
+    "slide1date", "slide1hashtag", "slide2date", "slide2hashtag", "slide3date", "slide3hashtag",
+    "slide4b1", "slide4b2", "slide6handle", "slide9text", "slide13text", "slide15text", "slide16text",
+    "slide_7_left_handle", "slide_7_likes", "slide_7_comments", "slide_7_views", "slide_7_reach",
+    "slide_7_right_handle", "slide_7_engage", "slide_7_impress", "roster_asset", "roster_applied",
+] + [f"{box['key']}_{field}" for box in influencer_boxes for field in ("handle", "reach", "city", "state", "verbatim")] \
+  + [f"{box['key']}_{field}" for box in influencer_boxestwo for field in ("handle", "likes", "comments", "views", "reach")]
+
+with st.sidebar:
+    draft_name = st.text_input("Save current inputs as", key="draft_name")
+    if st.button("Save draft", key="save_draft", disabled=not draft_name.strip()):
+        try:
+            asset_store.save_draft(
+                draft_name.strip(), text_inputs, slot_assets,
+                fields={key: st.session_state[key] for key in DRAFT_FIELDS if key in st.session_state},
+                workbook=(asset_store.put_upload(uploaded), uploaded.name),
+            )
+            st.success(f"Saved draft {draft_name.strip()!r}.")
+        except ValueError as e:
+            st.error(str(e))
+
+
+@st.cache_resource
+def get_template_registry():
+    # Templates are compiled once per server and recompiled when their files change
+    registry = TemplateRegistry()
+    registry.watch()
+    return registry
+
+
+registry = get_template_registry()
+template_names = registry.names()
+template_name = DEFAULT_TEMPLATE
+if len(template_names) > 1:
+    template_name = st.selectbox("Template", template_names, key="template_name")
+template = registry.get(template_name)
+if registry.errors().get(template_name):
+    st.warning(f"Template changes not applied: {registry.errors()[template_name]}")
+
+profile = st.selectbox("Slides", list(PROFILES), key="profile",
+                       help="'summary' only builds Program Overview, Engagement Summary and Paid Social Overview.")
+
+builder = st.session_state.get("deck_builder")
+if builder is None or builder.pptx_template_path != template.path or builder.profile != profile:
+    st.session_state["deck_builder"] = IncrementalDeckBuilder(template.path, slide_map=template.slide_map,
+                                                              profile=profile)
+# Per-session scratch space, so concurrent users never share preview/output files
+if "scratch_dir" not in st.session_state:
+    st.session_state["scratch_dir"] = tempfile.mkdtemp(prefix="recap_session_")
+scratch_dir = st.session_state["scratch_dir"]
+
+
+@st.cache_resource
+def get_job_runner():
+    # Bounded pool shared by every session on this server; in server mode each
+    # thread just waits on a worker process, so match the process count
+    workers = max(int(os.environ.get("RECAP_WORKERS", "0") or 0), 2)
+    runner = JobRunner(max_workers=workers, max_queue=workers * 4)
+    opsmetrics.REGISTRY.register_collector(runner.metric_samples)
+    return runner
+
+
+@st.cache_resource
+def get_generation_service():
+    # Server mode: RECAP_WORKERS=<n> moves generation into a pool of n worker processes
+    workers = int(os.environ.get("RECAP_WORKERS", "0") or 0)
+    if workers <= 0:
+        return None
+    service = GenerationService(workers=workers)
+    opsmetrics.REGISTRY.register_collector(service.metric_samples)
+    return service
+
+
+@st.cache_resource
+def start_metrics_export():
+    # RECAP_METRICS_PORT=<port> serves /metrics, RECAP_METRICS_FILE=<path> writes it periodically
+    opsmetrics.start_from_env()
+    return True
+
+
+start_metrics_export()
+
+
+def generate_with_service(service, request, output_path, progress=None):
+    with open(output_path, "wb") as f:
+        f.write(service.generate(request, progress=progress))
+    return None
+
+
+@st.cache_resource
+def get_export_service():
+    return ExportService()
+
+
+@st.cache_resource
+def get_thumbnail_renderer():
+    # One background renderer (and thumbnail cache) shared by every session
+    return ThumbnailRenderer()
+
+
+def build_preview(builder, df, preview_path, images, text_inputs, progress=None):
+    # Written beside the preview on show and swapped in whole, so a render never reads a half-written deck
+    building_path = f"{preview_path}.building"
+    rebuilt = builder.build(df, building_path, images=images, text_inputs=text_inputs, progress=progress,
+                            record=False)
+    os.replace(building_path, preview_path)
+    return rebuilt
+
+
+def collect_preview_build(preview_path):
+    # Take a finished preview build: re-render only when some slide changed
+    build_job = st.session_state.get("preview_build")
+    if build_job is None or not build_job.finished:
+        return
+    st.session_state["preview_build"] = None
+    if build_job.status == DONE:
+        st.session_state["preview_error"] = None
+        job = st.session_state.get("preview_job")
+        if build_job.result or job is None:
+            if job is not None and not job.done():
+                job.cancel()
+            st.session_state["preview_job"] = get_thumbnail_renderer().submit(preview_path)
+    elif build_job.status == FAILED:
+        st.session_state["preview_error"] = build_job.error
+
+
+def previews_pending():
+    job = st.session_state.get("preview_job")
+    return st.session_state.get("preview_build") is not None or (job is not None and not job.done())
+
+
+def show_previews(preview_path):
+    collect_preview_build(preview_path)
+    if st.session_state.get("preview_error") is not None:
+        st.warning(f"Could not build the preview deck: {st.session_state['preview_error']}")
+
+    job = st.session_state.get("preview_job")
+    if job is not None and job.done() and not job.cancelled():
+        if job.exception() is not None:
+            st.info(f"Slide previews unavailable: {job.exception()}")
+        else:
+            st.session_state["preview_thumbnails"] = job.result()
+
+    # The last finished preview stays up while a newer one is built and rendered
+    thumbnails = st.session_state.get("preview_thumbnails")
+    if thumbnails:
+        thumb_cols = st.columns(4)
+        for i, thumb in enumerate(thumbnails):
+            thumb_cols[i % 4].image(thumb, caption=f"Slide {i + 1}")
+    if previews_pending():
+        st.caption("Updating previews in the background…")
+        if not hasattr(st, "fragment"):
+            st.button("Refresh previews")
+
+
+st.markdown("---")
+st.header("Slide Previews")
+
+if st.checkbox("Show live slide previews", value=True, key="live_previews"):
+    preview_path = os.path.join(scratch_dir, "preview.pptx")
+    collect_preview_build(preview_path)
+
+    # The deck is built on the job runner, not in this script run (the first
+    # build decodes every photo); a new build is queued once the inputs change
+    builder = st.session_state["deck_builder"]
+    preview_key = hashlib.sha1(json.dumps(
+        [id(builder), hashlib.sha1(upload_bytes(uploaded)).hexdigest(), text_inputs,
+         {slot: slot_assets[slot] for slot in images}],
+        sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    generate_job = st.session_state.get("generate_job")
+    if (st.session_state.get("preview_build") is None and st.session_state.get("preview_key") != preview_key
+            and (generate_job is None or generate_job.finished)):
+        try:
+            st.session_state["preview_build"] = get_job_runner().submit(
+                build_preview, builder, df, preview_path, images, text_inputs, label="preview")
+            st.session_state["preview_key"] = preview_key
+        except QueueFull:
+            pass  # Queued again on the next rerun
+
+    # Poll while a build or render is in flight, without rerunning the whole page
+    if previews_pending() and hasattr(st, "fragment"):
+        st.fragment(run_every=0.5)(show_previews)(preview_path)
+    else:
+        show_previews(preview_path)
+
+
 st.markdown("---")
 st.header("Step 2: Download Recap Deck")
-pptx_template_path = "template.pptx"
 
 # 2. Create the images dictionary before calling the function
 
 
 # 3. Generate PowerPoint with images passed in
 if st.button("Generate PowerPoint Recap Deck"):
-    images = {
-    "slide_6": slide_6_img,
-    "slide_7_left": slide_7_left_img,
-    "slide_7_right": slide_7_right_img,
-    "slide_8_first": slide_8_first_img,
-    "slide_8_second": slide_8_second_img,
-    "slide_8_third": slide_8_third_img,
-    "slide_8_fourth": slide_8_fourth_img,
-    "slide_11_first": slide_11_first_img,
-    "slide_11_second": slide_11_second_img,
-    "slide_11_third": slide_11_third_img,
-    "slide_11_fourth": slide_11_fourth_img,
-}
     text_inputs = {
          
     "slide_6": influencer_slide_6,
@@ -676,11 +740,80 @@ if st.button("Generate PowerPoint Recap Deck"):
 
     from datetime import datetime  # Make sure this is imported!
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = f"recap_deck_output_{timestamp}.pptx"
-
-    populate_pptx_from_excel(df, pptx_template_path, output_path, images=images, text_inputs=text_inputs)
-
-    with open(output_path, "rb") as f:
-        st.success("✅ Your recap deck is ready!")
-        st.download_button("⬇️ Download PowerPoint", data=f, file_name=f"recap_deck_{timestamp}.pptx",
-                           mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
\ No newline at end of file
+    output_path = os.path.join(scratch_dir, f"recap_deck_output_{timestamp}.pptx")
+
+    # Run in the background so the session stays responsive. In server mode the
+    # worker pool does the work; otherwise the session's builder only rebuilds
+    # slides whose inputs changed.
+    service = get_generation_service()
+    try:
+        if service is not None:
+            request = generation_request(
+                upload_bytes(uploaded), uploaded.name, text_inputs,
+                {slot: asset_store.get(digest) for slot, digest in slot_assets.items() if slot in images},
+                template.path, template.slide_map, profile,
+            )
+            job = get_job_runner().submit(generate_with_service, service, request, output_path, label=timestamp)
+        else:
+            job = get_job_runner().submit(
+                st.session_state["deck_builder"].build, df, output_path,
+                images=images, text_inputs=text_inputs, label=timestamp,
+            )
+        st.session_state["generate_job"] = job
+        st.session_state["generate_output"] = (output_path, timestamp)
+    except (QueueFull, ServiceBusy):
+        st.error("The server is busy generating other decks. Please try again in a moment.")
+
+
+def show_pdf_export(output_path, timestamp):
+    # PDF conversion runs in its own process pool after the .pptx is ready
+    exports = st.session_state.setdefault("pdf_exports", {})
+    if output_path not in exports:
+        exports[output_path] = get_export_service().submit(output_path, formats=("pdf",))
+    export_job = exports[output_path]
+    if not export_job.done():
+        st.caption("Preparing a PDF copy in the background…")
+        st.button("Check for PDF", key="refresh_pdf")
+    elif export_job.exception() is not None:
+        st.caption(f"PDF export unavailable: {export_job.exception()}")
+    else:
+        with open(export_job.result()["pdf"], "rb") as pdf:
+            st.download_button("⬇️ Download PDF", data=pdf, file_name=f"recap_deck_{timestamp}.pdf",
+                               mime="application/pdf")
+
+
+def show_generate_job():
+    job = st.session_state.get("generate_job")
+    if job is None:
+        return
+    output_path, timestamp = st.session_state["generate_output"]
+
+    if not job.finished:
+        label = "Waiting for a free worker…" if job.status == QUEUED else f"Generating ({job.stage or 'starting'})…"
+        st.progress(job.progress, text=label)
+        if st.button("Cancel", key="cancel_generate"):
+            job.cancel()
+    elif job.status == DONE:
+        rebuilt = job.result
+        with open(output_path, "rb") as f:
+            st.success("✅ Your recap deck is ready!")
+            if rebuilt is not None:
+                st.caption(f"Rebuilt slides: {', '.join(str(i + 1) for i in rebuilt) or 'none (no changes)'}")
+            st.download_button("⬇️ Download PowerPoint", data=f, file_name=f"recap_deck_{timestamp}.pptx",
+                               mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
+        show_pdf_export(output_path, timestamp)
+    elif job.status == CANCELLED:
+        st.info("Generation cancelled.")
+    else:
+        st.error(f"Generation failed: {job.error}")
+
+
+# Poll a running job without rerunning the whole page where Streamlit supports it
+job = st.session_state.get("generate_job")
+if job is not None and not job.finished and hasattr(st, "fragment"):
+    st.fragment(run_every=0.5)(show_generate_job)()
+else:
+    show_generate_job()
+    if job is not None and not job.finished:
+        time.sleep(0.5)
+        st.rerun()
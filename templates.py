@@ -0,0 +1,217 @@
+# templates.py
+
+import os
+import json
+import hashlib
+import threading
+from app import SLIDE_FILLS
+from opsmetrics import TEMPLATE_LOOKUPS
+
+
+DEFAULT_TEMPLATE = "default"
+TEMPLATES_DIR = "templates"
+COMPILED_DIR = os.path.join(TEMPLATES_DIR, ".compiled")
+
+
+class TemplateError(Exception):
+    """Raised when a template or its manifest doesn't match the slides and shapes it promises."""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Manifests
+# ─────────────────────────────────────────────────────────────────────────────
+# A manifest is an optional <template>.json next to <template>.pptx:
+#
+#   {
+#     "label": "Brand X recap",
+#     "slides": {"slide_4": 2, "slide_9": 5, ...},
+#     "shapes": {"slide_6": {"Picture 2": "Hero Photo", "TextBox 9": "Handle"}}
+#   }
+#
+# "slides" places each fill step (named after its slide in the stock template)
+# at a 0-based slide index; fill steps left out are skipped. "shapes" maps the
+# stock shape names the fills look for to this template's own shape names.
+# Without a manifest a template is assumed to have the stock layout.
+def default_manifest() -> dict:
+    return {"slides": {fill.key: fill.index for fill in SLIDE_FILLS}, "shapes": {}}
+
+
+def load_manifest(path) -> dict:
+    manifest = default_manifest()
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise TemplateError(f"{path}: manifest must be a JSON object.")
+        manifest.update({k: v for k, v in data.items() if v is not None})
+    return manifest
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Compilation
+# ─────────────────────────────────────────────────────────────────────────────
+class CompiledTemplate:
+    """
+    A validated template ready to fill: `path` is a .pptx whose mapped shapes
+    already carry the stock names, and `slide_map` places the fill steps.
+    Both are plain values, so they can be handed to worker processes.
+    """
+
+    def __init__(self, name, label, source_path, manifest_path, path, slide_map, mtimes):
+        self.name = name
+        self.label = label
+        self.source_path = source_path
+        self.manifest_path = manifest_path
+        self.path = path
+        self.slide_map = slide_map
+        self.mtimes = mtimes
+
+
+def _mtimes(*paths):
+    return tuple(os.path.getmtime(p) if p and os.path.exists(p) else None for p in paths)
+
+
+def compile_template(name, source_path, manifest_path=None, compiled_dir=COMPILED_DIR) -> CompiledTemplate:
+    """
+    Load and validate `source_path` against its manifest once, rename mapped
+    shapes to the stock names the fills use, and write the result to
+    `compiled_dir` under a content hash. Raises TemplateError on a mismatch.
+    """
+    from pptx import Presentation
+
+    mtimes = _mtimes(source_path, manifest_path)
+    manifest = load_manifest(manifest_path)
+    slide_map = {key: int(index) for key, index in manifest["slides"].items()}
+    prs = Presentation(source_path)
+    slide_count = len(prs.slides)
+
+    known = {fill.key for fill in SLIDE_FILLS}
+    for key, index in slide_map.items():
+        if key not in known:
+            raise TemplateError(f"{name}: unknown slide {key!r} in manifest.")
+        if not 0 <= index < slide_count:
+            raise TemplateError(f"{name}: {key} points at slide {index + 1}, but the deck has {slide_count} slides.")
+
+    for key, renames in manifest["shapes"].items():
+        if key not in slide_map:
+            raise TemplateError(f"{name}: shape mapping for {key!r}, which the manifest doesn't place on a slide.")
+        slide = prs.slides[slide_map[key]]
+        for stock_name, own_name in renames.items():
+            shapes = [shape for shape in slide.shapes if shape.name == own_name]
+            if not shapes:
+                raise TemplateError(f"{name}: no shape named {own_name!r} on slide {slide_map[key] + 1} ({key}).")
+            for shape in shapes:
+                shape.name = stock_name
+
+    h = hashlib.sha256()
+    with open(source_path, "rb") as f:
+        h.update(f.read())
+    h.update(json.dumps(manifest, sort_keys=True).encode("utf-8"))
+    os.makedirs(compiled_dir, exist_ok=True)
+    path = os.path.abspath(os.path.join(compiled_dir, f"{name}-{h.hexdigest()[:16]}.pptx"))
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        prs.save(tmp_path)
+        os.replace(tmp_path, path)
+
+    label = manifest.get("label") or name.replace("_", " ").title()
+    return CompiledTemplate(name, label, os.path.abspath(source_path), manifest_path, path, slide_map, mtimes)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Registry
+# ─────────────────────────────────────────────────────────────────────────────
+class TemplateRegistry:
+    """
+    Named templates: the stock template.pptx as "default", plus every
+    templates/<name>.pptx (with an optional <name>.json manifest). Each is
+    compiled on first use and kept in memory; watch() polls the files and
+    recompiles a template as soon as its .pptx or manifest changes.
+    """
+
+    def __init__(self, templates_dir=TEMPLATES_DIR, default_path="template.pptx", compiled_dir=None):
+        self.templates_dir = templates_dir
+        self.default_path = default_path
+        self.compiled_dir = compiled_dir or os.path.join(templates_dir, ".compiled")
+        self._compiled = {}
+        self._errors = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def sources(self) -> dict:
+        """{name: (pptx path, manifest path)} for every template on disk."""
+        found = {}
+        if os.path.exists(self.default_path):
+            found[DEFAULT_TEMPLATE] = (self.default_path, os.path.splitext(self.default_path)[0] + ".json")
+        if os.path.isdir(self.templates_dir):
+            for entry in sorted(os.listdir(self.templates_dir)):
+                stem, ext = os.path.splitext(entry)
+                if ext.lower() == ".pptx" and not entry.startswith("~$"):
+                    found[stem] = (os.path.join(self.templates_dir, entry),
+                                   os.path.join(self.templates_dir, stem + ".json"))
+        return found
+
+    def names(self) -> list:
+        return list(self.sources())
+
+    def get(self, name=DEFAULT_TEMPLATE) -> CompiledTemplate:
+        """The compiled template `name`, recompiling it if its files changed."""
+        sources = self.sources()
+        if name not in sources:
+            raise KeyError(f"Unknown template {name!r}; available: {', '.join(sources) or 'none'}")
+        source_path, manifest_path = sources[name]
+        mtimes = _mtimes(source_path, manifest_path)
+        with self._lock:
+            compiled = self._compiled.get(name)
+            if compiled is not None and (compiled.mtimes == mtimes or self._failed.get(name) == mtimes):
+                TEMPLATE_LOOKUPS.inc(result="hit")
+                return compiled
+            TEMPLATE_LOOKUPS.inc(result="miss")
+            try:
+                compiled = compile_template(name, source_path, manifest_path, self.compiled_dir)
+            except (TemplateError, OSError, ValueError) as e:
+                if self._errors.get(name) != str(e):
+                    print(f"Warning: template {name!r} failed to compile: {e}")
+                self._errors[name] = str(e)
+                self._failed[name] = mtimes
+                # A broken edit keeps serving the last good version
+                if name not in self._compiled:
+                    raise
+                return self._compiled[name]
+            self._compiled[name] = compiled
+            self._errors.pop(name, None)
+            self._failed.pop(name, None)
+            return compiled
+
+    def errors(self) -> dict:
+        """{name: message} for templates the watcher failed to compile."""
+        return dict(self._errors)
+
+    def refresh(self):
+        """Recompile every template whose files changed; drop templates that were removed."""
+        sources = self.sources()
+        with self._lock:
+            for name in [n for n in self._compiled if n not in sources]:
+                del self._compiled[name]
+                self._errors.pop(name, None)
+        for name in sources:
+            try:
+                self.get(name)
+            except (TemplateError, OSError, ValueError, KeyError):
+                pass  # recorded in errors()
+
+    def watch(self, interval=2.0):
+        """Start a daemon thread that calls refresh() every `interval` seconds."""
+        if self._watcher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.refresh()
+
+        self.refresh()
+        self._watcher = threading.Thread(target=loop, name="template-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,181 @@
+# textfill.py
+
+# Tag of a shape element in a slide's shape tree; python-pptx isn't imported
+# here so that app.py keeps its heavy imports lazy
+P_SP = "{http://schemas.openxmlformats.org/presentationml/2006/main}sp"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Rules
+# ─────────────────────────────────────────────────────────────────────────────
+class _Rule:
+    """One edit on a shape's paragraphs; `values` are used up left to right across the shape."""
+
+    def __init__(self, kind, old=None, values=(), repeat=True, within=None, paragraph=None):
+        self.kind = kind
+        self.old = old
+        self.values = [str(v) for v in values]
+        self.repeat = repeat
+        self.within = within
+        self.paragraph = paragraph
+
+    def applies_to(self, index, original_text):
+        if self.paragraph is not None and index != self.paragraph:
+            return False
+        return self.within is None or self.within in original_text
+
+
+class ShapeEdits:
+    """Text edits for the shape(s) a TextEdits.shape() call selected."""
+
+    def __init__(self, name, nth=None, containing=None):
+        self.name = name
+        self.nth = nth
+        self.containing = containing
+        self.rules = []
+
+    def replace(self, old, new, count=None, within=None, paragraph=None):
+        """
+        Replace `old` with `new` (at most `count` times across the shape),
+        even where `old` is split over several runs. `within` / `paragraph`
+        restrict the edit to paragraphs containing that text / at that index.
+        """
+        values = [new] * count if count is not None else [new]
+        return self._add(_Rule("sub", old, values, repeat=count is None, within=within, paragraph=paragraph))
+
+    def replace_each(self, old, values, within=None):
+        """Replace successive occurrences of `old` with successive `values`; extra occurrences are left."""
+        return self._add(_Rule("sub", old, values, repeat=False, within=within))
+
+    def replace_paragraph(self, placeholder, value):
+        """Every paragraph reading exactly `placeholder` becomes `value`, in its first run's formatting."""
+        return self._add(_Rule("paragraph", placeholder, [value]))
+
+    def prefix(self, value, within):
+        """Put `value` and a space in front of paragraphs containing `within`."""
+        return self._add(_Rule("prefix", None, [value], within=within))
+
+    def remove_paragraph(self, placeholder):
+        return self._add(_Rule("remove", placeholder))
+
+    def clear(self):
+        """Empty every run of the shape, keeping its paragraphs and formatting."""
+        return self._add(_Rule("clear"))
+
+    def _add(self, rule):
+        self.rules.append(rule)
+        return self
+
+    def matches(self, name, nth, text):
+        if name != self.name:
+            return False
+        if self.nth is not None and nth != self.nth:
+            return False
+        return self.containing is None or self.containing in text
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Substitution Engine
+# ─────────────────────────────────────────────────────────────────────────────
+def _splice(texts, start, end, value):
+    """Replace characters [start, end) of the joined run texts with `value`, keeping run boundaries."""
+    offset = 0
+    placed = False
+    for i, text in enumerate(texts):
+        run_start = offset
+        offset += len(text)
+        if run_start >= end:
+            break
+        if offset <= start:
+            continue
+        tail = text[min(end - run_start, len(text)):]
+        if not placed:
+            # The replacement takes the formatting of the run where the match starts
+            texts[i] = text[:start - run_start] + value + tail
+            placed = True
+        else:
+            texts[i] = tail
+
+
+def _substitute(texts, old, values, state, repeat):
+    joined = "".join(texts)
+    spans = []
+    pos = joined.find(old)
+    while pos != -1:
+        if state["used"] >= len(values) and not repeat:
+            break
+        value = values[min(state["used"], len(values) - 1)]
+        state["used"] += 1
+        spans.append((pos, pos + len(old), value))
+        pos = joined.find(old, pos + len(old))
+    # Right to left, so earlier offsets stay valid
+    for start, end, value in reversed(spans):
+        _splice(texts, start, end, value)
+    return bool(spans)
+
+
+class TextEdits:
+    """
+    All text replacements for one slide, applied in a single walk over the
+    slide's XML: each paragraph's <a:t> run texts are read once, every rule
+    for the shape is applied to them, and only changed runs are written back.
+    """
+
+    def __init__(self):
+        self._shapes = []
+
+    def shape(self, name, nth=None, containing=None) -> ShapeEdits:
+        """
+        Select shapes named `name` (only the `nth` one of that name, or only
+        those whose text contains `containing`, if given).
+        """
+        edits = ShapeEdits(name, nth, containing)
+        self._shapes.append(edits)
+        return edits
+
+    def apply(self, slide):
+        if not self._shapes:
+            return
+        seen = {}
+        for sp in slide.shapes._spTree.iterchildren(P_SP):
+            name = sp.nvSpPr.cNvPr.get("name")
+            nth = seen[name] = seen.get(name, -1) + 1
+            if not any(edits.name == name for edits in self._shapes):
+                continue
+            paragraphs = sp.xpath("./p:txBody/a:p")
+            if not paragraphs:
+                continue
+            runs = [p.xpath("./a:r/a:t") for p in paragraphs]
+            texts = [[t.text or "" for t in ts] for ts in runs]
+            shape_text = "\n".join("".join(tx) for tx in texts)
+            selected = [edits for edits in self._shapes if edits.matches(name, nth, shape_text)]
+            if selected:
+                self._apply_shape(selected, paragraphs, runs, texts)
+
+    def _apply_shape(self, selected, paragraphs, runs, texts):
+        states = {id(rule): {"used": 0} for edits in selected for rule in edits.rules}
+        for index, (p, ts, tx) in enumerate(zip(paragraphs, runs, texts)):
+            original = "".join(tx)
+            current = list(tx)
+            removed = False
+            for edits in selected:
+                for rule in edits.rules:
+                    if not rule.applies_to(index, original):
+                        continue
+                    if rule.kind == "sub":
+                        _substitute(current, rule.old, rule.values, states[id(rule)], rule.repeat)
+                    elif rule.kind == "paragraph":
+                        if "".join(current).strip() == rule.old and current:
+                            current = [rule.values[0]] + [""] * (len(current) - 1)
+                    elif rule.kind == "prefix":
+                        if current:
+                            current[0] = f"{rule.values[0]} " + current[0]
+                    elif rule.kind == "clear":
+                        current = [""] * len(current)
+                    elif rule.kind == "remove":
+                        if "".join(current).strip() == rule.old:
+                            removed = True
+            if removed:
+                p.getparent().remove(p)
+                continue
+            for t, before, after in zip(ts, tx, current):
+                if before != after:
+                    t.text = after
@@ -0,0 +1,182 @@
+# warehouse.py
+
+import os
+import sys
+import hashlib
+from datetime import datetime
+from extract import extract_many
+
+
+WAREHOUSE_DIR = "warehouse"
+WORKBOOK_EXTS = (".xlsx", ".xls", ".csv")
+
+# Metrics the extractor returns as display text rather than numbers
+TEXT_METRICS = ("diversity_value", "engagement_rate_value", "engagements_increase", "impressions_increase")
+
+# Bookkeeping columns in front of the metrics
+SOURCE_COLUMNS = ("file_sha256", "file_name", "source_path", "modified_at", "ingested_at")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Source Files
+# ─────────────────────────────────────────────────────────────────────────────
+def find_workbooks(folder, recursive=True) -> list:
+    """Every campaign workbook under `folder` (Office lock files skipped), sorted."""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".")) if recursive else []
+        for name in files:
+            if name.lower().endswith(WORKBOOK_EXTS) and not name.startswith("~$"):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def file_sha256(path, chunk_size=1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Dataset
+# ─────────────────────────────────────────────────────────────────────────────
+# The warehouse is a directory of Parquet files that together form one
+# dataset: every ingest run appends a part-<timestamp>.parquet, so earlier
+# parts are never rewritten. All parts share the schema from _schema().
+def _parts(dataset) -> list:
+    if not os.path.isdir(dataset):
+        return []
+    return sorted(os.path.join(dataset, p) for p in os.listdir(dataset) if p.endswith(".parquet"))
+
+
+def ingested_hashes(dataset=WAREHOUSE_DIR) -> set:
+    """Hashes of every workbook already in the dataset; only that one column is read."""
+    import pyarrow.parquet as pq
+    hashes = set()
+    for part in _parts(dataset):
+        hashes.update(pq.read_table(part, columns=["file_sha256"]).column("file_sha256").to_pylist())
+    return hashes
+
+
+def _schema(metric_names):
+    import pyarrow as pa
+    fields = [
+        pa.field("file_sha256", pa.string()),
+        pa.field("file_name", pa.string()),
+        pa.field("source_path", pa.string()),
+        pa.field("modified_at", pa.timestamp("s")),
+        pa.field("ingested_at", pa.timestamp("s")),
+    ]
+    for name in metric_names:
+        fields.append(pa.field(name, pa.string() if name in TEXT_METRICS else pa.float64()))
+    return pa.schema(fields)
+
+
+def _metric_frame(rows, sources):
+    """One row per workbook: source columns, then metrics with a fixed type per column."""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_dict(rows, orient="index")
+    for column in frame.columns:
+        if column in TEXT_METRICS:
+            frame[column] = frame[column].map(lambda v: None if v is None or v == "" or v != v else str(v))
+        else:
+            # Stray text ("1,234", "" for missing) becomes a number or NaN, so every part types alike
+            text = frame[column].astype(str).str.replace(",", "", regex=False).str.strip()
+            frame[column] = pd.to_numeric(text, errors="coerce").astype("float64")
+    metric_names = sorted(frame.columns)
+
+    source = pd.DataFrame(
+        [sources[path] for path in frame.index],
+        columns=list(SOURCE_COLUMNS), index=frame.index,
+    )
+    return pd.concat([source, frame[metric_names]], axis=1).reset_index(drop=True), metric_names
+
+
+def ingest(folder, dataset=WAREHOUSE_DIR, workers=None, recursive=True) -> dict:
+    """
+    Extract metrics from every workbook under `folder` not yet in `dataset`
+    (by content hash) on a process pool, and append them as one new Parquet
+    part. Returns {"found", "skipped", "ingested", "errors": {path: message}, "part"}.
+    """
+    paths = find_workbooks(folder, recursive)
+    known = ingested_hashes(dataset)
+
+    # Hash first, so unchanged and duplicate workbooks are never parsed
+    pending = {}
+    for path in paths:
+        digest = file_sha256(path)
+        if digest not in known and digest not in pending:
+            pending[digest] = path
+    result = {"found": len(paths), "skipped": len(paths) - len(pending), "ingested": 0, "errors": {}, "part": None}
+    if not pending:
+        return result
+
+    rows, errors = extract_many(list(pending.values()), workers)
+    result["errors"] = errors
+    if not rows:
+        return result
+
+    now = datetime.now().replace(microsecond=0)
+    sources = {
+        path: (digest, os.path.basename(path), os.path.abspath(path),
+               datetime.fromtimestamp(int(os.path.getmtime(path))), now)
+        for digest, path in pending.items() if path in rows
+    }
+    frame, metric_names = _metric_frame(rows, sources)
+
+    os.makedirs(dataset, exist_ok=True)
+    part = os.path.join(dataset, f"part-{now:%Y%m%d-%H%M%S}-{os.getpid()}.parquet")
+    tmp_path = f"{part}.tmp"
+    frame.to_parquet(tmp_path, index=False, schema=_schema(metric_names))
+    os.replace(tmp_path, part)
+    result["ingested"] = len(frame)
+    result["part"] = part
+    return result
+
+
+def load_warehouse(dataset=WAREHOUSE_DIR, columns=None):
+    """The whole dataset as one DataFrame (only `columns`, if given)."""
+    import pandas as pd
+    parts = _parts(dataset)
+    if not parts:
+        return pd.DataFrame(columns=list(columns or SOURCE_COLUMNS))
+    return pd.concat([pd.read_parquet(p, columns=columns) for p in parts], ignore_index=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Campaign-metrics warehouse built from recap workbooks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = commands.add_parser("ingest", help="Add every new workbook under a folder to the warehouse")
+    ingest_cmd.add_argument("folder", help="Directory of historical recap workbooks")
+    ingest_cmd.add_argument("--dataset", default=WAREHOUSE_DIR, help="Parquet dataset directory")
+    ingest_cmd.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    ingest_cmd.add_argument("--no-recursive", action="store_true", help="Only look at the folder itself")
+    show = commands.add_parser("show", help="Print the warehouse (or some of its columns)")
+    show.add_argument("--dataset", default=WAREHOUSE_DIR, help="Parquet dataset directory")
+    show.add_argument("--columns", nargs="+", help="Columns to show (default: all)")
+    show.add_argument("--csv", help="Write the selection to this CSV instead")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        if not os.path.isdir(args.folder):
+            sys.exit(f"Not a directory: {args.folder}")
+        result = ingest(args.folder, args.dataset, args.workers, recursive=not args.no_recursive)
+        for path, error in result["errors"].items():
+            print(f"Warning: skipping {path}: {error}")
+        print(f"Found {result['found']} workbooks: {result['skipped']} already ingested or duplicates, "
+              f"{result['ingested']} added, {len(result['errors'])} failed")
+        if result["part"]:
+            print(f"Wrote {result['part']}")
+
+    if args.command == "show":
+        frame = load_warehouse(args.dataset, args.columns)
+        if args.csv:
+            frame.to_csv(args.csv, index=False)
+        else:
+            print(frame.to_string(index=False))
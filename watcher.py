@@ -0,0 +1,263 @@
+# watcher.py
+
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from app import load_dataframe, populate_pptx_from_excel, load_inputs
+from warehouse import find_workbooks
+
+
+STATE_FILE = ".recap_watch.json"
+DECK_SUFFIX = "_recap.pptx"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Inputs
+# ─────────────────────────────────────────────────────────────────────────────
+# An analyst drops campaign.xlsx (or .csv) into the folder, optionally with a
+# campaign.json sidecar in app.py's --inputs format:
+#
+#   {"text_inputs": {...}, "images": {"slide_6": "photos/hero.jpg", ...}}
+#
+# and the watcher writes campaign_recap.pptx next to them.
+def sidecar_path(workbook):
+    path = os.path.splitext(workbook)[0] + ".json"
+    return path if os.path.exists(path) else None
+
+
+def deck_path(workbook):
+    return os.path.splitext(workbook)[0] + DECK_SUFFIX
+
+
+def input_files(workbook, pptx_template_path) -> list:
+    """The workbook, its sidecar and the photos the sidecar names, plus the template: every file the deck depends on."""
+    files = [workbook, pptx_template_path]
+    sidecar = sidecar_path(workbook)
+    if sidecar:
+        files.append(sidecar)
+        try:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                images = json.load(f).get("images") or {}
+        except (OSError, ValueError, AttributeError):
+            images = {}  # half-written; the next scan sees it change again
+        base = os.path.dirname(os.path.abspath(sidecar))
+        files.extend(os.path.join(base, p) for _, p in sorted(images.items()))
+    return files
+
+
+def _signature(files):
+    sig = []
+    for path in files:
+        try:
+            st = os.stat(path)
+            sig.append((path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            sig.append((path, None, None))
+    return tuple(sig)
+
+
+def inputs_hash(files) -> str:
+    h = hashlib.sha256()
+    for path in files:
+        h.update(os.path.abspath(path).encode("utf-8") + b"\0")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        h.update(b"\0")
+    return h.hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Worker Process
+# ─────────────────────────────────────────────────────────────────────────────
+def _generate_deck(workbook, pptx_template_path, output_path):
+    sidecar = sidecar_path(workbook)
+    # Written under a temporary name, so a half-written deck never sits next to the inputs
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    images = {}
+    try:
+        text_inputs, images = load_inputs(sidecar) if sidecar else ({}, {})
+        df = load_dataframe(workbook)
+        populate_pptx_from_excel(df, pptx_template_path, tmp_path, images=images, text_inputs=text_inputs)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        for f in images.values():
+            f.close()
+    return output_path
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Watcher
+# ─────────────────────────────────────────────────────────────────────────────
+class DeckWatcher:
+    """
+    Polls `folder` for recap workbooks and generates a deck for each one
+    once its inputs have stopped changing for `settle` seconds. Generation
+    runs on a pool of `workers` processes with at most `max_pending` decks in
+    flight; the rest wait for a later scan. The hash of every input a deck
+    was built from is kept in the folder's .recap_watch.json, so unchanged
+    inputs are skipped, across restarts too. With `index_path`, each new
+    deck is also added to that search index (see search.py).
+    """
+
+    def __init__(self, folder, pptx_template_path="template.pptx", workers=2, settle=2.0, max_pending=None,
+                 recursive=True, index_path=None):
+        self.folder = folder
+        self.pptx_template_path = os.path.abspath(pptx_template_path)
+        self.workers = workers
+        self.settle = settle
+        self.max_pending = max_pending or workers * 2
+        self.recursive = recursive
+        self.index_path = index_path
+        self.state_path = os.path.join(folder, STATE_FILE)
+        self._state = self._load_state()
+        self._seen = {}      # workbook → (signature, time it was first seen with it)
+        self._hashed = {}    # workbook → (signature, inputs hash)
+        self._running = {}   # workbook → (future, inputs hash)
+        self._executor = None
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable {self.state_path}: {e}")
+        return {}
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _key(self, workbook):
+        return os.path.relpath(workbook, self.folder)
+
+    def _collect(self):
+        changed = False
+        for workbook, (future, digest) in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[workbook]
+            if future.cancelled():
+                continue  # Never started (cancelled by shutdown()); queued again on the next run
+            entry = {"hash": digest, "finished_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+            error = future.exception()
+            if error is None:
+                entry.update(status="done", output=os.path.basename(future.result()))
+                print(f"Generated {future.result()}")
+                if self.index_path:
+                    self._index(future.result())
+            else:
+                # Remembered by hash: not retried until one of its inputs changes
+                entry.update(status="failed", error=f"{type(error).__name__}: {error}")
+                print(f"Warning: could not generate a deck for {workbook}: {entry['error']}")
+            self._state[self._key(workbook)] = entry
+            changed = True
+        if changed:
+            self._save_state()
+
+    def _index(self, deck):
+        from search import DeckIndex
+        try:
+            with DeckIndex(self.index_path) as index:
+                index.add(deck)
+        except Exception as e:
+            print(f"Warning: could not index {deck}: {e}")
+
+    def scan(self) -> list:
+        """One pass: collect finished decks, queue every settled workbook whose inputs changed. Returns those queued."""
+        self._collect()
+        now = time.monotonic()
+        queued = []
+        workbooks = find_workbooks(self.folder, self.recursive)
+        for workbook in workbooks:
+            files = input_files(workbook, self.pptx_template_path)
+            sig = _signature(files)
+            seen = self._seen.get(workbook)
+            if seen is None or seen[0] != sig:
+                self._seen[workbook] = (sig, now)
+                continue
+            if now - seen[1] < self.settle or workbook in self._running:
+                continue
+
+            hashed = self._hashed.get(workbook)
+            if hashed is None or hashed[0] != sig:
+                hashed = self._hashed[workbook] = (sig, inputs_hash(files))
+            digest = hashed[1]
+            previous = self._state.get(self._key(workbook), {})
+            if previous.get("hash") == digest and (previous.get("status") == "failed"
+                                                   or os.path.exists(deck_path(workbook))):
+                continue
+            if len(self._running) >= self.max_pending:
+                break
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._executor.submit(_generate_deck, workbook, self.pptx_template_path, deck_path(workbook))
+            self._running[workbook] = (future, digest)
+            queued.append(workbook)
+
+        # Forget workbooks that were removed
+        present = set(workbooks)
+        for workbook in [w for w in self._seen if w not in present]:
+            self._seen.pop(workbook, None)
+            self._hashed.pop(workbook, None)
+        return queued
+
+    def pending(self) -> int:
+        return len(self._running)
+
+    def run(self, interval=1.0):
+        """Scan every `interval` seconds until interrupted."""
+        print(f"Watching {self.folder} for recap workbooks (Ctrl+C to stop)")
+        try:
+            while True:
+                for workbook in self.scan():
+                    print(f"Queued {workbook}")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        self._collect()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI Entrypoint
+# ─────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a recap deck for every workbook dropped into a folder")
+    parser.add_argument("folder", help="Shared folder to watch")
+    parser.add_argument("--template", default="template.pptx", help="PowerPoint template file")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds a workbook's inputs must be unchanged")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between scans")
+    parser.add_argument("--once", action="store_true", help="Generate what is ready now, wait for it, and exit")
+    parser.add_argument("--index", help="Also add each new deck to this search index (see search.py)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        sys.exit(f"Not a directory: {args.folder}")
+    watcher = DeckWatcher(args.folder, args.template, args.workers, args.settle, index_path=args.index)
+    if args.once:
+        # Two scans a settle period apart see every file as settled
+        watcher.scan()
+        time.sleep(args.settle)
+        while watcher.scan() or watcher.pending():
+            time.sleep(args.interval)
+        watcher.shutdown()
+    else:
+        watcher.run(args.interval)